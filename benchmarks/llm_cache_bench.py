@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for spoon_ai.llm.cache.LLMResponseCache.
+
+For each cache size the cache is filled to capacity, then measured for:
+    * put on a full cache (every insert evicts)
+    * get hits and misses
+    * key generation for conversations of increasing length, first call and
+      the follow-up call after one more message is appended
+
+The pre-OrderedDict behaviour (min() over every entry to find the LRU, full
+JSON serialization of the conversation per key) is measured alongside with
+``--legacy``; its eviction is only timed for a handful of operations since it
+is linear in the cache size.
+
+Usage:
+    python benchmarks/llm_cache_bench.py
+    python benchmarks/llm_cache_bench.py --sizes 1000,10000 --legacy
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from spoon_ai.llm.cache import LLMResponseCache  # noqa: E402
+from spoon_ai.llm.interface import LLMResponse  # noqa: E402
+from spoon_ai.schema import Message  # noqa: E402
+
+RESPONSE = LLMResponse(content="cached", provider="bench", model="bench", finish_reason="stop", native_finish_reason="stop")
+
+
+class LegacyCache(LLMResponseCache):
+    # Reproduces the previous key and eviction strategy for comparison.
+    def _generate_key(self, messages, provider, **kwargs):
+        cache_data = {
+            'messages': [{'role': msg.role, 'content': msg.content} for msg in messages],
+            'provider': provider,
+            'params': {k: v for k, v in sorted(kwargs.items()) if k not in ['request_id', 'timestamp']}
+        }
+        return hashlib.sha256(json.dumps(cache_data, sort_keys=True).encode()).hexdigest()
+
+    def _evict_lru(self):
+        lru_key = min(self._cache.keys(), key=lambda k: self._cache[k].last_accessed)
+        del self._cache[lru_key]
+        self._stats['evictions'] += 1
+
+
+def per_op_us(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def bench_size(cls, size: int, ops: int) -> dict:
+    cache = cls(max_size=size)
+    prompts = [[Message(role="user", content=f"prompt {i}")] for i in range(size + ops)]
+    t0 = time.perf_counter()
+    for i in range(size):
+        cache.put(prompts[i], "bench", RESPONSE)
+    fill_s = time.perf_counter() - t0
+    get_hit = per_op_us(lambda i: cache.get(prompts[size - 1 - i % size], "bench"), ops)
+    get_miss = per_op_us(lambda i: cache.get(prompts[size + i], "bench"), ops)
+    put_full = per_op_us(lambda i: cache.put(prompts[size + i], "bench", RESPONSE), ops)
+    return {"size": size, "fill_s": fill_s, "put_evict_us": put_full, "get_hit_us": get_hit, "get_miss_us": get_miss}
+
+
+def bench_keys(cls, length: int, reps: int) -> dict:
+    cache = cls()
+    history = [Message(role="user" if i % 2 == 0 else "assistant", content=f"turn {i} " + "lorem ipsum " * 40) for i in range(length)]
+    first = per_op_us(lambda i: cache._generate_key(history, "bench", temperature=0.3), 1)
+    history.append(Message(role="user", content="one more question"))
+    follow = per_op_us(lambda i: cache._generate_key(history, "bench", temperature=0.3), reps)
+    return {"messages": length, "first_key_us": first, "next_turn_key_us": follow}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--legacy", action="store_true", help="also time the previous implementation")
+    args = parser.parse_args()
+
+    impls = [("ordered", LLMResponseCache)] + ([("legacy", LegacyCache)] if args.legacy else [])
+    print(f"{'impl':<8} {'size':>9} {'fill s':>8} {'put+evict us':>13} {'get hit us':>11} {'get miss us':>12}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for name, cls in impls:
+            # The legacy eviction scans every entry; keep its op count small.
+            ops = args.ops if name == "ordered" else max(5, min(args.ops, 2_000_000 // size))
+            r = bench_size(cls, size, ops)
+            print(f"{name:<8} {r['size']:>9} {r['fill_s']:>8.2f} {r['put_evict_us']:>13.2f} {r['get_hit_us']:>11.2f} {r['get_miss_us']:>12.2f}")
+
+    print()
+    print(f"{'impl':<8} {'messages':>9} {'first key us':>13} {'next turn key us':>17}")
+    for length in (10, 100, 1000):
+        for name, cls in impls:
+            r = bench_keys(cls, length, 200)
+            print(f"{name:<8} {r['messages']:>9} {r['first_key_us']:>13.1f} {r['next_turn_key_us']:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Load-test and latency benchmark harness for the Genius Loci API.
+
+Drives ``/api/argue`` and/or ``/upload_bounty`` in-process through an ASGI
+transport with closed-loop workers. Only the external services are
+simulated: the vision provider, the LLM manager behind the gateway and the
+wallet are stubs whose latency is drawn from a ``LatencyDistribution`` spec
+("fixed:0.3", "uniform:0.2:0.6", "lognormal:0.4:3.0"). Upload handling,
+preprocessing, the caches, near-duplicate detection, the graph runner and
+payout batching all run for real.
+
+Every request uploads a distinct generated image so the caches miss;
+``--duplicate-ratio`` resubmits earlier images to exercise the dedupe path.
+
+Reported per run:
+    * throughput and request latency percentiles, overall and per endpoint
+    * per-node latency histograms (vision, historian, vibe, ...)
+    * event-loop lag, sampled by a ticker task
+
+``--json`` writes the report; ``--baseline`` compares against an earlier
+report and exits 1 when throughput, p99 latency or loop lag regress by more
+than ``--tolerance``.
+
+Usage:
+    python benchmarks/loci_load.py --requests 500 --concurrency 100
+    python benchmarks/loci_load.py --endpoint both --vision-latency lognormal:0.4:3 --json run.json
+    python benchmarks/loci_load.py --baseline run.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "genius-loci"))
+
+# The load generator reuses a handful of wallets; keep the per-wallet and
+# per-location limits out of the measurement.
+os.environ.setdefault("LOCI_WALLET_RATE", "0")
+os.environ.setdefault("LOCI_LOCATION_RATE", "0")
+# The app opens its SQLite stores on import; benchmark records must not land
+# in the real spirit registry or verification log.
+SCRATCH = tempfile.TemporaryDirectory(prefix="loci_bench_")
+os.environ.setdefault("LOCI_SPIRIT_DB", os.path.join(SCRATCH.name, "spirits.db"))
+os.environ.setdefault("LOCI_VERIFICATION_DB", os.path.join(SCRATCH.name, "verifications.db"))
+
+import httpx  # noqa: E402
+
+import main as loci  # noqa: E402
+from spoon.llm_gateway import LLMGateway  # noqa: E402
+from spoon.mock_wallet import LatencyDistribution, MockEVMWallet  # noqa: E402
+from spoon.vision_clients import VisionClientRegistry  # noqa: E402
+
+HIST_BOUNDS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def random_png(rng: random.Random, size: int = 16) -> bytes:
+    raw = b"".join(b"\x00" + rng.randbytes(size * 3) for _ in range(size))
+
+    def chunk(tag: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+
+    ihdr = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+class StubVisionClient:
+    name = "stub"
+    cache_tag = "stub"
+
+    def __init__(self, latency: LatencyDistribution, rng: random.Random):
+        self.latency = latency
+        self.rng = rng
+
+    async def describe(self, data, mime) -> str:
+        await asyncio.sleep(self.latency.sample(self.rng))
+        return "A steaming bowl of ramen on a wooden counter."
+
+    async def aclose(self) -> None:
+        pass
+
+
+class StubVisionRegistry(VisionClientRegistry):
+    def __init__(self, client: StubVisionClient):
+        super().__init__()
+        self._stub = client
+
+    def available(self) -> list:
+        return [self._stub.name]
+
+    def _build(self, name: str):
+        return self._stub
+
+
+class StubResponse:
+    content = "stub"
+
+
+class StubLLMManager:
+    def __init__(self, latency: LatencyDistribution, rng: random.Random):
+        self.latency = latency
+        self.rng = rng
+
+    async def chat(self, messages, provider=None, model=None, **kwargs):
+        await asyncio.sleep(self.latency.sample(self.rng))
+        return StubResponse()
+
+    async def cleanup(self) -> None:
+        pass
+
+
+def install_stubs(args, rng: random.Random) -> None:
+    os.environ.pop("PAYOUT_SIGN_WITH", None)
+    if args.no_dedupe:
+        loci.NEAR_DUP_POLICY = "off"
+    loci.vision_clients = StubVisionRegistry(StubVisionClient(LatencyDistribution.parse(args.vision_latency), rng))
+    llm_latency = LatencyDistribution.parse(args.llm_latency)
+    loci.llm_gateway = LLMGateway(manager_factory=lambda: StubLLMManager(llm_latency, rng), max_concurrency=args.llm_concurrency)
+    loci.mock_wallet = MockEVMWallet(latency=LatencyDistribution.parse(args.wallet_latency), verbose=False)
+
+
+class Recorder:
+    def __init__(self):
+        self.requests: Dict[str, List[float]] = defaultdict(list)
+        self.status: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.nodes: Dict[str, List[float]] = defaultdict(list)
+        self.loop_lag: List[float] = []
+
+    def instrument_graph(self) -> None:
+        # Wraps every node of each freshly built graph with a timer; the
+        # runner itself is left untouched.
+        build = loci.build_argue_graph
+
+        def timed(name, fn):
+            async def node(state):
+                t0 = time.perf_counter()
+                try:
+                    return await loci.StateGraph._call(fn, state)
+                finally:
+                    self.nodes[name].append(time.perf_counter() - t0)
+            return node
+
+        def build_timed():
+            g = build()
+            g.nodes = {name: timed(name, fn) for name, fn in g.nodes.items()}
+            return g
+
+        loci.build_argue_graph = build_timed
+
+    async def sample_loop_lag(self, interval: float, stop: asyncio.Event) -> None:
+        # A ticker that should wake every `interval`; any overshoot is time the
+        # loop spent running something else.
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.append(max(0.0, time.perf_counter() - t0 - interval))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def summarize(samples: List[float]) -> dict:
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+
+
+def histogram(samples: List[float]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for s in samples:
+        ms = s * 1000
+        label = next((f"<={b}ms" for b in HIST_BOUNDS_MS if ms <= b), f">{HIST_BOUNDS_MS[-1]}ms")
+        counts[label] = counts.get(label, 0) + 1
+    order = [f"<={b}ms" for b in HIST_BOUNDS_MS] + [f">{HIST_BOUNDS_MS[-1]}ms"]
+    return {label: counts[label] for label in order if label in counts}
+
+
+async def run_load(args, rec: Recorder, rng: random.Random) -> float:
+    endpoints = ["argue", "upload_bounty"] if args.endpoint == "both" else [args.endpoint]
+    images: List[bytes] = []
+    for _ in range(args.requests):
+        if images and rng.random() < args.duplicate_ratio:
+            images.append(rng.choice(images))
+        else:
+            images.append(random_png(rng))
+    pending = iter(range(args.requests))
+    stop = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=loci.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int) -> None:
+            endpoint = endpoints[i % len(endpoints)]
+            field = "file" if endpoint == "argue" else "photo"
+            files = {field: (f"bench_{i}.png", images[i], "image/png")}
+            data = {"wallet": f"0xBENCH{i % args.wallets}", "location": f"bench-{i % args.locations}"}
+            t0 = time.perf_counter()
+            resp = await client.post("/api/argue" if endpoint == "argue" else "/upload_bounty", data=data, files=files)
+            rec.requests[endpoint].append(time.perf_counter() - t0)
+            rec.status[endpoint][resp.status_code] += 1
+
+        async def worker() -> None:
+            # Closed loop: each worker issues its next request as soon as the
+            # previous one returns, so `concurrency` is the in-flight count.
+            for i in pending:
+                await one(i)
+
+        ticker = asyncio.create_task(rec.sample_loop_lag(args.lag_interval, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker
+    await loci.mock_payouts.drain()
+    return elapsed
+
+
+def build_report(args, rec: Recorder, elapsed: float) -> dict:
+    latencies = [x for samples in rec.requests.values() for x in samples]
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "requests": summarize(latencies),
+        "endpoints": {ep: {**summarize(s), "status": dict(rec.status[ep])} for ep, s in rec.requests.items()},
+        "nodes": {name: {**summarize(s), "histogram": histogram(s)} for name, s in rec.nodes.items()},
+        "event_loop_lag": summarize(rec.loop_lag),
+        "payouts": loci.mock_payouts.snapshot(),
+    }
+
+
+def print_report(report: dict) -> None:
+    def row(label: str, s: dict) -> str:
+        return f"  {label:<14} n={s['count']:<6} p50={s['p50_ms']:9.1f}ms  p90={s['p90_ms']:9.1f}ms  p99={s['p99_ms']:9.1f}ms  max={s['max_ms']:9.1f}ms"
+
+    print(f"elapsed {report['elapsed_s']:.2f}s · throughput {report['throughput_rps']:.1f} req/s")
+    print("requests")
+    print(row("all", report["requests"]))
+    for ep, s in report["endpoints"].items():
+        print(row(ep, s) + f"  status={s['status']}")
+    print("nodes")
+    for name, s in report["nodes"].items():
+        print(row(name, s))
+        print("  " + " " * 15 + "  ".join(f"{label}:{n}" for label, n in s["histogram"].items()))
+    print("event loop lag")
+    print(row("ticker", report["event_loop_lag"]))
+    p = report["payouts"]
+    print(f"payouts: {p['transfers']} transfers in {p['batches']} batches (mean {p['mean_batch']:.1f})")
+
+
+def check_regression(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    failures = []
+    if report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        failures.append(f"throughput {report['throughput_rps']:.1f} req/s < baseline {baseline['throughput_rps']:.1f}")
+    if report["requests"]["p99_ms"] > baseline["requests"]["p99_ms"] * (1 + tolerance):
+        failures.append(f"request p99 {report['requests']['p99_ms']:.1f}ms > baseline {baseline['requests']['p99_ms']:.1f}")
+    # Sub-millisecond lag is scheduler noise; only flag it once it is visible.
+    lag_limit = max(baseline["event_loop_lag"]["p99_ms"] * (1 + tolerance), 5.0)
+    if report["event_loop_lag"]["p99_ms"] > lag_limit:
+        failures.append(f"loop lag p99 {report['event_loop_lag']['p99_ms']:.2f}ms > {lag_limit:.2f}")
+    return failures
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoint", choices=["argue", "upload_bounty", "both"], default="argue")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--wallets", type=int, default=64)
+    parser.add_argument("--locations", type=int, default=16)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+    parser.add_argument("--no-dedupe", action="store_true", help="skip the near-duplicate check")
+    parser.add_argument("--vision-latency", default="fixed:0.3")
+    parser.add_argument("--llm-latency", default="fixed:0.2")
+    parser.add_argument("--wallet-latency", default="fixed:0.1")
+    parser.add_argument("--llm-concurrency", type=int, default=64)
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against an earlier --json report")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    rec = Recorder()
+    install_stubs(args, rng)
+    rec.instrument_graph()
+    try:
+        elapsed = asyncio.run(run_load(args, rec, rng))
+    finally:
+        loci.image_prep.close()
+        loci.spirits.close()
+        for leftover in (ROOT / "genius-loci" / "static" / "uploads").glob("*_bench_*"):
+            leftover.unlink()
+    report = build_report(args, rec, elapsed)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        failures = check_regression(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
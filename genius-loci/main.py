@@ -1,28 +1,97 @@
 from pathlib import Path
 import os
 import asyncio
+import inspect
+import json
+import hashlib
+import time
+import math
+import itertools
 from dotenv import load_dotenv
-import base64
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi import UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import RedirectResponse
+from starlette.responses import RedirectResponse, StreamingResponse
 from starlette.staticfiles import StaticFiles
-from typing import TypedDict, Callable, Dict, List, Optional
-from spoon.mock_wallet import MockEVMWallet
-mock_wallet = MockEVMWallet()
-import google.generativeai as genai
-from spoon_ai.llm.manager import get_llm_manager
-from spoon_ai.schema import Message
-import threading
+from pydantic import BaseModel
+from typing import TypedDict, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from spoon.mock_wallet import LatencyDistribution, MockEVMWallet
+from spoon.llm_gateway import LLMGateway
+from spoon.vision_clients import VisionClientRegistry, description_similarity
+from spoon.vision_cache import VisionCache, content_key
+from spoon.phash import NearDuplicateIndex, dhash
+from spoon.image_prep import ImagePreprocessor
+from spoon.job_queue import JobQueue, QueueFull
+from spoon.payout_batcher import PayoutBatcher
+from spoon.rate_limit import RateLimiter, RedisBucketStore
+from spoon.skill_registry import shared_registry
+from spoon.early_exit import EarlyExitRules
+from spoon.spirit_registry import Bounty, Spirit, SpiritRegistry
+from spoon.verification_log import VerificationLog
+llm_gateway = LLMGateway()
+vision_clients = VisionClientRegistry()
 from spoon_ai.tools.turnkey_tools import CompleteTransactionWorkflowTool
+from spoon_ai.schema import Message
 
 load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
 
+mock_wallet = MockEVMWallet(
+    latency=LatencyDistribution.parse(os.getenv("LOCI_WALLET_LATENCY", "uniform:0.6:1.5")),
+    failure_rate=float(os.getenv("LOCI_WALLET_FAILURE_RATE", "0")),
+)
+
+vision_cache = VisionCache(
+    max_entries=int(os.getenv("LOCI_VISION_CACHE_SIZE", "1024")),
+    disk_dir=os.getenv("LOCI_VISION_CACHE_DIR") or None,
+    ttl=float(os.getenv("LOCI_VISION_CACHE_TTL", str(7 * 24 * 3600))),
+    max_disk_entries=int(os.getenv("LOCI_VISION_CACHE_DISK_ENTRIES", "100000")),
+)
+image_prep = ImagePreprocessor(
+    max_side=int(os.getenv("LOCI_VISION_MAX_SIDE", "1536")),
+    quality=int(os.getenv("LOCI_VISION_QUALITY", "85")),
+    fmt=os.getenv("LOCI_VISION_FORMAT", "JPEG"),
+    workers=int(os.getenv("LOCI_PREP_WORKERS")) if os.getenv("LOCI_PREP_WORKERS") else None,
+)
+jobs = JobQueue(
+    workers=int(os.getenv("LOCI_JOB_WORKERS", "4")),
+    max_pending=int(os.getenv("LOCI_JOB_QUEUE_SIZE", "100")),
+)
+# Rates are per minute; 0 disables that scope.
+rate_limiter = RateLimiter(
+    {
+        "wallet": (float(os.getenv("LOCI_WALLET_RATE", "10")) / 60, float(os.getenv("LOCI_WALLET_BURST", "5"))),
+        "location": (float(os.getenv("LOCI_LOCATION_RATE", "120")) / 60, float(os.getenv("LOCI_LOCATION_BURST", "30"))),
+    },
+    store=RedisBucketStore(os.environ["LOCI_RATE_LIMIT_REDIS_URL"]) if os.getenv("LOCI_RATE_LIMIT_REDIS_URL") else None,
+)
+# "reuse" answers a near-duplicate upload with the earlier verdict and no new
+# payout, "reject" refuses it with 409, "off" disables the check.
+NEAR_DUP_POLICY = os.getenv("LOCI_NEAR_DUP_POLICY", "reuse").lower()
+near_dups = NearDuplicateIndex(
+    threshold=int(os.getenv("LOCI_NEAR_DUP_THRESHOLD", "8")),
+    capacity=int(os.getenv("LOCI_NEAR_DUP_CAPACITY", "50000")),
+)
+# Verdict fields a near-duplicate upload reuses from the earlier submission.
+NEAR_DUP_FIELDS = ("vision", "photo_desc", "historian", "vibe", "vibe_score", "treasurer", "reward_usdc", "early_exit")
+skills = shared_registry(
+    Path(__file__).parent / "skills",
+    check_interval=float(os.getenv("LOCI_SKILL_RELOAD_INTERVAL", "2")),
+)
+# Submissions without a known location fall back to the original single
+# Spirit and its filename/wallet keyword rewards, with no budget cap.
+default_spirit = Spirit(
+    "",
+    name="Genius Loci",
+    bounties=[
+        Bounty("ramen", "image", ["ramen"], 1.5),
+        Bounty("closed venue", "image", ["starbucks", "closed"], 0.5),
+        Bounty("civic hazard", "image", ["pothole", "civic"], 2.0),
+        Bounty("civic wallet", "wallet", ["civic"], 2.0),
+    ],
+)
+spirits = SpiritRegistry(os.getenv("LOCI_SPIRIT_DB", str(Path(__file__).parent / "spirits.db")), default_spirit)
+verification_log = VerificationLog(os.getenv("LOCI_VERIFICATION_DB", str(Path(__file__).parent / "verifications.db")))
+
 app = FastAPI()
 
 app.add_middleware(
@@ -36,13 +105,53 @@ app.add_middleware(
 static_dir = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
+@app.on_event("startup")
+async def startup():
+    skills.preload()
+    await vision_cache.sweep()
+    try:
+        await llm_gateway.warmup()
+    except Exception as e:
+        print(f"LLM gateway warmup failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await jobs.aclose()
+    await mock_payouts.drain()
+    await onchain_payouts.drain()
+    await llm_gateway.aclose()
+    await vision_clients.aclose()
+    image_prep.close()
+    spirits.close()
+    await verification_log.aclose()
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html", status_code=307)
 
+@app.get("/api/metrics")
+async def metrics():
+    return {
+        "vision": vision_clients.stats(),
+        "vision_ensemble": dict(vision_clients.ensemble_stats),
+        "vision_cache": vision_cache.snapshot(),
+        "near_duplicates": near_dups.snapshot(),
+        "image_prep": image_prep.snapshot(),
+        "jobs": jobs.snapshot(),
+        "wallet": dict(mock_wallet.stats),
+        "rate_limits": rate_limiter.snapshot(),
+        "payouts": {"mock": mock_payouts.snapshot(), "onchain": onchain_payouts.snapshot()},
+        "llm": dict(llm_gateway.stats),
+        "skills": skills.snapshot(),
+        "early_exit": early_exit_rules.snapshot(),
+        "spirits": spirits.snapshot(),
+        "verification_log": verification_log.snapshot(),
+    }
+
 class LociState(TypedDict):
     image: str
     wallet: str
+    location: str
     vision: str
     photo_desc: str
     historian: str
@@ -53,176 +162,219 @@ class LociState(TypedDict):
     payout_approved: bool
     tx_hash: str
     reward_usdc: float
+    paid_usdc: float
+    duplicate_of: str
+    image_bytes: bytes
+    image_mime: str
+    bytes_saved: int
+    early_exit: str
+
+IMAGE_MAGIC = (b"\xff\xd8", b"\x89PNG\r\n\x1a\n")
+
+def _read_image(image_path: str) -> Optional[bytes]:
+    if not image_path or not os.path.exists(image_path):
+        return None
+    return Path(image_path).read_bytes()
+
+def _image_mime(image_path: str) -> str:
+    ext = os.path.splitext(image_path)[1].lower()
+    return "image/jpeg" if ext in [".jpg", ".jpeg"] else "image/png"
+
+# Swarm mode: LOCI_VISION_ENSEMBLE lists providers ("openai,gemini" or "all")
+# to ask in parallel; the answer is taken once LOCI_VISION_QUORUM of them agree
+# or LOCI_VISION_DEADLINE passes. LOCI_VISION_AGREEMENT is the word overlap two
+# descriptions need to count as agreeing.
+VISION_ENSEMBLE = [p.strip().lower() for p in os.getenv("LOCI_VISION_ENSEMBLE", "").split(",") if p.strip()]
+VISION_QUORUM = float(os.getenv("LOCI_VISION_QUORUM", "2"))
+VISION_DEADLINE = float(os.getenv("LOCI_VISION_DEADLINE", "8"))
+VISION_AGREEMENT = float(os.getenv("LOCI_VISION_AGREEMENT", "0.5"))
+
+def _vision_ensemble() -> List[str]:
+    if not VISION_ENSEMBLE:
+        return []
+    available = vision_clients.available()
+    if VISION_ENSEMBLE == ["all"]:
+        return available
+    return [p for p in VISION_ENSEMBLE if p in available]
+
+def _vision_verdict(desc: str) -> Optional[str]:
+    rule = early_exit_rules.match({"vision": desc})
+    return rule.name if rule is not None else None
+
+def _vision_agree(a: str, b: str) -> bool:
+    # Descriptions that trip different early-exit rules (or one trips a rule
+    # and the other none) disagree; the same rule is agreement. Most photos
+    # trip no rule, and "no rule" is no vote, so those are compared on their
+    # wording instead.
+    va, vb = _vision_verdict(a), _vision_verdict(b)
+    if va != vb:
+        return False
+    if va is not None:
+        return True
+    return description_similarity(a, b) >= VISION_AGREEMENT
 
-def _describe_image(image_path: str) -> str:
+async def _describe_image(image_path: str, data: Optional[bytes] = None, mime: Optional[str] = None) -> str:
     try:
-        openai_key = os.getenv("OPENAI_API_KEY", "")
-        if openai_key and OpenAI is not None:
-            client = OpenAI(api_key=openai_key)
-            system_prompt = "You are the Genius Loci of this venue. Be highly opinionated. Analyze the image for aesthetic quality, lighting, and vibes. Output a concise, character-rich description."
-            if not image_path or not os.path.exists(image_path):
-                r = client.responses.create(model="gpt-5.1", input=[{"role":"system","content":[{"type":"input_text","text":system_prompt}]},{"role":"user","content":[{"type":"input_text","text":"Analyze the image."}]}])
-                try:
-                    return r.output_text or "No description"
-                except Exception:
-                    return "No description"
-            ext = os.path.splitext(image_path)[1].lower()
-            mime = "image/jpeg" if ext in [".jpg", ".jpeg"] else "image/png"
-            data = Path(image_path).read_bytes()
-            if not (data.startswith(b"\xff\xd8") or data.startswith(b"\x89PNG\r\n\x1a\n")):
+        providers = _vision_ensemble()
+        client = vision_clients.get(providers[0] if providers else None)
+        if client.name == "mock":
+            return await vision_clients.describe(None, "", client.name)
+        if data is None:
+            data = await asyncio.to_thread(_read_image, image_path)
+            if data is None:
+                return await vision_clients.describe(None, _image_mime(image_path), client.name)
+            if not data.startswith(IMAGE_MAGIC):
                 return "Invalid image data"
-            b64 = base64.b64encode(data).decode("utf-8")
-            r = client.responses.create(model="gpt-5.1", input=[{"role":"system","content":[{"type":"input_text","text":system_prompt}]},{"role":"user","content":[{"type":"input_text","text":"Analyze this photo for aesthetics, lighting, and vibes."},{"type":"input_image","image_url":f"data:{mime};base64,{b64}"}]}])
-            try:
-                return r.output_text or "No description"
-            except Exception:
-                return "No description"
-        api_key = os.getenv("GEMINI_API_KEY", "")
-        if not api_key:
-            return "I see a delicious bowl of ramen."
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.5-pro")
-        if not image_path or not os.path.exists(image_path):
-            resp = model.generate_content(["Describe this image. Focus on the people and the setting."])
-            return getattr(resp, "text", "No description") or "No description"
-        ext = os.path.splitext(image_path)[1].lower()
-        mime = "image/jpeg" if ext in [".jpg", ".jpeg"] else "image/png"
-        with open(image_path, "rb") as f:
-            data = f.read()
-        if not (data.startswith(b"\xff\xd8") or data.startswith(b"\x89PNG\r\n\x1a\n")):
-            return "Invalid image data"
-        resp = model.generate_content([
-            "Describe this image. Focus on the people and the setting.",
-            {"mime_type": mime, "data": data},
-        ])
-        return getattr(resp, "text", "No description") or "No description"
+        if len(providers) > 1:
+            tag = f"ensemble:{VISION_QUORUM}:{VISION_AGREEMENT}:" + "|".join(vision_clients.get(p).cache_tag for p in providers)
+        else:
+            tag = client.cache_tag
+        key = content_key(data, tag)
+        cached = await vision_cache.get(key)
+        if cached is not None:
+            return cached
+        if len(providers) > 1:
+            result = await vision_clients.ensemble(data, mime or _image_mime(image_path), providers, VISION_QUORUM, VISION_DEADLINE, _vision_agree)
+            desc = result["description"]
+        else:
+            desc = await vision_clients.describe(data, mime or _image_mime(image_path), client.name)
+        if desc != "No description":
+            await vision_cache.put(key, desc)
+        return desc
     except Exception as e:
         return f"Vision error: {e}"
 
-def vision_node(state: LociState) -> LociState:
+async def vision_node(state: LociState) -> LociState:
     img = state.get("image", "")
     base_dir = Path(__file__).parent
     candidate = Path(img)
     if not candidate.is_absolute():
         candidate = base_dir / img
-    desc = _describe_image(str(candidate))
+    desc = await _describe_image(str(candidate), state.get("image_bytes"), state.get("image_mime"))
     return {**state, "vision": desc, "photo_desc": desc}
 
-def _read_prompt(name: str) -> str:
-    p = Path(__file__).parent / "skills" / name / "prompt.md"
+async def _llm_chat(provider: str, model: str, system_prompt: Union[str, Message], user_prompt: str) -> str:
     try:
-        return p.read_text(encoding="utf-8")
-    except Exception:
+        return await llm_gateway.chat(provider, model, system_prompt, user_prompt)
+    except TimeoutError:
         return ""
+    except Exception as e:
+        return f"LLM error: {e}"
 
-def _llm_chat(provider: str, model: str, system_prompt: str, user_prompt: str) -> str:
-    result = {"content": ""}
-    def runner():
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            manager = get_llm_manager()
-            msgs = [
-                Message(role="system", content=system_prompt),
-                Message(role="user", content=user_prompt),
-            ]
-            resp = loop.run_until_complete(manager.chat(msgs, provider=provider, model=model))
-            result["content"] = resp.content or ""
-            loop.close()
-        except Exception as e:
-            result["content"] = f"LLM error: {e}"
-    t = threading.Thread(target=runner, daemon=True)
-    t.start()
-    t.join(timeout=10.0)
-    return result.get("content", "")
-
-def historian_node(state: LociState) -> LociState:
+async def historian_node(state: LociState) -> LociState:
+    if state.get("early_exit"):
+        return state
     v = state.get("vision", "")
-    sys_p = _read_prompt("historian")
+    sys_p = skills.message("historian")
     user_p = f"Image context: {v}\nProvide cultural context and resonance relevant to this photo."
-    out = _llm_chat("gemini", "gemini-2.5-flash", sys_p, user_p)
+    out = await _llm_chat("gemini", "gemini-2.5-flash", sys_p, user_p)
     return {**state, "historian": out}
 
-def vibe_node(state: LociState) -> LociState:
+async def vibe_node(state: LociState) -> LociState:
+    if state.get("early_exit"):
+        return state
     v = state.get("vision", "")
-    sys_p = _read_prompt("vibe")
+    sys_p = skills.message("vibe")
     user_p = f"Image context: {v}\nAssess tone and social acceptability in one short paragraph."
-    out = _llm_chat("gemini", "gemini-2.5-flash", sys_p, user_p)
-    desc = state.get("vision", "")
-    text = desc.lower()
-    score = 72
-    img_path = str(state.get("image", "")).lower()
-    if "bad" in img_path:
-        score = 35
-    elif "good" in img_path:
-        score = 98
-    if ("cinematic lighting" in text) or ("rich texture" in text):
-        score = 98
-    if ("blurry" in text) or ("bland" in text):
-        score = 35
-    return {**state, "vibe": out, "vibe_score": score}
-
-def treasurer_node(state: LociState) -> LociState:
+    out = await _llm_chat("gemini", "gemini-2.5-flash", sys_p, user_p)
+    # The early-exit table is also the score table: with early exit on, a
+    # run only gets here when no rule fired; with it off, the rules still
+    # set the score.
+    return {**state, "vibe": out, "vibe_score": early_exit_rules.score(state, 72)}
+
+# Cheap signals that fix vibe_score on their own, first match wins:
+# description keywords override the filename.
+EARLY_EXIT_DEFAULTS = [
+    {"name": "blurry_description", "field": "vision", "keywords": ["blurry", "bland"], "score": 35},
+    {"name": "cinematic_description", "field": "vision", "keywords": ["cinematic lighting", "rich texture"], "score": 98},
+    {"name": "bad_filename", "field": "image", "keywords": ["bad"], "score": 35},
+    {"name": "good_filename", "field": "image", "keywords": ["good"], "score": 98},
+]
+early_exit_rules = EarlyExitRules.load(os.getenv("LOCI_EARLY_EXIT_RULES", ""), EARLY_EXIT_DEFAULTS)
+
+async def early_exit_node(state: LociState) -> LociState:
+    rule = early_exit_rules.decide(state)
+    if rule is None:
+        return {**state, "early_exit": ""}
+    note = f"Decided by rule {rule.name}"
+    return {**state, "early_exit": rule.name, "vibe_score": rule.score, "historian": note, "vibe": note}
+
+async def treasurer_node(state: LociState) -> LociState:
     score = int(state.get("vibe_score", 0))
     approved = score >= 70
     out = "APPROVE" if approved else "DENY"
-    img = state.get("image", "")
-    amt = 1.0
-    low = str(img).lower()
-    if "ramen" in low:
-        amt = 1.5
-    elif "starbucks" in low or "closed" in low:
-        amt = 0.5
-    elif "pothole" in low or "civic" in low:
-        amt = 2.0
-    w = str(state.get("wallet", "")).lower()
-    if "civic" in w:
-        amt = 2.0
+    amt, _ = spirits.get(state.get("location", "")).reward(str(state.get("image", "")), str(state.get("wallet", "")))
     return {**state, "treasurer": out, "payout_approved": approved, "reward_usdc": amt}
 
-def payout_node(state: LociState) -> LociState:
+async def _settle_mock(transfers: List[Tuple[str, float]]) -> List[dict]:
+    result = await mock_wallet.send_usdc_batch(transfers)
+    common = {"success": result.get("success", False), "tx_hash": result.get("tx_hash", ""), "block": result.get("block"), "batch_size": len(transfers)}
+    return [{**common, **t} for t in result.get("transfers", [])]
+
+async def _settle_onchain(transfers: List[Tuple[str, float]]) -> List[object]:
+    # The workflow tool looks up the signer's nonce itself, so a batch is
+    # broadcast one transfer after another rather than concurrently.
+    tool = CompleteTransactionWorkflowTool()
+    sign_with = os.getenv("PAYOUT_SIGN_WITH", "")
+    rpc_url = os.getenv("WEB3_RPC_URL", "")
+    out: List[object] = []
+    for to_addr, _ in transfers:
+        try:
+            out.append(await tool.execute(sign_with=sign_with, to_address=to_addr, value_wei=str(10**18), enable_broadcast=True, rpc_url=rpc_url))
+        except Exception as e:
+            out.append(e)
+    return out
+
+PAYOUT_BATCH_SIZE = int(os.getenv("LOCI_PAYOUT_BATCH_SIZE", "32"))
+PAYOUT_BATCH_WINDOW = float(os.getenv("LOCI_PAYOUT_BATCH_WINDOW", "0.05"))
+mock_payouts = PayoutBatcher(_settle_mock, max_batch=PAYOUT_BATCH_SIZE, window=PAYOUT_BATCH_WINDOW)
+onchain_payouts = PayoutBatcher(_settle_onchain, max_batch=PAYOUT_BATCH_SIZE, window=PAYOUT_BATCH_WINDOW)
+
+async def payout_node(state: LociState) -> LociState:
     if not state.get("payout_approved", False):
         return {**state, "payout": "Not approved"}
     to_addr = state.get("wallet", "")
     sign_with = os.getenv("PAYOUT_SIGN_WITH", "")
     rpc_url = os.getenv("WEB3_RPC_URL", "")
+    location = state.get("location", "")
     if not to_addr or not sign_with or not rpc_url:
         amt = float(state.get("reward_usdc", 1.0))
         if amt == 1.0:
-            low = str(state.get("image", "")).lower()
-            if "ramen" in low:
-                amt = 1.5
-            elif "starbucks" in low or "closed" in low:
-                amt = 0.5
-            elif "pothole" in low or "civic" in low:
-                amt = 2.0
-            w = str(state.get("wallet", "")).lower()
-            if "civic" in w:
-                amt = 2.0
-        result = mock_wallet.send_usdc(to_addr, amt)
+            amt, _ = spirits.get(location).reward(str(state.get("image", "")), str(state.get("wallet", "")))
+        if not await spirits.reserve(location, amt):
+            return {**state, "payout": "Spirit budget exhausted", "payout_approved": False}
+        try:
+            result = await mock_payouts.submit(to_addr, amt)
+        except Exception:
+            result = {}
         if result.get("success"):
-            return {**state, "payout": result["tx_hash"], "tx_hash": result["tx_hash"], "payout_approved": True}
+            return {**state, "payout": result["tx_hash"], "tx_hash": result["tx_hash"], "payout_approved": True, "paid_usdc": amt}
+        await spirits.release(location, amt)
         return {**state, "payout": "Simulated Transaction Hash: SIM-" + os.urandom(4).hex(), "payout_approved": False}
-    async def _do_workflow():
-        tool = CompleteTransactionWorkflowTool()
-        return await tool.execute(sign_with=sign_with, to_address=to_addr, value_wei=str(10**18), enable_broadcast=True, rpc_url=rpc_url)
+    if not await spirits.reserve(location, 1.0):
+        return {**state, "payout": "Spirit budget exhausted", "payout_approved": False}
     try:
-        result = asyncio.run(_do_workflow())
+        result = await onchain_payouts.submit(to_addr, 1.0)
         if "TxHash:" in result:
             tx = result.split("TxHash:")[1].strip().split("\n")[0]
-            return {**state, "payout": tx}
+            return {**state, "payout": tx, "tx_hash": tx, "paid_usdc": 1.0}
+        # No transaction hash means nothing was broadcast.
+        await spirits.release(location, 1.0)
         return {**state, "payout": result}
     except Exception:
+        await spirits.release(location, 1.0)
         return {**state, "payout": "Simulated Transaction Hash: SIM-" + os.urandom(4).hex()}
 
+NodeFn = Callable[[LociState], Union[LociState, Awaitable[LociState]]]
+
 class StateGraph:
     def __init__(self):
-        self.nodes: Dict[str, Callable[[LociState], LociState]] = {}
+        self.nodes: Dict[str, NodeFn] = {}
         self.edges: Dict[str, List[str]] = {}
         self.entry: Optional[str] = None
         self.exit: Optional[str] = None
 
-    def add_node(self, name: str, fn: Callable[[LociState], LociState]) -> None:
+    def add_node(self, name: str, fn: NodeFn) -> None:
         self.nodes[name] = fn
         if name not in self.edges:
             self.edges[name] = []
@@ -238,32 +390,68 @@ class StateGraph:
     def set_exit(self, name: str) -> None:
         self.exit = name
 
-    def run(self, initial: LociState) -> LociState:
+    @staticmethod
+    async def _call(fn: NodeFn, state: LociState) -> LociState:
+        if inspect.iscoroutinefunction(fn):
+            return await fn(state)
+        return await asyncio.to_thread(fn, state)
+
+    def levels(self) -> List[List[str]]:
         indeg: Dict[str, int] = {n: 0 for n in self.nodes}
         for s, outs in self.edges.items():
             for d in outs:
                 indeg[d] = indeg.get(d, 0) + 1
-        order: List[str] = []
-        q: List[str] = []
         if self.entry:
-            q.append(self.entry)
+            level = [self.entry]
             indeg[self.entry] = 0
         else:
-            q.extend([n for n, d in indeg.items() if d == 0])
+            level = [n for n, d in indeg.items() if d == 0]
+        out: List[List[str]] = []
         seen = set()
-        while q:
-            n = q.pop(0)
-            if n in seen:
-                continue
-            seen.add(n)
-            order.append(n)
-            for d in self.edges.get(n, []):
-                indeg[d] -= 1
-                if indeg[d] == 0:
-                    q.append(d)
+        while level:
+            level = [n for n in dict.fromkeys(level) if n not in seen]
+            if not level:
+                break
+            seen.update(level)
+            out.append(level)
+            nxt: List[str] = []
+            for n in level:
+                for d in self.edges.get(n, []):
+                    indeg[d] -= 1
+                    if indeg[d] == 0:
+                        nxt.append(d)
+            level = nxt
+        return out
+
+    @staticmethod
+    def _delta(before: LociState, after: LociState) -> Dict[str, object]:
+        return {k: v for k, v in after.items() if k not in before or before[k] is not v}
+
+    async def _run_level(self, level: List[str], state: LociState, on_node: Optional[Callable[[str, Dict[str, object]], None]] = None) -> List[Tuple[str, Dict[str, object]]]:
+        fns = [(n, self.nodes[n]) for n in level if self.nodes.get(n)]
+        tasks = {asyncio.ensure_future(self._call(fn, dict(state))): n for n, fn in fns}
+        updates: Dict[str, Dict[str, object]] = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in sorted(done, key=lambda t: level.index(tasks[t])):
+                    n = tasks[t]
+                    updates[n] = self._delta(state, t.result())
+                    if on_node is not None:
+                        on_node(n, updates[n])
+        finally:
+            for t in pending:
+                t.cancel()
+        return [(n, updates[n]) for n, _ in fns]
+
+    async def run(self, initial: LociState, on_node: Optional[Callable[[str, Dict[str, object]], None]] = None) -> LociState:
         def _log(name: str, value: str, s: LociState) -> None:
             if name == "vision":
                 print("👁️ GPT-5.1: Analysis complete.")
+            elif name == "early_exit":
+                if value:
+                    print(f"⚡ EARLY EXIT: {value} · vibe score {s.get('vibe_score')}")
             elif name == "historian":
                 print(f"👻 HISTORIAN: {value}")
             elif name == "vibe":
@@ -286,22 +474,26 @@ class StateGraph:
                 print(f"🔗 PAYOUT: {status} · {value}")
 
         state = initial
-        for n in order:
-            fn = self.nodes.get(n)
-            if fn:
-                state = fn(state)
+        for level in self.levels():
+            # Nodes in a level see the same input state; their updates are
+            # applied in level order so conflicting keys resolve the same way
+            # on every run.
+            for n, update in await self._run_level(level, state, on_node):
+                state = {**state, **update}
                 _log(n, str(state.get(n, "")), state)
         return state
 
 def build_argue_graph() -> StateGraph:
     g = StateGraph()
     g.add_node("vision", vision_node)
+    g.add_node("early_exit", early_exit_node)
     g.add_node("historian", historian_node)
     g.add_node("vibe", vibe_node)
     g.add_node("treasurer", treasurer_node)
     g.add_node("payout", payout_node)
-    g.add_edge("vision", "historian")
-    g.add_edge("vision", "vibe")
+    g.add_edge("vision", "early_exit")
+    g.add_edge("early_exit", "historian")
+    g.add_edge("early_exit", "vibe")
     g.add_edge("historian", "treasurer")
     g.add_edge("vibe", "treasurer")
     g.add_edge("treasurer", "payout")
@@ -327,23 +519,124 @@ def run_argue_demo() -> LociState:
         "reward_usdc": 1.0,
     }
     g = build_argue_graph()
-    final = g.run(initial)
+    final = asyncio.run(g.run(initial))
     print(f"final: {final['payout']}")
     return final
 
 if __name__ == "__main__":
     run_argue_demo()
 
-@app.post("/api/argue")
-async def api_argue(wallet: str = Form(...), file: UploadFile = File(...), mode: str = Form("skills")):
+async def _enforce_rate_limits(wallet: str, location: str) -> None:
+    limited = await rate_limiter.check(wallet=wallet, location=location)
+    if limited is not None:
+        scope, wait = limited
+        retry_after = max(1, math.ceil(wait))
+        raise HTTPException(status_code=429, detail=f"{scope} rate limit exceeded", headers={"Retry-After": str(retry_after)})
+
+UPLOAD_CHUNK = 256 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("LOCI_MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+
+_upload_seq = itertools.count()
+
+def _upload_path(uploads: Path, filename: Optional[str]) -> Path:
+    # Concurrent uploads may share a client filename, so each is stored under
+    # a unique prefix. The prefix is digits only so keyword rules matched
+    # against the path still see just the original name.
+    return uploads / f"{os.getpid()}{time.time_ns()}{next(_upload_seq)}_{Path(filename or 'upload').name}"
+
+async def _save_upload(upload: UploadFile) -> Tuple[Path, bytes]:
+    if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"upload exceeds {MAX_UPLOAD_BYTES} bytes")
     uploads = Path(__file__).parent / "static" / "uploads"
     uploads.mkdir(parents=True, exist_ok=True)
-    dest = uploads / file.filename
-    data = await file.read()
-    dest.write_bytes(data)
-    initial: LociState = {
+    dest = _upload_path(uploads, upload.filename)
+    first = await upload.read(UPLOAD_CHUNK)
+    if not first.startswith(IMAGE_MAGIC):
+        raise HTTPException(status_code=415, detail="upload is not a JPEG or PNG image")
+    buf = bytearray(first)
+    f = await asyncio.to_thread(open, dest, "xb")
+    try:
+        chunk = first
+        while chunk:
+            await asyncio.to_thread(f.write, chunk)
+            chunk = await upload.read(UPLOAD_CHUNK)
+            buf += chunk
+            if len(buf) > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"upload exceeds {MAX_UPLOAD_BYTES} bytes")
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(dest.unlink, True)
+        raise
+    await asyncio.to_thread(f.close)
+    # One copy into bytes: vision clients (Gemini's among them) reject a
+    # bytearray when the original is sent on unchanged.
+    return dest, bytes(buf)
+
+def _log_verification(image_hash: str, final: LociState) -> None:
+    verification_log.append({
+        "ts": time.time(),
+        "image_hash": image_hash,
+        "wallet": final.get("wallet", ""),
+        "location": final.get("location", ""),
+        "vibe_score": int(final.get("vibe_score", 0)),
+        "approved": int(final.get("treasurer") == "APPROVE" and not final.get("duplicate_of")),
+        "reward_usdc": float(final.get("reward_usdc", 0.0)),
+        "paid_usdc": float(final.get("paid_usdc", 0.0)),
+        "tx_hash": final.get("tx_hash", ""),
+        "early_exit": final.get("early_exit", ""),
+        "duplicate_of": final.get("duplicate_of", ""),
+        "vision": final.get("vision", ""),
+    })
+
+async def _verify_submission(initial: LociState, data: bytes, on_node: Optional[Callable[[str, Dict[str, object]], None]] = None) -> LociState:
+    image_hash = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+    final = await _run_verification(initial, data, image_hash, on_node)
+    _log_verification(image_hash, final)
+    return final
+
+async def _run_verification(initial: LociState, data: bytes, image_hash: str, on_node: Optional[Callable[[str, Dict[str, object]], None]] = None) -> LociState:
+    data, mime, saved = await image_prep.prepare(data)
+    if mime:
+        initial = {**initial, "image_bytes": data, "image_mime": mime, "bytes_saved": saved}
+    h = await asyncio.to_thread(dhash, data) if NEAR_DUP_POLICY != "off" else None
+    ticket = None
+    if h is not None:
+        prior, ticket = await near_dups.claim(h)
+        if prior is not None:
+            # duplicate_of is the earlier upload's image hash, as recorded in
+            # the verification log.
+            if NEAR_DUP_POLICY == "reject":
+                raise HTTPException(status_code=409, detail={"error": "near-duplicate upload", "duplicate_of": prior["image_hash"], "distance": prior["distance"]})
+            return {
+                **{k: prior[k] for k in NEAR_DUP_FIELDS},
+                "image": initial["image"],
+                "wallet": initial["wallet"],
+                "location": initial.get("location", ""),
+                "payout": "Duplicate submission · no payout",
+                "payout_approved": False,
+                "tx_hash": "",
+                "duplicate_of": prior["image_hash"],
+                "bytes_saved": saved,
+            }
+    try:
+        final = await build_argue_graph().run(initial, on_node)
+    except BaseException:
+        if ticket is not None:
+            near_dups.settle(ticket, None)
+        raise
+    vision = str(final.get("vision", ""))
+    final.pop("image_bytes", None)
+    if ticket is not None:
+        ok = not vision.startswith(("Vision error", "Invalid image data"))
+        near_dups.settle(ticket, {"image_hash": image_hash, **{k: final.get(k) for k in NEAR_DUP_FIELDS}} if ok else None)
+    return final
+
+def _argue_initial(dest: Path, data: bytes, wallet: str, location: str = "") -> LociState:
+    return {
         "image": str(dest),
+        "image_bytes": data,
         "wallet": wallet,
+        "location": location,
         "vision": "",
         "photo_desc": "",
         "historian": "",
@@ -355,8 +648,8 @@ async def api_argue(wallet: str = Form(...), file: UploadFile = File(...), mode:
         "tx_hash": "",
         "reward_usdc": 1.0,
     }
-    g = build_argue_graph()
-    final = g.run(initial)
+
+def _argue_response(final: LociState, mode: str) -> Dict[str, object]:
     return {
         "mode_used": mode,
         "vision": final.get("vision", ""),
@@ -369,18 +662,155 @@ async def api_argue(wallet: str = Form(...), file: UploadFile = File(...), mode:
         "payout_approved": final.get("payout_approved", False),
         "tx_hash": final.get("tx_hash", ""),
         "reward_usdc": final.get("reward_usdc", 1.0),
+        "duplicate_of": final.get("duplicate_of", ""),
+        "bytes_saved": final.get("bytes_saved", 0),
+        "early_exit": final.get("early_exit", ""),
     }
 
+@app.post("/api/argue")
+async def api_argue(wallet: str = Form(...), file: UploadFile = File(...), mode: str = Form("skills"), location: str = Form("")):
+    await _enforce_rate_limits(wallet, location)
+    dest, data = await _save_upload(file)
+    initial = _argue_initial(dest, data, wallet, location)
+    final = await _verify_submission(initial, data)
+    return _argue_response(final, mode)
+
+@app.post("/api/argue/stream")
+async def api_argue_stream(wallet: str = Form(...), file: UploadFile = File(...), mode: str = Form("skills"), location: str = Form("")):
+    await _enforce_rate_limits(wallet, location)
+    dest, data = await _save_upload(file)
+    initial = _argue_initial(dest, data, wallet, location)
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_node(name: str, update: Dict[str, object]) -> None:
+        events.put_nowait(("node", {"node": name, **{k: v for k, v in update.items() if k not in ("image_bytes", "image_mime")}}))
+
+    async def run() -> None:
+        try:
+            final = await _verify_submission(initial, data, on_node)
+            events.put_nowait(("result", _argue_response(final, mode)))
+        except HTTPException as e:
+            events.put_nowait(("error", {"status": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            events.put_nowait(("error", {"status": 500, "detail": str(e)}))
+
+    async def sse():
+        # The run is not cancelled if the client goes away: a payout may
+        # already be in flight and must be allowed to settle.
+        task = asyncio.create_task(run())
+        while True:
+            kind, payload = await events.get()
+            yield f"event: {kind}\ndata: {json.dumps(payload, default=str)}\n\n"
+            if kind != "node":
+                break
+        await task
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(wallet: str = Form(...), file: UploadFile = File(...), mode: str = Form("skills"), location: str = Form("")):
+    await _enforce_rate_limits(wallet, location)
+    dest, data = await _save_upload(file)
+    initial = _argue_initial(dest, data, wallet, location)
+
+    async def verify() -> Dict[str, object]:
+        return _argue_response(await _verify_submission(initial, data), mode)
+
+    try:
+        job_id = jobs.submit(verify)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"verification queue full: {e}", headers={"Retry-After": "5"})
+    return {"job_id": job_id, "status": "queued", "queue_depth": jobs.snapshot()["queue_depth"]}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0.0):
+    job = await jobs.wait(job_id, min(max(wait, 0.0), 30.0))
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown job")
+    return job
+
+class BountyIn(BaseModel):
+    title: str = ""
+    match: str = "image"
+    keywords: List[str]
+    reward_usdc: float
+    active: bool = True
+
+class SpiritIn(BaseModel):
+    location_id: str
+    name: str = ""
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    wallet: str = ""
+    default_reward: float = 1.0
+    budget_usdc: Optional[float] = None
+    bounties: List[BountyIn] = []
+
+# The spirit and bounty readers walk in-memory dicts that upsert mutates on
+# the event loop, so they are async (run on the loop) rather than sync
+# handlers in the threadpool.
+@app.get("/api/spirits")
+async def list_spirits(offset: int = 0, limit: int = 100):
+    limit = min(max(limit, 1), 1000)
+    return {"total": len(spirits), "spirits": [s.to_dict() for s in spirits.list(max(offset, 0), limit)]}
+
+@app.get("/api/spirits/{location_id}")
+async def get_spirit(location_id: str):
+    spirit = spirits.find(location_id)
+    if spirit is None:
+        raise HTTPException(status_code=404, detail="unknown location")
+    return spirit.to_dict()
+
+@app.post("/api/spirits")
+async def put_spirit(body: SpiritIn):
+    if not body.location_id:
+        raise HTTPException(status_code=400, detail="location_id is required")
+    if any(b.match not in ("image", "wallet") for b in body.bounties):
+        raise HTTPException(status_code=400, detail="bounty match must be 'image' or 'wallet'")
+    bounties = [Bounty(b.title, b.match, b.keywords, b.reward_usdc, b.active) for b in body.bounties]
+    spirit = Spirit(body.location_id, body.name, body.lat, body.lon, body.wallet, body.default_reward, body.budget_usdc, bounties=bounties)
+    try:
+        return (await spirits.upsert(spirit)).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+MAX_BOUNTY_RADIUS_M = float(os.getenv("LOCI_MAX_BOUNTY_RADIUS_M", "50000"))
+
+@app.get("/api/bounties")
+async def nearby_bounties(lat: float, lon: float, radius: float = 1000.0, limit: int = 50):
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="invalid coordinates")
+    radius = min(max(radius, 0.0), MAX_BOUNTY_RADIUS_M)
+    out = []
+    for spirit, d in spirits.nearby(lat, lon, radius, min(max(limit, 1), 500)):
+        entry = spirit.to_dict()
+        entry["bounties"] = [b for b in entry["bounties"] if b["active"]]
+        entry["distance_m"] = round(d, 1)
+        out.append(entry)
+    return {"lat": lat, "lon": lon, "radius_m": radius, "spirits": out}
+
+@app.get("/api/verifications")
+async def list_verifications(wallet: Optional[str] = None, location: Optional[str] = None, image_hash: Optional[str] = None, hours: float = 24.0, limit: int = 100):
+    since = time.time() - max(hours, 0.0) * 3600
+    return {"verifications": await verification_log.recent(wallet, location, image_hash, since, min(max(limit, 1), 1000))}
+
+@app.get("/api/verifications/wallets/{wallet}")
+async def wallet_payouts(wallet: str, hours: float = 24.0):
+    return await verification_log.payouts_by_wallet(wallet, time.time() - max(hours, 0.0) * 3600)
+
+@app.get("/api/verifications/locations")
+async def location_verification_stats(location: Optional[str] = None, limit: int = 100):
+    return {"locations": await verification_log.location_stats(location, min(max(limit, 1), 1000))}
+
 @app.post("/upload_bounty")
-async def upload_bounty(wallet: str = Form(...), photo: UploadFile = File(...)):
-    uploads = Path(__file__).parent / "static" / "uploads"
-    uploads.mkdir(parents=True, exist_ok=True)
-    dest = uploads / photo.filename
-    data = await photo.read()
-    dest.write_bytes(data)
+async def upload_bounty(wallet: str = Form(...), photo: UploadFile = File(...), location: str = Form("")):
+    await _enforce_rate_limits(wallet, location)
+    dest, data = await _save_upload(photo)
     initial: LociState = {
         "image": str(dest),
+        "image_bytes": data,
         "wallet": wallet,
+        "location": location,
         "vision": "",
         "historian": "",
         "vibe": "",
@@ -388,11 +818,13 @@ async def upload_bounty(wallet: str = Form(...), photo: UploadFile = File(...)):
         "payout": "",
         "payout_approved": False,
     }
-    g = build_argue_graph()
-    final = g.run(initial)
+    final = await _verify_submission(initial, data)
     return {
         "vision_desc": final.get("vision", ""),
         "vibe_score": final.get("vibe_score", 0),
         "approved": final.get("payout_approved", False),
         "tx_hash": final.get("tx_hash", final.get("payout", "")),
+        "duplicate_of": final.get("duplicate_of", ""),
+        "bytes_saved": final.get("bytes_saved", 0),
+        "early_exit": final.get("early_exit", ""),
     }
\ No newline at end of file
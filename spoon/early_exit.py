@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class Rule:
+    def __init__(self, name: str, field: str, keywords: Iterable[str], score: int):
+        self.name = name
+        self.field = field
+        self.keywords = tuple(k.lower() for k in keywords)
+        self.score = int(score)
+
+    def matches(self, state: dict) -> bool:
+        text = str(state.get(self.field, "")).lower()
+        return any(k in text for k in self.keywords)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "field": self.field, "keywords": list(self.keywords), "score": self.score}
+
+
+class EarlyExitRules:
+    def __init__(self, rules: List[Rule], enabled: bool = True):
+        # Rules are tried in order; the first match decides the score.
+        # Disabled rules still score (see score()) but never end a run early.
+        self.rules = rules
+        self.enabled = enabled
+        self.stats: Dict[str, int] = {"checked": 0, "undecided": 0, **{r.name: 0 for r in rules}}
+
+    @classmethod
+    def load(cls, spec: str, defaults: List[dict]) -> "EarlyExitRules":
+        # spec: "" for the defaults, a JSON list, or a path to a JSON file.
+        # "off" keeps the defaults for scoring but never exits early.
+        spec = spec.strip()
+        enabled = spec.lower() != "off"
+        if not spec or not enabled:
+            raw = defaults
+        elif spec.startswith("["):
+            raw = json.loads(spec)
+        else:
+            raw = json.loads(Path(spec).read_text(encoding="utf-8"))
+        return cls([Rule(r["name"], r["field"], r["keywords"], r["score"]) for r in raw], enabled=enabled)
+
+    def _first(self, state: dict) -> Optional[Rule]:
+        return next((rule for rule in self.rules if rule.matches(state)), None)
+
+    def match(self, state: dict) -> Optional[Rule]:
+        if not self.enabled:
+            return None
+        return self._first(state)
+
+    def score(self, state: dict, default: int) -> int:
+        rule = self._first(state)
+        return rule.score if rule is not None else default
+
+    def decide(self, state: dict) -> Optional[Rule]:
+        if not self.enabled:
+            return None
+        self.stats["checked"] += 1
+        rule = self.match(state)
+        self.stats[rule.name if rule is not None else "undecided"] += 1
+        return rule
+
+    def snapshot(self) -> dict:
+        return {"enabled": self.enabled, "fired": dict(self.stats), "rules": [r.to_dict() for r in self.rules]}
@@ -0,0 +1,103 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEG_LAT = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    def __init__(self, cell_deg: float = 0.01, levels: int = 3):
+        # Nested lat/lon grids, each ten times coarser than the last; 0.01
+        # degrees is about 1.1 km north-south. Every occupied cell maps
+        # key -> (lat, lon, lat radians, lon radians, cos lat). A query walks
+        # the finest grid that covers its radius in a few hundred cells.
+        self.cell_deg = cell_deg
+        self._sizes = [cell_deg * 10 ** i for i in range(levels)]
+        self._cols = [int(math.ceil(360 / size)) for size in self._sizes]
+        self._grids: List[Dict[Tuple[int, int], Dict[str, Tuple[float, ...]]]] = [{} for _ in self._sizes]
+        self._points: Dict[str, Tuple[float, ...]] = {}
+
+    def _cell(self, level: int, lat: float, lon: float) -> Tuple[int, int]:
+        size = self._sizes[level]
+        return int(math.floor((lat + 90) / size)), int(math.floor((lon + 180) / size)) % self._cols[level]
+
+    def insert(self, key: str, lat: float, lon: float) -> None:
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"invalid coordinates {lat}, {lon}")
+        self.remove(key)
+        rlat = math.radians(lat)
+        point = self._points[key] = (lat, lon, rlat, math.radians(lon), math.cos(rlat))
+        for level, grid in enumerate(self._grids):
+            grid.setdefault(self._cell(level, lat, lon), {})[key] = point
+
+    def remove(self, key: str) -> None:
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        for level, grid in enumerate(self._grids):
+            cell = self._cell(level, point[0], point[1])
+            bucket = grid[cell]
+            del bucket[key]
+            if not bucket:
+                del grid[cell]
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        point = self._points.get(key)
+        return None if point is None else point[:2]
+
+    def _candidate_cells(self, lat: float, lon: float, radius_m: float) -> Iterable[Dict[str, Tuple[float, ...]]]:
+        dlat = radius_m / METERS_PER_DEG_LAT
+        # A circle around a pole spans every column. Otherwise its widest
+        # longitude offset is asin(sin r / cos lat), padded a little against
+        # rounding at the cell edges.
+        ratio = math.sin(math.radians(dlat)) / max(math.cos(math.radians(lat)), 1e-12)
+        if abs(lat) + dlat >= 90 or ratio >= 1:
+            dlon = 360.0
+        else:
+            dlon = math.degrees(math.asin(ratio)) * (1 + 1e-9) + 1e-9
+        for level, size in enumerate(self._sizes):
+            n = self._cols[level]
+            rows = range(int(math.floor((max(-90.0, lat - dlat) + 90) / size)), int(math.floor((min(90.0, lat + dlat) + 90) / size)) + 1)
+            if dlon >= 180:
+                cols = range(n)
+            else:
+                first = int(math.floor((lon - dlon + 180) / size))
+                cols = range(first, min(int(math.floor((lon + dlon + 180) / size)), first + n - 1) + 1)
+            if len(rows) * len(cols) <= 256 or level == len(self._sizes) - 1:
+                break
+        grid = self._grids[level]
+        if len(rows) * len(cols) > len(grid):
+            # Fewer cells are occupied than the radius covers; walk those.
+            lo, hi = rows.start, rows.stop - 1
+            return (b for (r, _), b in grid.items() if lo <= r <= hi)
+        cols = [c % n for c in cols]
+        return (b for b in (grid.get((r, c)) for r in rows for c in cols) if b is not None)
+
+    def near(self, lat: float, lon: float, radius_m: float, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        # Compare on the haversine "a" term, which grows with distance, and
+        # only take the arcsine for the points that are returned.
+        rlat, rlon = math.radians(lat), math.radians(lon)
+        coslat = math.cos(rlat)
+        a_max = math.sin(min(math.pi, radius_m / EARTH_RADIUS_M) / 2) ** 2
+        sin, hits = math.sin, []
+        for bucket in self._candidate_cells(lat, lon, radius_m):
+            for key, (_, _, plat, plon, pcos) in bucket.items():
+                a = sin((plat - rlat) / 2) ** 2 + coslat * pcos * sin((plon - rlon) / 2) ** 2
+                if a <= a_max:
+                    hits.append((a, key))
+        best = heapq.nsmallest(limit, hits) if limit is not None else sorted(hits)
+        return [(key, 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))) for a, key in best]
+
+    def snapshot(self) -> dict:
+        return {"points": len(self._points), "cells": [len(g) for g in self._grids], "cell_deg": self._sizes}
@@ -0,0 +1,92 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except Exception:
+    Image = None
+
+MIME_BY_FORMAT = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+SOURCE_MIME = {**MIME_BY_FORMAT, "PNG": "image/png"}
+
+
+def _flatten(im: "Image.Image") -> "Image.Image":
+    # Transparent pixels go on white; a plain convert("RGB") turns them black.
+    if im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info):
+        im = im.convert("RGBA")
+        bg = Image.new("RGB", im.size, (255, 255, 255))
+        bg.paste(im, mask=im.getchannel("A"))
+        return bg
+    if im.mode not in ("RGB", "L"):
+        return im.convert("RGB")
+    return im
+
+
+def prepare_image(data: bytes, max_side: int = 1536, quality: int = 85, fmt: str = "JPEG") -> Tuple[Optional[bytes], str]:
+    # Runs in a worker process. exif_transpose bakes the orientation into the
+    # pixels; the re-encode then writes no EXIF block at all. Returns None
+    # when the original should be sent as is: it is already within max_side
+    # with no EXIF, or it has no EXIF and re-encoding would not shrink it.
+    with Image.open(io.BytesIO(data)) as im:
+        source = SOURCE_MIME.get(im.format)
+        keepable = source is not None and "exif" not in im.info
+        if keepable and max(im.size) <= max_side:
+            return None, source
+        im.draft("RGB", (max_side, max_side))
+        im = _flatten(ImageOps.exif_transpose(im))
+        im.thumbnail((max_side, max_side), Image.LANCZOS)
+        out = io.BytesIO()
+        im.save(out, fmt, quality=quality, optimize=True)
+    if keepable and out.tell() >= len(data):
+        return None, source
+    return out.getvalue(), MIME_BY_FORMAT[fmt]
+
+
+class ImagePreprocessor:
+    def __init__(self, max_side: int = 1536, quality: int = 85, fmt: str = "JPEG", workers: Optional[int] = None):
+        self.max_side = max_side
+        self.quality = quality
+        self.fmt = fmt.upper()
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"images": 0, "kept": 0, "failures": 0, "bytes_in": 0, "bytes_out": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None and self.fmt in MIME_BY_FORMAT
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def prepare(self, data: bytes) -> Tuple[bytes, Optional[str], int]:
+        if not self.enabled:
+            return data, None, 0
+        loop = asyncio.get_running_loop()
+        try:
+            out, mime = await loop.run_in_executor(self._executor(), prepare_image, data, self.max_side, self.quality, self.fmt)
+        except Exception:
+            self.stats["failures"] += 1
+            return data, None, 0
+        self.stats["images"] += 1
+        self.stats["bytes_in"] += len(data)
+        if out is None:
+            self.stats["kept"] += 1
+            self.stats["bytes_out"] += len(data)
+            return data, mime, 0
+        self.stats["bytes_out"] += len(out)
+        return out, mime, len(data) - len(out)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "bytes_saved": self.stats["bytes_in"] - self.stats["bytes_out"], "max_side": self.max_side, "format": self.fmt}
+
+    def close(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
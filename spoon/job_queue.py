@@ -0,0 +1,99 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, workers: int = 4, max_pending: int = 100, max_finished: int = 1000):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished: Deque[str] = deque()
+        self._events: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def _start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, fn: Callable[[], Awaitable[Any]]) -> str:
+        self._start()
+        job_id = uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((job_id, fn))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFull(f"{self._queue.qsize()} jobs already queued")
+        self.jobs[job_id] = {"job_id": job_id, "status": "queued", "submitted_at": time.time(), "started_at": None, "finished_at": None, "result": None, "error": None}
+        self._events[job_id] = asyncio.Event()
+        self.stats["submitted"] += 1
+        return job_id
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job_id, fn = await queue.get()
+            job = self.jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            self._running += 1
+            try:
+                job["result"] = await fn()
+                job["status"] = "done"
+                self.stats["completed"] += 1
+            except asyncio.CancelledError:
+                job["status"] = "cancelled"
+                raise
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = getattr(e, "detail", None) or str(e)
+                self.stats["failed"] += 1
+            finally:
+                self._running -= 1
+                job["finished_at"] = time.time()
+                self._events.pop(job_id).set()
+                queue.task_done()
+                self._trim(job_id)
+
+    def _trim(self, job_id: str) -> None:
+        self._finished.append(job_id)
+        while len(self._finished) > self.max_finished:
+            self.jobs.pop(self._finished.popleft(), None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        event = self._events.get(job_id)
+        if event is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.jobs.get(job_id)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+        }
+
+    async def aclose(self) -> None:
+        tasks, self._tasks, self._queue = self._tasks, [], None
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Callable, Optional, Union
+
+from spoon_ai.llm.manager import LLMManager
+from spoon_ai.schema import Message
+
+
+class LLMGateway:
+    def __init__(self, manager_factory: Callable[[], LLMManager] = LLMManager, max_concurrency: int = 32, default_timeout: float = 10.0):
+        self.manager_factory = manager_factory
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._manager: Optional[LLMManager] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._closing: set = set()
+        self.stats = {"calls": 0, "ok": 0, "timeouts": 0, "errors": 0, "in_flight": 0, "total_s": 0.0, "rebinds": 0}
+
+    def _bind(self) -> LLMManager:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Provider HTTP clients and the manager's locks belong to the loop
+            # they were first used on, so a new loop gets a fresh manager from
+            # the factory (which must not hand back a shared instance).
+            old, old_loop = self._manager, self._loop
+            self._manager = self.manager_factory()
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            if old is not None and old is not self._manager:
+                self.stats["rebinds"] += 1
+                self._retire(old, old_loop)
+        return self._manager
+
+    def _retire(self, manager: LLMManager, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        # Close the old manager's clients on their own loop if it still runs,
+        # otherwise best effort on this one.
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._cleanup(manager), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._cleanup(manager))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _cleanup(manager: LLMManager) -> None:
+        try:
+            await manager.cleanup()
+        except Exception as e:
+            print(f"llm gateway: cleanup of previous manager failed: {e}")
+
+    async def chat(self, provider: str, model: str, system_prompt: Union[str, Message], user_prompt: str, timeout: Optional[float] = None) -> str:
+        manager = self._bind()
+        if not isinstance(system_prompt, Message):
+            system_prompt = Message(role="system", content=system_prompt)
+        msgs = [
+            system_prompt,
+            Message(role="user", content=user_prompt),
+        ]
+        self.stats["calls"] += 1
+        t0 = time.perf_counter()
+        try:
+            # The deadline also covers the wait for a slot; on expiry the
+            # provider call is cancelled rather than left running.
+            async with asyncio.timeout(timeout or self.default_timeout):
+                async with self._sem:
+                    self.stats["in_flight"] += 1
+                    try:
+                        resp = await manager.chat(msgs, provider=provider, model=model)
+                    finally:
+                        self.stats["in_flight"] -= 1
+        except TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["total_s"] += time.perf_counter() - t0
+        self.stats["ok"] += 1
+        return resp.content or ""
+
+    async def warmup(self) -> None:
+        self._bind()
+
+    async def aclose(self) -> None:
+        manager, self._manager, self._loop, self._sem = self._manager, None, None, None
+        if manager is not None:
+            await manager.cleanup()
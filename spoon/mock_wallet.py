@@ -1,27 +1,110 @@
-import time
+import asyncio
+import itertools
+import math
 import random
+import threading
+from typing import Optional
+
+
+class LatencyDistribution:
+    def __init__(self, kind: str = "uniform", low: float = 0.6, high: float = 1.5, sigma: float = 0.4):
+        self.kind = kind
+        self.low = low
+        self.high = high
+        self.sigma = sigma
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        # "uniform:LOW:HIGH", "lognormal:MEDIAN:MAX[:SIGMA]" or "fixed:SECONDS"
+        kind, *args = spec.split(":")
+        nums = [float(a) for a in args]
+        if kind == "fixed":
+            return cls("fixed", nums[0], nums[0])
+        if kind == "lognormal":
+            return cls("lognormal", nums[0], nums[1], nums[2] if len(nums) > 2 else 0.4)
+        return cls("uniform", nums[0], nums[1])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.low
+        if self.kind == "lognormal":
+            # low is the median; high caps the long tail.
+            return min(self.high, rng.lognormvariate(math.log(self.low), self.sigma))
+        return rng.uniform(self.low, self.high)
+
 
 class MockEVMWallet:
-    def __init__(self):
+    def __init__(self, latency: Optional[LatencyDistribution] = None, failure_rate: float = 0.0, seed: Optional[int] = None, verbose: bool = True):
         self.block = 849201
         self.total_sent = 0.0
         self.balances = {}
+        self.latency = latency or LatencyDistribution()
+        self.failure_rate = failure_rate
+        self.verbose = verbose
+        self._rng = random.Random(seed)
+        self._nonce = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"tx": 0, "transfers": 0, "failures": 0}
+
+    def _credit(self, to_address: str, amount_usdc: float) -> float:
+        with self._lock:
+            self.total_sent += float(amount_usdc)
+            self.balances[to_address] = self.balances.get(to_address, 0.0) + float(amount_usdc)
+            return self.balances[to_address]
+
+    async def _broadcast(self, n_transfers: int) -> Optional[str]:
+        delay = self.latency.sample(self._rng)
+        # Signing and broadcast take roughly two thirds of the delay; the rest
+        # is waiting for the confirmation.
+        await asyncio.sleep(delay * 2 / 3)
+        gas = 0.00032 + 0.00004 * max(0, n_transfers - 1) + self._rng.random() * 0.00005
+        if self.verbose:
+            suffix = f" for {n_transfers} transfers" if n_transfers > 1 else ""
+            print(f"⚡ [GAS] {gas:.5f} ETH burned{suffix}")
+        await asyncio.sleep(delay / 3)
+        if self._rng.random() < self.failure_rate:
+            with self._lock:
+                self.stats["failures"] += 1
+            return None
+        nonce = next(self._nonce)
+        with self._lock:
+            self.stats["tx"] += 1
+            self.stats["transfers"] += n_transfers
+        return "0x" + (f"MOCK{nonce:08d}" + "%08x" % self._rng.getrandbits(32)).ljust(64, "0")
 
-    def send_usdc(self, to_address: str, amount_usdc: float = 1.0) -> dict:
-        time.sleep(0.4 + random.random() * 0.6)
-        gas = 0.00032 + random.random() * 0.00005
-        print(f"⚡ [GAS] {gas:.5f} ETH burned")
-        time.sleep(0.2 + random.random() * 0.3)
-        tx_hash = "0x" + ("MOCK" + str(int(random.random() * 1e8))).ljust(64, "0")
-        self.total_sent += float(amount_usdc)
-        self.balances[to_address] = self.balances.get(to_address, 0.0) + float(amount_usdc)
-        print(f"✅ [CONFIRMED] Block #{self.block}. Sent {amount_usdc} USDC.")
-        print(f"🏦 [USDC] Balance for {to_address}: {self.balances[to_address]:.2f} · Total sent: {self.total_sent:.2f}")
+    async def send_usdc(self, to_address: str, amount_usdc: float = 1.0) -> dict:
+        tx_hash = await self._broadcast(1)
+        if tx_hash is None:
+            return {"success": False, "error": "transaction reverted", "amount_usdc": amount_usdc}
+        balance = self._credit(to_address, amount_usdc)
+        if self.verbose:
+            print(f"✅ [CONFIRMED] Block #{self.block}. Sent {amount_usdc} USDC.")
+            print(f"🏦 [USDC] Balance for {to_address}: {balance:.2f} · Total sent: {self.total_sent:.2f}")
         return {
             "success": True,
             "tx_hash": tx_hash,
             "block": self.block,
             "amount_usdc": amount_usdc,
-            "balance": self.balances[to_address],
+            "balance": balance,
+            "total_sent": self.total_sent,
+        }
+
+    async def send_usdc_batch(self, transfers: list) -> dict:
+        # One multisend transaction: a single signing/broadcast delay and gas
+        # charge however many transfers it carries.
+        tx_hash = await self._broadcast(len(transfers))
+        if tx_hash is None:
+            return {"success": False, "error": "transaction reverted", "transfers": [{"to_address": t, "amount_usdc": a} for t, a in transfers]}
+        results = []
+        for to_address, amount_usdc in transfers:
+            balance = self._credit(to_address, amount_usdc)
+            results.append({"to_address": to_address, "amount_usdc": amount_usdc, "balance": balance})
+        if self.verbose:
+            print(f"✅ [CONFIRMED] Block #{self.block}. Sent {sum(float(a) for _, a in transfers)} USDC in {len(transfers)} transfers.")
+        return {
+            "success": True,
+            "tx_hash": tx_hash,
+            "block": self.block,
+            "transfers": results,
             "total_sent": self.total_sent,
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,64 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+Transfer = Tuple[str, float]
+
+
+class PayoutBatcher:
+    def __init__(self, settle: Callable[[List[Transfer]], Awaitable[List[Any]]], max_batch: int = 32, window: float = 0.05):
+        self.settle = settle
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: List[Tuple[Transfer, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        self.stats = {"transfers": 0, "batches": 0, "failed_batches": 0, "largest_batch": 0}
+
+    async def submit(self, to_address: str, amount_usdc: float) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(((to_address, amount_usdc), fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._settle(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _settle(self, batch: List[Tuple[Transfer, asyncio.Future]]) -> None:
+        self.stats["batches"] += 1
+        self.stats["transfers"] += len(batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        try:
+            results = await self.settle([t for t, _ in batch])
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            if fut.done():
+                continue
+            if isinstance(result, BaseException):
+                fut.set_exception(result)
+            else:
+                fut.set_result(result)
+
+    def snapshot(self) -> dict:
+        batches = self.stats["batches"]
+        return {**self.stats, "pending": len(self._pending), "mean_batch": (self.stats["transfers"] / batches) if batches else 0.0, "max_batch": self.max_batch, "window_s": self.window}
+
+    async def drain(self) -> None:
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
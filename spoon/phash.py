@@ -0,0 +1,164 @@
+import asyncio
+import io
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None
+
+
+def dhash(data: bytes, size: int = 8) -> Optional[int]:
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            im.draft("L", (size * 4, size * 4))
+            px = list(im.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(size):
+        base = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+class MultiIndexHash:
+    # Splits each 64-bit hash into radius + 1 chunks. Two hashes within the
+    # radius must agree exactly on at least one chunk, so only entries sharing
+    # a chunk value are compared. With a capacity, slots form a ring and the
+    # oldest entry is overwritten.
+    def __init__(self, radius: int, bits: int = 64, capacity: Optional[int] = None):
+        n = radius + 1
+        edges = [bits * i // n for i in range(n + 1)]
+        self.radius = radius
+        self.capacity = capacity
+        self._spans = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self._tables: List[Dict[int, Set[int]]] = [{} for _ in self._spans]
+        self._hashes: List[Optional[int]] = []
+        self._values: List[Any] = []
+        self._next = 0
+        self._count = 0
+
+    @property
+    def size(self) -> int:
+        return self._count
+
+    def _link(self, i: int, h: int) -> None:
+        for table, (shift, mask) in zip(self._tables, self._spans):
+            table.setdefault((h >> shift) & mask, set()).add(i)
+
+    def _unlink(self, i: int, h: int) -> None:
+        for table, (shift, mask) in zip(self._tables, self._spans):
+            chunk = (h >> shift) & mask
+            slots = table.get(chunk)
+            if slots is not None:
+                slots.discard(i)
+                if not slots:
+                    del table[chunk]
+
+    def add(self, h: int, value: Any) -> int:
+        if self.capacity is None or len(self._hashes) < self.capacity:
+            i = len(self._hashes)
+            self._hashes.append(h)
+            self._values.append(value)
+        else:
+            i = self._next
+            if self._hashes[i] is not None:
+                self._unlink(i, self._hashes[i])
+                self._count -= 1
+            self._hashes[i] = h
+            self._values[i] = value
+        if self.capacity:
+            self._next = (i + 1) % self.capacity
+        self._link(i, h)
+        self._count += 1
+        return i
+
+    def get(self, i: int) -> Any:
+        return self._values[i] if i < len(self._values) else None
+
+    def replace(self, i: int, value: Any) -> None:
+        self._values[i] = value
+
+    def remove(self, i: int) -> None:
+        h = self._hashes[i]
+        if h is not None:
+            self._unlink(i, h)
+            self._hashes[i] = None
+            self._values[i] = None
+            self._count -= 1
+
+    def search(self, h: int) -> List[Tuple[int, Any]]:
+        seen = set()
+        out: List[Tuple[int, Any]] = []
+        for table, (shift, mask) in zip(self._tables, self._spans):
+            for i in table.get((h >> shift) & mask, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                d = (h ^ self._hashes[i]).bit_count()
+                if d <= self.radius:
+                    out.append((d, self._values[i]))
+        out.sort(key=lambda x: x[0])
+        return out
+
+
+Ticket = Tuple[int, "asyncio.Future"]
+
+
+class NearDuplicateIndex:
+    # Holds compact verdict records for the most recent `capacity` uploads.
+    # An upload that is still being verified holds a pending slot, so a
+    # near-duplicate arriving meanwhile waits for its verdict instead of
+    # being verified (and paid) a second time.
+    def __init__(self, threshold: int = 8, capacity: int = 50_000):
+        self.threshold = threshold
+        self.capacity = capacity
+        self._index = MultiIndexHash(threshold, capacity=capacity)
+        self.stats = {"lookups": 0, "matches": 0, "waited": 0, "abandoned": 0}
+
+    def find(self, h: int) -> Optional[Dict[str, Any]]:
+        self.stats["lookups"] += 1
+        for dist, record in self._index.search(h):
+            if isinstance(record, dict):
+                self.stats["matches"] += 1
+                return {**record, "distance": dist}
+        return None
+
+    async def claim(self, h: int) -> Tuple[Optional[Dict[str, Any]], Optional[Ticket]]:
+        # Returns the earlier record, or a ticket the caller must settle.
+        while True:
+            self.stats["lookups"] += 1
+            hits = self._index.search(h)
+            if not hits:
+                fut = asyncio.get_running_loop().create_future()
+                return None, (self._index.add(h, fut), fut)
+            dist, record = hits[0]
+            if isinstance(record, asyncio.Future):
+                self.stats["waited"] += 1
+                await asyncio.shield(record)
+                continue
+            self.stats["matches"] += 1
+            return {**record, "distance": dist}, None
+
+    def settle(self, ticket: Ticket, record: Optional[Dict[str, Any]]) -> None:
+        # None drops the pending slot (the upload failed), so the next
+        # near-duplicate is verified on its own.
+        slot, fut = ticket
+        if self._index.get(slot) is fut:
+            if record is None:
+                self._index.remove(slot)
+                self.stats["abandoned"] += 1
+            else:
+                self._index.replace(slot, record)
+        if not fut.done():
+            fut.set_result(None)
+
+    def add(self, h: int, record: Dict[str, Any]) -> None:
+        self._index.add(h, record)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "size": self._index.size, "capacity": self.capacity, "threshold": self.threshold}
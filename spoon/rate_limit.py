@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+
+class InMemoryBucketStore:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        # Returns 0 when a token was taken, otherwise seconds until one is free.
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - ts) * rate)
+        if tokens >= 1.0:
+            self._buckets[key] = (tokens - 1.0, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (1.0 - tokens) / rate
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def refund(self, key: str, burst: float) -> None:
+        if key in self._buckets:
+            tokens, ts = self._buckets[key]
+            self._buckets[key] = (min(burst, tokens + 1.0), ts)
+
+
+_TAKE_LUA = """
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    # Shares buckets between workers; the refill and take run as one Lua script
+    # so concurrent workers cannot both spend the last token.
+    def __init__(self, url: str, prefix: str = "loci:rl:"):
+        if aioredis is None:
+            raise RuntimeError("redis package is not installed")
+        self._redis = aioredis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_LUA)
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        return float(await self._take(keys=[self.prefix + key], args=[rate, burst, time.time()]))
+
+    async def refund(self, key: str, burst: float) -> None:
+        await self._redis.hincrbyfloat(self.prefix + key, "tokens", 1.0)
+
+
+class RateLimiter:
+    def __init__(self, rules: Dict[str, Tuple[float, float]], store=None):
+        # rules maps a scope ("wallet", "location") to (tokens per second, burst).
+        self.rules = {scope: rule for scope, rule in rules.items() if rule[0] > 0}
+        self.store = store or InMemoryBucketStore()
+        self.stats = {scope: {"allowed": 0, "limited": 0} for scope in self.rules}
+
+    async def check(self, **keys: str) -> Optional[Tuple[str, float]]:
+        taken = []
+        for scope, (rate, burst) in self.rules.items():
+            key = keys.get(scope)
+            if not key:
+                continue
+            wait = await self.store.take(f"{scope}:{key}", rate, burst)
+            if wait > 0:
+                self.stats[scope]["limited"] += 1
+                # Give back what earlier scopes spent so a denied request
+                # costs nothing.
+                for s, k, b in taken:
+                    await self.store.refund(f"{s}:{k}", b)
+                return scope, wait
+            taken.append((scope, key, burst))
+        for scope, _, _ in taken:
+            self.stats[scope]["allowed"] += 1
+        return None
+
+    def snapshot(self) -> dict:
+        return {scope: {**counts, "rate_per_s": self.rules[scope][0], "burst": self.rules[scope][1]} for scope, counts in self.stats.items()}
@@ -0,0 +1,89 @@
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from spoon_ai.schema import Message
+
+
+class _Skill:
+    __slots__ = ("text", "message", "mtime", "checked_at")
+
+    def __init__(self, text: str, mtime: Optional[int], checked_at: float):
+        self.text = text
+        self.message = Message(role="system", content=text)
+        self.mtime = mtime
+        self.checked_at = checked_at
+
+
+class SkillRegistry:
+    def __init__(self, root: Union[str, Path], check_interval: float = 2.0):
+        # check_interval bounds how often a prompt file is stat'ed; between
+        # checks a lookup is a dict hit. Negative disables reloading.
+        self.root = Path(root)
+        self.check_interval = check_interval
+        self._skills: Dict[str, _Skill] = {}
+        self.stats = {"hits": 0, "loads": 0, "reloads": 0, "missing": 0}
+
+    def _path(self, name: str) -> Path:
+        return self.root / name / "prompt.md"
+
+    def _mtime(self, name: str) -> Optional[int]:
+        try:
+            return os.stat(self._path(name)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, name: str, mtime: Optional[int], now: float) -> _Skill:
+        try:
+            text = self._path(name).read_text(encoding="utf-8")
+        except Exception:
+            text = ""
+            self.stats["missing"] += 1
+        skill = self._skills[name] = _Skill(text, mtime, now)
+        return skill
+
+    def _skill(self, name: str) -> _Skill:
+        now = time.monotonic()
+        skill = self._skills.get(name)
+        if skill is None:
+            self.stats["loads"] += 1
+            return self._load(name, self._mtime(name), now)
+        if self.check_interval >= 0 and now - skill.checked_at >= self.check_interval:
+            skill.checked_at = now
+            mtime = self._mtime(name)
+            if mtime != skill.mtime:
+                self.stats["reloads"] += 1
+                return self._load(name, mtime, now)
+        self.stats["hits"] += 1
+        return skill
+
+    def get(self, name: str) -> str:
+        return self._skill(name).text
+
+    def message(self, name: str) -> Message:
+        return self._skill(name).message
+
+    def preload(self) -> None:
+        if self.root.is_dir():
+            for p in sorted(self.root.glob("*/prompt.md")):
+                self._skill(p.parent.name)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "skills": sorted(self._skills), "check_interval_s": self.check_interval}
+
+
+_shared: Dict[Path, SkillRegistry] = {}
+
+
+def shared_registry(root: Union[str, Path], check_interval: Optional[float] = None) -> SkillRegistry:
+    # One registry per skills directory, so the app and the agent factories
+    # share a cache and its stats. check_interval applies when it is created
+    # or when given explicitly.
+    key = Path(root).resolve()
+    registry = _shared.get(key)
+    if registry is None:
+        registry = _shared[key] = SkillRegistry(key, 2.0 if check_interval is None else check_interval)
+    elif check_interval is not None:
+        registry.check_interval = check_interval
+    return registry
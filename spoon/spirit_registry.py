@@ -0,0 +1,219 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from spoon.geo_index import GeoIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spirits (
+    location_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    lat REAL,
+    lon REAL,
+    wallet TEXT NOT NULL DEFAULT '',
+    default_reward REAL NOT NULL DEFAULT 1.0,
+    budget_usdc REAL,
+    paid_usdc REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bounties (
+    bounty_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    location_id TEXT NOT NULL REFERENCES spirits(location_id) ON DELETE CASCADE,
+    title TEXT NOT NULL DEFAULT '',
+    match TEXT NOT NULL DEFAULT 'image',
+    keywords TEXT NOT NULL,
+    reward_usdc REAL NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS bounties_location ON bounties(location_id);
+"""
+
+
+class Bounty:
+    __slots__ = ("bounty_id", "title", "match", "keywords", "reward_usdc", "active")
+
+    def __init__(self, title: str, match: str, keywords: Iterable[str], reward_usdc: float, active: bool = True, bounty_id: Optional[int] = None):
+        self.bounty_id = bounty_id
+        self.title = title
+        self.match = match
+        self.keywords = tuple(k.lower() for k in keywords)
+        self.reward_usdc = float(reward_usdc)
+        self.active = bool(active)
+
+    def matches(self, text: str) -> bool:
+        return self.active and any(k in text for k in self.keywords)
+
+    def to_dict(self) -> dict:
+        return {"bounty_id": self.bounty_id, "title": self.title, "match": self.match, "keywords": list(self.keywords), "reward_usdc": self.reward_usdc, "active": self.active}
+
+
+class Spirit:
+    def __init__(self, location_id: str, name: str = "", lat: Optional[float] = None, lon: Optional[float] = None, wallet: str = "", default_reward: float = 1.0, budget_usdc: Optional[float] = None, paid_usdc: float = 0.0, bounties: Iterable[Bounty] = ()):
+        self.location_id = location_id
+        self.name = name
+        self.lat = lat
+        self.lon = lon
+        self.wallet = wallet
+        self.default_reward = float(default_reward)
+        self.budget_usdc = budget_usdc
+        self.paid_usdc = float(paid_usdc)
+        self.bounties = list(bounties)
+
+    @property
+    def balance_usdc(self) -> Optional[float]:
+        # None means the spirit has no budget cap.
+        return None if self.budget_usdc is None else self.budget_usdc - self.paid_usdc
+
+    def reward(self, image: str, wallet: str) -> Tuple[float, Optional[Bounty]]:
+        # The first matching image bounty sets the reward; a wallet bounty
+        # overrides it.
+        amount, hit = self.default_reward, None
+        image, wallet = image.lower(), wallet.lower()
+        for b in self.bounties:
+            if b.match == "image" and b.matches(image):
+                amount, hit = b.reward_usdc, b
+                break
+        for b in self.bounties:
+            if b.match == "wallet" and b.matches(wallet):
+                amount, hit = b.reward_usdc, b
+                break
+        return amount, hit
+
+    def to_dict(self) -> dict:
+        return {
+            "location_id": self.location_id,
+            "name": self.name,
+            "lat": self.lat,
+            "lon": self.lon,
+            "wallet": self.wallet,
+            "default_reward": self.default_reward,
+            "budget_usdc": self.budget_usdc,
+            "paid_usdc": self.paid_usdc,
+            "balance_usdc": self.balance_usdc,
+            "bounties": [b.to_dict() for b in self.bounties],
+        }
+
+
+class SpiritRegistry:
+    def __init__(self, path: str, default: Spirit, geo: Optional[GeoIndex] = None):
+        # Every spirit is held in memory, so the upload path is a dict lookup;
+        # SQLite (WAL) is the durable copy and is only touched on writes.
+        self.path = path
+        self.default = default
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._spirits: Dict[str, Spirit] = {}
+        self.geo = geo or GeoIndex()
+        self.stats = {"reserved": 0, "released": 0, "over_budget": 0}
+        self._load()
+
+    def _load(self) -> None:
+        with self._lock:
+            rows = self._db.execute("SELECT location_id, name, lat, lon, wallet, default_reward, budget_usdc, paid_usdc FROM spirits").fetchall()
+            bounties = self._db.execute("SELECT location_id, bounty_id, title, match, keywords, reward_usdc, active FROM bounties ORDER BY bounty_id").fetchall()
+        for row in rows:
+            self._index(Spirit(*row))
+        for loc, bid, title, match, keywords, reward, active in bounties:
+            spirit = self._spirits.get(loc)
+            if spirit is not None:
+                spirit.bounties.append(Bounty(title, match, json.loads(keywords), reward, active, bid))
+
+    def _write(self, sql: str, args: tuple) -> None:
+        with self._lock:
+            self._db.execute(sql, args)
+
+    def _replace(self, spirit: Spirit) -> None:
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute(
+                    "INSERT INTO spirits (location_id, name, lat, lon, wallet, default_reward, budget_usdc, paid_usdc, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(location_id) DO UPDATE SET name=excluded.name, lat=excluded.lat, lon=excluded.lon, wallet=excluded.wallet, "
+                    "default_reward=excluded.default_reward, budget_usdc=excluded.budget_usdc, updated_at=excluded.updated_at",
+                    (spirit.location_id, spirit.name, spirit.lat, spirit.lon, spirit.wallet, spirit.default_reward, spirit.budget_usdc, spirit.paid_usdc, time.time()),
+                )
+                spirit.paid_usdc = db.execute("SELECT paid_usdc FROM spirits WHERE location_id = ?", (spirit.location_id,)).fetchone()[0]
+                db.execute("DELETE FROM bounties WHERE location_id = ?", (spirit.location_id,))
+                for b in spirit.bounties:
+                    cur = db.execute(
+                        "INSERT INTO bounties (location_id, title, match, keywords, reward_usdc, active) VALUES (?, ?, ?, ?, ?, ?)",
+                        (spirit.location_id, b.title, b.match, json.dumps(list(b.keywords)), b.reward_usdc, int(b.active)),
+                    )
+                    b.bounty_id = cur.lastrowid
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def _index(self, spirit: Spirit) -> None:
+        self._spirits[spirit.location_id] = spirit
+        if spirit.lat is None or spirit.lon is None:
+            self.geo.remove(spirit.location_id)
+        else:
+            self.geo.insert(spirit.location_id, spirit.lat, spirit.lon)
+
+    def get(self, location_id: str) -> Spirit:
+        return self._spirits.get(location_id) or self.default
+
+    def find(self, location_id: str) -> Optional[Spirit]:
+        return self._spirits.get(location_id)
+
+    def list(self, offset: int = 0, limit: int = 100) -> List[Spirit]:
+        return list(islice(self._spirits.values(), offset, offset + limit))
+
+    def __len__(self) -> int:
+        return len(self._spirits)
+
+    async def upsert(self, spirit: Spirit) -> Spirit:
+        # Redefining a spirit keeps what it has already paid out.
+        if spirit.lat is not None and spirit.lon is not None and not (-90 <= spirit.lat <= 90 and -180 <= spirit.lon <= 180):
+            raise ValueError(f"invalid coordinates {spirit.lat}, {spirit.lon}")
+        await asyncio.to_thread(self._replace, spirit)
+        # A reserve may have debited the indexed spirit while its UPDATE was
+        # still queued behind this write; memory is the authority on the loop.
+        current = self._spirits.get(spirit.location_id)
+        if current is not None:
+            spirit.paid_usdc = current.paid_usdc
+        self._index(spirit)
+        return spirit
+
+    def nearby(self, lat: float, lon: float, radius_m: float, limit: int = 50) -> List[Tuple[Spirit, float]]:
+        return [(self._spirits[key], d) for key, d in self.geo.near(lat, lon, radius_m, limit)]
+
+    async def reserve(self, location_id: str, amount: float) -> bool:
+        # The in-memory check-and-debit runs without an await in between, so
+        # concurrent payouts on one loop cannot overspend a budget.
+        spirit = self.get(location_id)
+        balance = spirit.balance_usdc
+        if balance is not None and balance < amount:
+            self.stats["over_budget"] += 1
+            return False
+        spirit.paid_usdc += amount
+        self.stats["reserved"] += 1
+        if spirit is not self.default:
+            await asyncio.to_thread(self._write, "UPDATE spirits SET paid_usdc = paid_usdc + ? WHERE location_id = ?", (amount, location_id))
+        return True
+
+    async def release(self, location_id: str, amount: float) -> None:
+        spirit = self.get(location_id)
+        spirit.paid_usdc -= amount
+        self.stats["released"] += 1
+        if spirit is not self.default:
+            await asyncio.to_thread(self._write, "UPDATE spirits SET paid_usdc = paid_usdc - ? WHERE location_id = ?", (amount, location_id))
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "spirits": len(self._spirits), "path": self.path, "geo": self.geo.snapshot()}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
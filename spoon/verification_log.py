@@ -0,0 +1,150 @@
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    image_hash TEXT NOT NULL,
+    wallet TEXT NOT NULL,
+    location TEXT NOT NULL,
+    vibe_score INTEGER NOT NULL,
+    approved INTEGER NOT NULL,
+    reward_usdc REAL NOT NULL,
+    paid_usdc REAL NOT NULL,
+    tx_hash TEXT NOT NULL,
+    early_exit TEXT NOT NULL,
+    duplicate_of TEXT NOT NULL,
+    vision TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verifications_wallet_ts ON verifications(wallet, ts);
+CREATE INDEX IF NOT EXISTS verifications_location_ts ON verifications(location, ts);
+CREATE INDEX IF NOT EXISTS verifications_image ON verifications(image_hash);
+CREATE TABLE IF NOT EXISTS location_totals (
+    location TEXT PRIMARY KEY,
+    n INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    approved INTEGER NOT NULL,
+    paid_usdc REAL NOT NULL,
+    last_ts REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS verifications_no_update BEFORE UPDATE ON verifications
+BEGIN SELECT RAISE(ABORT, 'verifications is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS verifications_no_delete BEFORE DELETE ON verifications
+BEGIN SELECT RAISE(ABORT, 'verifications is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS verifications_totals AFTER INSERT ON verifications
+BEGIN
+    INSERT INTO location_totals (location, n, score_sum, approved, paid_usdc, last_ts)
+    VALUES (NEW.location, 1, NEW.vibe_score, NEW.approved, NEW.paid_usdc, NEW.ts)
+    ON CONFLICT(location) DO UPDATE SET
+        n = n + 1,
+        score_sum = score_sum + NEW.vibe_score,
+        approved = approved + NEW.approved,
+        paid_usdc = paid_usdc + NEW.paid_usdc,
+        last_ts = MAX(last_ts, NEW.ts);
+END;
+"""
+
+COLUMNS = ("ts", "image_hash", "wallet", "location", "vibe_score", "approved", "reward_usdc", "paid_usdc", "tx_hash", "early_exit", "duplicate_of", "vision")
+
+
+class VerificationLog:
+    def __init__(self, path: str, batch_size: int = 256, window: float = 0.25):
+        # Records are buffered and written in one transaction per batch, off
+        # the event loop; per-location totals are kept by a trigger so the
+        # aggregate queries never scan the log.
+        self.path = path
+        self.batch_size = batch_size
+        self.window = window
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.executescript(SCHEMA)
+        self._pending: List[Tuple[Any, ...]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        self.stats = {"appended": 0, "written": 0, "batches": 0, "write_errors": 0}
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._pending.append(tuple(record[c] for c in COLUMNS))
+        self.stats["appended"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, self._pending = self._pending, []
+        if rows:
+            task = asyncio.ensure_future(self._write(rows))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _insert(self, rows: List[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(f"INSERT INTO verifications ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    async def _write(self, rows: List[Tuple[Any, ...]]) -> None:
+        try:
+            await asyncio.to_thread(self._insert, rows)
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            print(f"verification log write failed ({len(rows)} records): {e}")
+            return
+        self.stats["written"] += len(rows)
+        self.stats["batches"] += 1
+
+    def _query(self, sql: str, args: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._db.execute(sql, args)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    async def query(self, sql: str, args: tuple = ()) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._query, sql, args)
+
+    async def payouts_by_wallet(self, wallet: str, since: float) -> Dict[str, Any]:
+        rows = await self.query(
+            "SELECT COUNT(*) AS payouts, COALESCE(SUM(paid_usdc), 0) AS total_usdc, MAX(ts) AS last_ts "
+            "FROM verifications WHERE wallet = ? AND ts >= ? AND paid_usdc > 0",
+            (wallet, since),
+        )
+        return {"wallet": wallet, "since": since, **rows[0]}
+
+    async def location_stats(self, location: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        sql = "SELECT location, n AS submissions, CAST(score_sum AS REAL) / n AS avg_vibe_score, approved, paid_usdc, last_ts FROM location_totals"
+        if location is not None:
+            return await self.query(sql + " WHERE location = ?", (location,))
+        return await self.query(sql + " ORDER BY n DESC LIMIT ?", (limit,))
+
+    async def recent(self, wallet: Optional[str] = None, location: Optional[str] = None, image_hash: Optional[str] = None, since: float = 0.0, limit: int = 100) -> List[Dict[str, Any]]:
+        where, args = ["ts >= ?"], [since]
+        for column, value in (("wallet", wallet), ("location", location), ("image_hash", image_hash)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        args.append(limit)
+        return await self.query(f"SELECT id, {', '.join(COLUMNS)} FROM verifications WHERE {' AND '.join(where)} ORDER BY ts DESC LIMIT ?", tuple(args))
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": len(self._pending), "path": self.path}
+
+    async def aclose(self) -> None:
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        with self._lock:
+            self._db.close()
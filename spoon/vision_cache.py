@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+
+def content_key(data: bytes, tag: str) -> str:
+    h = hashlib.sha256(data)
+    h.update(b"\0")
+    h.update(tag.encode("utf-8"))
+    return h.hexdigest()
+
+
+class VisionCache:
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[Union[str, Path]] = None, ttl: float = 7 * 24 * 3600, max_disk_entries: int = 100_000, sweep_every: int = 500):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.ttl = ttl
+        # Entries that are never read again are only removed by a sweep, run
+        # every sweep_every disk writes and on demand.
+        self.max_disk_entries = max_disk_entries
+        self.sweep_every = sweep_every
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._puts = 0
+        self._sweeping: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "sweeps": 0, "disk_removed": 0}
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._mem[key] = (value, created)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        p = self._path(key)
+        try:
+            rec = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - rec.get("created", 0) > self.ttl:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+            return None
+        return rec["description"], rec["created"]
+
+    def _disk_put(self, key: str, value: str, created: float) -> None:
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"description": value, "created": created}), encoding="utf-8")
+        os.replace(tmp, p)
+
+    def _sweep(self) -> int:
+        # File mtimes stand in for the created time, so the sweep does not
+        # have to read every record.
+        now = time.time()
+        live = []
+        removed = 0
+        for p in self.disk_dir.glob("*/*"):
+            try:
+                mtime = p.stat().st_mtime
+                if p.suffix == ".tmp":
+                    if now - mtime > 3600:
+                        p.unlink()
+                    continue
+                if now - mtime > self.ttl:
+                    p.unlink()
+                    removed += 1
+                else:
+                    live.append((mtime, p))
+            except OSError:
+                continue
+        if len(live) > self.max_disk_entries:
+            live.sort()
+            for _, p in live[:len(live) - self.max_disk_entries]:
+                try:
+                    p.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    async def sweep(self) -> int:
+        if self.disk_dir is None or not self.disk_dir.exists():
+            return 0
+        removed = await asyncio.to_thread(self._sweep)
+        self.stats["sweeps"] += 1
+        self.stats["disk_removed"] += removed
+        return removed
+
+    def _schedule_sweep(self) -> None:
+        if self._sweeping is None or self._sweeping.done():
+            self._sweeping = asyncio.ensure_future(self.sweep())
+
+    async def get(self, key: str) -> Optional[str]:
+        hit = self._mem.get(key)
+        if hit is not None:
+            if time.time() - hit[1] <= self.ttl:
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                return hit[0]
+            del self._mem[key]
+        if self.disk_dir is not None:
+            rec = await asyncio.to_thread(self._disk_get, key)
+            if rec is not None:
+                self._remember(key, rec[0], rec[1])
+                self.stats["disk_hits"] += 1
+                return rec[0]
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, value: str) -> None:
+        created = time.time()
+        self._remember(key, value, created)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._disk_put, key, value, created)
+            self._puts += 1
+            if self._puts >= self.sweep_every:
+                self._puts = 0
+                self._schedule_sweep()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "size": len(self._mem), "max_entries": self.max_entries, "disk": str(self.disk_dir) if self.disk_dir else None}
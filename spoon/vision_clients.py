@@ -0,0 +1,241 @@
+import asyncio
+import base64
+import math
+import os
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+try:
+    import httpx
+    from openai import AsyncOpenAI
+except Exception:
+    AsyncOpenAI = None
+try:
+    import google.generativeai as genai
+except Exception:
+    genai = None
+
+OPENAI_PHOTO_PROMPT = "Analyze this photo for aesthetics, lighting, and vibes."
+GEMINI_PHOTO_PROMPT = "Describe this image. Focus on the people and the setting."
+LOCI_SYSTEM_PROMPT = "You are the Genius Loci of this venue. Be highly opinionated. Analyze the image for aesthetic quality, lighting, and vibes. Output a concise, character-rich description."
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the their there this to was were with".split()
+)
+
+
+def _content_words(text: str) -> set:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w not in _STOPWORDS}
+
+
+def description_similarity(a: str, b: str) -> float:
+    # Overlap coefficient of content words: a short description that names
+    # the same things as a long one still scores high.
+    wa, wb = _content_words(a), _content_words(b)
+    if not wa or not wb:
+        return 0.0
+    return len(wa & wb) / min(len(wa), len(wb))
+
+
+def similar_descriptions(a: str, b: str, threshold: float = 0.5) -> bool:
+    return description_similarity(a, b) >= threshold
+
+
+class OpenAIVisionClient:
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-5.1", max_connections: int = 64):
+        self.model = model
+        self._http = httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections))
+        self._client = AsyncOpenAI(api_key=api_key, http_client=self._http)
+        self.cache_tag = f"{self.name}:{model}:{LOCI_SYSTEM_PROMPT}:{OPENAI_PHOTO_PROMPT}"
+
+    async def describe(self, data: Optional[bytes], mime: str) -> str:
+        system = {"role": "system", "content": [{"type": "input_text", "text": LOCI_SYSTEM_PROMPT}]}
+        if data is None:
+            user = {"role": "user", "content": [{"type": "input_text", "text": "Analyze the image."}]}
+        else:
+            b64 = base64.b64encode(data).decode("utf-8")
+            user = {"role": "user", "content": [{"type": "input_text", "text": OPENAI_PHOTO_PROMPT}, {"type": "input_image", "image_url": f"data:{mime};base64,{b64}"}]}
+        r = await self._client.responses.create(model=self.model, input=[system, user])
+        try:
+            return r.output_text or "No description"
+        except Exception:
+            return "No description"
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+
+class GeminiVisionClient:
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-2.5-pro"):
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(model)
+        self.cache_tag = f"{self.name}:{model}:{GEMINI_PHOTO_PROMPT}"
+
+    async def describe(self, data: Optional[bytes], mime: str) -> str:
+        parts = [GEMINI_PHOTO_PROMPT]
+        if data is not None:
+            parts.append({"mime_type": mime, "data": data})
+        resp = await self._model.generate_content_async(parts)
+        return getattr(resp, "text", "No description") or "No description"
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MockVisionClient:
+    name = "mock"
+    cache_tag = "mock"
+
+    async def describe(self, data: Optional[bytes], mime: str) -> str:
+        return "I see a delicious bowl of ramen."
+
+    async def aclose(self) -> None:
+        pass
+
+
+class ProviderLatency:
+    def __init__(self, window: int = 512):
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.total_s = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.calls += 1
+        self.total_s += seconds
+        self.samples.append(seconds)
+        if not ok:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+        def pct(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "mean_ms": (self.total_s / self.calls * 1000) if self.calls else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+        }
+
+
+class VisionClientRegistry:
+    def __init__(self):
+        self._clients: Dict[str, object] = {}
+        self._latency: Dict[str, ProviderLatency] = {}
+        self.ensemble_stats = {"runs": 0, "quorum": 0, "plurality": 0, "deadline": 0, "failed": 0}
+
+    def _build(self, name: str):
+        if name == "openai":
+            return OpenAIVisionClient(os.getenv("OPENAI_API_KEY", ""))
+        if name == "gemini":
+            return GeminiVisionClient(os.getenv("GEMINI_API_KEY", ""))
+        return MockVisionClient()
+
+    def available(self) -> list:
+        names = []
+        if os.getenv("OPENAI_API_KEY", "") and AsyncOpenAI is not None:
+            names.append("openai")
+        if os.getenv("GEMINI_API_KEY", "") and genai is not None:
+            names.append("gemini")
+        return names or ["mock"]
+
+    def get(self, name: Optional[str] = None):
+        name = name or self.available()[0]
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    async def describe(self, data: Optional[bytes], mime: str, provider: Optional[str] = None) -> str:
+        client = self.get(provider)
+        stats = self._latency.setdefault(client.name, ProviderLatency())
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            out = await client.describe(data, mime)
+            ok = True
+            return out
+        except asyncio.CancelledError:
+            # A straggler cut off by an ensemble; not a provider error.
+            stats.cancelled += 1
+            ok = True
+            raise
+        finally:
+            stats.record(time.perf_counter() - t0, ok)
+
+    async def ensemble(self, data: Optional[bytes], mime: str, providers: List[str], quorum: float = 2, deadline: float = 8.0, agree: Optional[Callable[[str, str], bool]] = None) -> dict:
+        # Fans out to every provider and returns once `quorum` of them give
+        # descriptions that agree (a count when >= 1, otherwise a fraction of
+        # the providers), mirroring the quorum join of the graph engine's
+        # parallel groups. A description joins the first group whose opening
+        # description it agrees with; by default that means similar wording.
+        # At the deadline, or when all have answered without a quorum, the
+        # largest group wins. Providers still running are cancelled either way.
+        agree = agree or similar_descriptions
+        self.ensemble_stats["runs"] += 1
+        tasks = {asyncio.ensure_future(self.describe(data, mime, p)): p for p in providers}
+        needed = min(len(tasks), int(quorum)) if quorum >= 1 else max(1, math.ceil(len(tasks) * quorum))
+        groups: List[List[str]] = []
+        votes: Dict[str, str] = {}
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        pending = set(tasks)
+        outcome = "plurality"
+        try:
+            while pending:
+                left = end - loop.time()
+                if left <= 0:
+                    outcome = "deadline"
+                    break
+                done, pending = await asyncio.wait(pending, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+                # Answers that arrive together are taken in provider order, so
+                # ties do not depend on set iteration order.
+                for t in [t for t in tasks if t in done]:
+                    if t.exception() is not None:
+                        votes[tasks[t]] = f"error: {t.exception()}"
+                        continue
+                    desc = t.result()
+                    for i, group in enumerate(groups):
+                        if agree(group[0], desc):
+                            group.append(desc)
+                            break
+                    else:
+                        i = len(groups)
+                        groups.append([desc])
+                    votes[tasks[t]] = f"group {i}"
+                if any(len(g) >= needed for g in groups):
+                    outcome = "quorum"
+                    break
+        finally:
+            for t in pending:
+                t.cancel()
+        for t in pending:
+            votes[tasks[t]] = "cancelled"
+        if not groups:
+            self.ensemble_stats["failed"] += 1
+            reason = "before the deadline" if outcome == "deadline" else "successfully"
+            raise RuntimeError(f"no vision provider answered {reason}: {votes}")
+        self.ensemble_stats[outcome] += 1
+        # Ties go to the group that formed first.
+        winner = max(groups, key=len)
+        return {"description": winner[0], "agreed": len(winner), "needed": needed, "outcome": outcome, "votes": votes}
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: s.snapshot() for name, s in self._latency.items()}
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
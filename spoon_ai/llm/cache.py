@@ -2,15 +2,24 @@
 Caching system for LLM responses to improve performance.
 """
 
+import asyncio
 import hashlib
 import json
+import os
+import sqlite3
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Any, Optional, List, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, field
 from logging import getLogger
 
 from .interface import LLMResponse
-from spoon_ai.schema import Message
+from spoon_ai.schema import LLMResponseChunk, Message, ToolCall
+
+if TYPE_CHECKING:
+    from .semantic_cache import SemanticCache
 
 logger = getLogger(__name__)
 
@@ -40,26 +49,281 @@ class CacheEntry:
         self.last_accessed = time.time()
 
 
+def _encode_response(response: LLMResponse) -> str:
+    """Serialize a response to JSON for the disk tier."""
+    return json.dumps({
+        'content': response.content,
+        'provider': response.provider,
+        'model': response.model,
+        'finish_reason': response.finish_reason,
+        'native_finish_reason': response.native_finish_reason,
+        'tool_calls': [tc.model_dump() for tc in response.tool_calls or []],
+        'usage': response.usage,
+        'metadata': response.metadata,
+        'request_id': response.request_id,
+        'duration': response.duration,
+        'timestamp': response.timestamp.isoformat() if response.timestamp else None,
+    }, default=str)
+
+
+def _decode_response(payload: str) -> LLMResponse:
+    """Rebuild a response serialized by ``_encode_response``."""
+    data = json.loads(payload)
+    data['tool_calls'] = [ToolCall(**tc) for tc in data.get('tool_calls') or []]
+    data['timestamp'] = datetime.fromisoformat(data['timestamp']) if data.get('timestamp') else datetime.now()
+    return LLMResponse(**data)
+
+
+class SQLiteCacheStore:
+    """Persistent cache tier stored in a SQLite database.
+
+    The database runs in WAL mode with a busy timeout, so several processes
+    (for example uvicorn workers) can share one file: readers never block and
+    writers queue briefly. Each process opens its own connection lazily, which
+    keeps the store safe to create before a fork.
+
+    Expired entries and, once the store is over ``max_entries`` or
+    ``max_bytes``, the least recently used entries are removed every
+    ``evict_every`` writes rather than on each one.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        accessed REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed);
+    CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache(created);
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, max_bytes: Optional[int] = None, default_ttl: float = 86400, evict_every: int = 256, touch_interval: float = 60.0):
+        """Initialize the store.
+        
+        Args:
+            path: Database file path
+            max_entries: Maximum number of entries kept on disk
+            max_bytes: Maximum total size of stored responses, if any
+            default_ttl: Time to live in seconds for entries on disk
+            evict_every: Number of writes between eviction passes
+            touch_interval: Minimum seconds between access-time updates of an entry
+        """
+        self.path = os.path.expanduser(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.evict_every = evict_every
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'errors': 0}
+
+    def _db(self) -> sqlite3.Connection:
+        """Return this process's connection, opening it on first use."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Tuple[LLMResponse, float]]:
+        """Look up an entry.
+        
+        Args:
+            key: Cache key
+            ttl: Time to live requested by the caller
+            
+        Returns:
+            Optional[Tuple[LLMResponse, float]]: The response and its creation time
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute("SELECT value, created, accessed FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._stats['misses'] += 1
+                    return None
+                value, created, accessed = row
+                # The caller's TTL applies, but never beyond the store's own retention
+                if now - created > min(ttl or self.default_ttl, self.default_ttl):
+                    db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._stats['misses'] += 1
+                    return None
+                if now - accessed > self.touch_interval:
+                    db.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            response = _decode_response(value)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+        self._stats['hits'] += 1
+        return response, created
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        """Store an entry, replacing any previous value for the key.
+        
+        Args:
+            key: Cache key
+            response: Response to store
+        """
+        now = time.time()
+        try:
+            value = _encode_response(response)
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now),
+                )
+                self._stats['writes'] += 1
+                self._writes += 1
+                if self._writes >= self.evict_every:
+                    self._writes = 0
+                    self._evict(db, now)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then the least recently used ones over the limits."""
+        removed = db.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.default_ttl,)).rowcount
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        excess = max(0, count - self.max_entries)
+        if self.max_bytes is not None and total > self.max_bytes:
+            # Remove roughly enough of the oldest rows to get back under the byte limit
+            avg = total / count if count else 1
+            excess = max(excess, int((total - self.max_bytes) / avg) + 1)
+        if excess:
+            removed += db.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed LIMIT ?)",
+                (excess,),
+            ).rowcount
+        self._stats['evictions'] += removed
+
+    def cleanup_expired(self) -> int:
+        """Run an eviction pass now.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            before = self._stats['evictions']
+            self._evict(self._db(), time.time())
+            return self._stats['evictions'] - before
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._db().execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get disk tier statistics.
+        
+        Returns:
+            Dict[str, Any]: Disk tier statistics
+        """
+        return {**self._stats, 'path': self.path, 'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
+
+    def close(self) -> None:
+        """Close this process's connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
 class LLMResponseCache:
-    """Cache for LLM responses with TTL and size limits."""
+    """Cache for LLM responses with TTL and size limits.
+
+    Entries are kept in an ``OrderedDict`` in least- to most-recently-used
+    order, so lookups, inserts and evictions are all O(1).
+
+    Keys are built incrementally: each message's digest is memoized by
+    ``(role, content)`` and the request key is a running hash over those
+    digests, so a conversation that grows by one message only hashes the new
+    message instead of re-serializing the whole history.
+
+    With a ``disk`` store the in-memory LRU becomes the first tier: misses
+    fall through to disk, disk hits are promoted into memory, and every put
+    is written to both.
+    """
     
-    def __init__(self, max_size: int = 1000, default_ttl: float = 3600):
+    def __init__(self, max_size: int = 1000, default_ttl: float = 3600, digest_cache_size: int = 10000,
+                 disk: Optional[SQLiteCacheStore] = None, digest_cache_bytes: int = 4 * 1024 * 1024):
         """Initialize cache.
         
         Args:
             max_size: Maximum number of entries
             default_ttl: Default time to live in seconds
+            digest_cache_size: Maximum number of memoized message digests
+            disk: Persistent second tier (optional)
+            digest_cache_bytes: Maximum total size of the message contents
+                the digest memo keeps alive as its keys
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self._cache: Dict[str, CacheEntry] = {}
+        self.digest_cache_size = digest_cache_size
+        self.digest_cache_bytes = digest_cache_bytes
+        self.disk = disk
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._digests: Dict[Tuple[Any, Any], bytes] = {}
+        self._digest_bytes = 0
         self._stats = {
             'hits': 0,
             'misses': 0,
             'evictions': 0,
+            'disk_hits': 0,
             'size': 0
         }
     
+    def _message_digest(self, message: Message) -> bytes:
+        """Return the memoized digest of a message's role and content.
+        
+        Args:
+            message: Message to digest
+            
+        Returns:
+            bytes: 16-byte digest
+        """
+        content = message.content
+        if not isinstance(content, (str, type(None))):
+            # Multimodal or structured content is not hashable; key it by
+            # its canonical JSON form instead.
+            content = json.dumps(content, sort_keys=True, default=str)
+        memo_key = (message.role, content)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            body = b"\x00" if content is None else b"\x01" + content.encode()
+            digest = hashlib.blake2b(str(message.role).encode() + b"\x00" + body, digest_size=16).digest()
+            # The memo keys hold the contents alive, so it is bounded by
+            # their total length as well as by count; a content larger than
+            # the whole budget is hashed every time instead.
+            size = len(content or "")
+            if size <= self.digest_cache_bytes:
+                while self._digests and (len(self._digests) >= self.digest_cache_size
+                                         or self._digest_bytes + size > self.digest_cache_bytes):
+                    # Drop the oldest memoized digest (insertion order)
+                    oldest = next(iter(self._digests))
+                    del self._digests[oldest]
+                    self._digest_bytes -= len(oldest[1] or "")
+                self._digests[memo_key] = digest
+                self._digest_bytes += size
+        return digest
+    
     def _generate_key(self, messages: List[Message], provider: str, **kwargs) -> str:
         """Generate cache key from request parameters.
         
@@ -71,16 +335,16 @@ class LLMResponseCache:
         Returns:
             str: Cache key
         """
-        # Create a deterministic representation of the request
-        cache_data = {
-            'messages': [{'role': msg.role, 'content': msg.content} for msg in messages],
-            'provider': provider,
-            'params': {k: v for k, v in sorted(kwargs.items()) if k not in ['request_id', 'timestamp']}
-        }
-        
-        # Generate hash
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        return hashlib.sha256(cache_str.encode()).hexdigest()
+        params = {k: v for k, v in sorted(kwargs.items()) if k not in ['request_id', 'timestamp']}
+        header = json.dumps({'provider': provider, 'params': params}, sort_keys=True, default=str)
+        
+        # Feed the fixed-size message digests into one running hash; a
+        # message's content is only hashed the first time it is seen.
+        h = hashlib.blake2b(header.encode(), digest_size=32)
+        digest = self._message_digest
+        for msg in messages:
+            h.update(digest(msg))
+        return h.hexdigest()
     
     def get(self, messages: List[Message], provider: str, ttl: Optional[float] = None, **kwargs) -> Optional[LLMResponse]:
         """Get cached response if available and not expired.
@@ -94,28 +358,89 @@ class LLMResponseCache:
         Returns:
             Optional[LLMResponse]: Cached response if available
         """
-        key = self._generate_key(messages, provider, **kwargs)
-        entry = self._cache.get(key)
+        return self.get_by_key(self._generate_key(messages, provider, **kwargs), ttl)
+    
+    def get_by_key(self, key: str, ttl: Optional[float] = None) -> Optional[LLMResponse]:
+        """Get cached response for a key from ``_generate_key``.
         
-        if entry is None:
-            self._stats['misses'] += 1
-            return None
+        Args:
+            key: Cache key
+            ttl: Time to live override
+            
+        Returns:
+            Optional[LLMResponse]: Cached response if available
+        """
+        ttl = ttl or self.default_ttl
+        entry = self._get_from_memory(key, ttl)
+        if entry is None and self.disk is not None:
+            entry = self._promote(key, self.disk.get(key, ttl))
+        return self._finish_get(key, entry)
+    
+    async def aget_by_key(self, key: str, ttl: Optional[float] = None) -> Optional[LLMResponse]:
+        """Async ``get_by_key``: a disk lookup runs in a worker thread.
         
-        # Check if expired
+        Args:
+            key: Cache key
+            ttl: Time to live override
+            
+        Returns:
+            Optional[LLMResponse]: Cached response if available
+        """
         ttl = ttl or self.default_ttl
-        if entry.is_expired(ttl):
+        entry = self._get_from_memory(key, ttl)
+        if entry is None and self.disk is not None:
+            entry = self._promote(key, await asyncio.to_thread(self.disk.get, key, ttl))
+        return self._finish_get(key, entry)
+    
+    def _get_from_memory(self, key: str, ttl: float) -> Optional[CacheEntry]:
+        """Return the in-memory entry for a key, dropping it if expired."""
+        entry = self._cache.get(key)
+        if entry is not None and entry.is_expired(ttl):
             del self._cache[key]
-            self._stats['misses'] += 1
             self._stats['size'] = len(self._cache)
+            entry = None
+        return entry
+    
+    def _promote(self, key: str, found: Optional[Tuple[LLMResponse, float]]) -> Optional[CacheEntry]:
+        """Promote an entry from the disk tier into memory.
+        
+        Args:
+            key: Cache key
+            found: Result of the disk tier lookup
+            
+        Returns:
+            Optional[CacheEntry]: The promoted entry, if the disk tier had one
+        """
+        if found is None:
+            return None
+        response, created = found
+        self._store(key, CacheEntry(response=response, timestamp=created))
+        self._stats['disk_hits'] += 1
+        return self._cache[key]
+    
+    def _finish_get(self, key: str, entry: Optional[CacheEntry]) -> Optional[LLMResponse]:
+        """Record a lookup's hit or miss and return its response."""
+        if entry is None:
+            self._stats['misses'] += 1
             return None
         
         # Update access info and return
         entry.touch()
+        self._cache.move_to_end(key)
         self._stats['hits'] += 1
         
         logger.debug(f"Cache hit for key: {key[:16]}...")
         return entry.response
     
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        """Insert an entry into the in-memory tier, evicting if full."""
+        if key in self._cache:
+            del self._cache[key]
+        elif len(self._cache) >= self.max_size:
+            self._evict_lru()
+        self._cache[key] = entry
+        self._stats['size'] = len(self._cache)
+    
     def put(self, messages: List[Message], provider: str, response: LLMResponse, **kwargs) -> None:
         """Store response in cache.
         
@@ -125,19 +450,41 @@ class LLMResponseCache:
             response: Response to cache
             **kwargs: Additional parameters
         """
-        key = self._generate_key(messages, provider, **kwargs)
-        
-        # Check if we need to evict entries
-        if len(self._cache) >= self.max_size:
-            self._evict_lru()
+        self.put_by_key(self._generate_key(messages, provider, **kwargs), response)
+    
+    def put_by_key(self, key: str, response: LLMResponse) -> None:
+        """Store response under a key from ``_generate_key``.
         
+        Args:
+            key: Cache key
+            response: Response to cache
+        """
         # Store entry
-        entry = CacheEntry(
+        self._store(key, CacheEntry(
             response=response,
             timestamp=time.time()
-        )
-        self._cache[key] = entry
-        self._stats['size'] = len(self._cache)
+        ))
+        if self.disk is not None:
+            self.disk.put(key, response)
+        
+        logger.debug(f"Cached response for key: {key[:16]}...")
+    
+    async def aput_by_key(self, key: str, response: LLMResponse) -> None:
+        """Async ``put_by_key``: the disk write runs in a worker thread.
+        
+        The in-memory tier is updated before the first await, so the entry
+        is visible to other requests right away.
+        
+        Args:
+            key: Cache key
+            response: Response to cache
+        """
+        self._store(key, CacheEntry(
+            response=response,
+            timestamp=time.time()
+        ))
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, response)
         
         logger.debug(f"Cached response for key: {key[:16]}...")
     
@@ -146,9 +493,8 @@ class LLMResponseCache:
         if not self._cache:
             return
         
-        # Find LRU entry
-        lru_key = min(self._cache.keys(), key=lambda k: self._cache[k].last_accessed)
-        del self._cache[lru_key]
+        # The front of the OrderedDict is the least recently used entry
+        lru_key, _ = self._cache.popitem(last=False)
         self._stats['evictions'] += 1
         
         logger.debug(f"Evicted LRU entry: {lru_key[:16]}...")
@@ -156,6 +502,10 @@ class LLMResponseCache:
     def clear(self) -> None:
         """Clear all cache entries."""
         self._cache.clear()
+        self._digests.clear()
+        self._digest_bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
         self._stats['size'] = 0
         logger.info("Cache cleared")
     
@@ -172,10 +522,12 @@ class LLMResponseCache:
             'hits': self._stats['hits'],
             'misses': self._stats['misses'],
             'evictions': self._stats['evictions'],
+            'disk_hits': self._stats['disk_hits'],
             'size': self._stats['size'],
             'max_size': self.max_size,
             'hit_rate': hit_rate,
-            'total_requests': total_requests
+            'total_requests': total_requests,
+            'disk': self.disk.get_stats() if self.disk is not None else None
         }
     
     def cleanup_expired(self) -> int:
@@ -195,6 +547,8 @@ class LLMResponseCache:
             del self._cache[key]
         
         self._stats['size'] = len(self._cache)
+        if self.disk is not None:
+            self.disk.cleanup_expired()
         
         if expired_keys:
             logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
@@ -214,7 +568,9 @@ def get_global_cache() -> LLMResponseCache:
     """
     global _global_cache
     if _global_cache is None:
-        _global_cache = LLMResponseCache()
+        # LLM_CACHE_DB points every process at a shared on-disk tier
+        disk_path = os.getenv('LLM_CACHE_DB')
+        _global_cache = LLMResponseCache(disk=SQLiteCacheStore(disk_path) if disk_path else None)
     return _global_cache
 
 
@@ -229,18 +585,39 @@ def set_global_cache(cache: LLMResponseCache) -> None:
 
 
 class CachedLLMManager:
-    """LLM Manager wrapper with caching support."""
+    """LLM Manager wrapper with caching support.
+
+    Identical requests that miss the cache while one is already in flight
+    are coalesced: they await the first request's result instead of calling
+    the provider again.
+
+    With a ``semantic_cache``, exact misses are looked up by embedding
+    similarity before the provider is called, and fresh responses are added
+    to both caches.
+
+    ``chat_stream`` shares cache keys with ``chat``: hits are replayed as a
+    stream of chunks, and streams that complete are written to the cache.
+    """
     
-    def __init__(self, manager, cache: Optional[LLMResponseCache] = None):
+    def __init__(self, manager, cache: Optional[LLMResponseCache] = None, semantic_cache: Optional["SemanticCache"] = None, replay_chunk_size: int = 24, replay_delay: float = 0.0):
         """Initialize cached manager.
         
         Args:
             manager: LLM manager instance
             cache: Cache instance (optional)
+            semantic_cache: Embedding-similarity cache (optional)
+            replay_chunk_size: Characters per chunk when replaying a cached stream
+            replay_delay: Seconds to wait between replayed chunks
         """
         self.manager = manager
         self.cache = cache or get_global_cache()
+        self.semantic_cache = semantic_cache
+        self.replay_chunk_size = replay_chunk_size
+        self.replay_delay = replay_delay
         self.cache_enabled = True
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._coalesced = 0
+        self._stream_stats = {'replayed': 0, 'stored': 0}
     
     async def chat(self, messages: List[Message], provider: Optional[str] = None, use_cache: bool = True, **kwargs) -> LLMResponse:
         """Chat with caching support.
@@ -257,18 +634,10 @@ class CachedLLMManager:
         if not (self.cache_enabled and use_cache):
             return await self.manager.chat(messages, provider=provider, **kwargs)
         
-        # Try to get from cache
-        cached_response = self.cache.get(messages, provider or 'default', **kwargs)
-        if cached_response is not None:
-            return cached_response
-        
-        # Get fresh response
-        response = await self.manager.chat(messages, provider=provider, **kwargs)
-        
-        # Cache the response
-        self.cache.put(messages, provider or 'default', response, **kwargs)
-        
-        return response
+        key = self.cache._generate_key(messages, provider or 'default', **kwargs)
+        return await self._single_flight(key, lambda: self._fetch(
+            messages, provider, kwargs, lambda: self.manager.chat(messages, provider=provider, **kwargs)
+        ))
     
     async def chat_with_tools(self, messages: List[Message], tools: List[Dict], provider: Optional[str] = None, use_cache: bool = True, **kwargs) -> LLMResponse:
         """Chat with tools and caching support.
@@ -283,23 +652,180 @@ class CachedLLMManager:
         Returns:
             LLMResponse: Response (cached or fresh)
         """
+        if not (self.cache_enabled and use_cache):
+            return await self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs)
+        
         # Include tools in cache key
-        kwargs['tools'] = tools
+        key = self.cache._generate_key(messages, provider or 'default', tools=tools, **kwargs)
+        return await self._single_flight(key, lambda: self._fetch(
+            messages, provider, {**kwargs, 'tools': tools}, lambda: self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs)
+        ))
+    
+    async def chat_stream(self, messages: List[Message], provider: Optional[str] = None, use_cache: bool = True, replay_delay: Optional[float] = None, **kwargs) -> AsyncGenerator[LLMResponseChunk, None]:
+        """Stream a chat response with caching support.
+        
+        Cached responses are replayed as chunks without calling the provider;
+        callbacks are only invoked for live streams. A live stream is cached
+        once it finishes, not if it fails or the consumer stops early.
         
+        Args:
+            messages: List of messages
+            provider: Provider name
+            use_cache: Whether to use cache
+            replay_delay: Seconds between replayed chunks (defaults to the manager setting)
+            **kwargs: Additional parameters
+            
+        Yields:
+            LLMResponseChunk: Response chunks (replayed or live)
+        """
         if not (self.cache_enabled and use_cache):
-            return await self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs)
+            async for chunk in self.manager.chat_stream(messages, provider=provider, **kwargs):
+                yield chunk
+            return
         
-        # Try to get from cache
-        cached_response = self.cache.get(messages, provider or 'default', **kwargs)
+        key = self.cache._generate_key(messages, provider or 'default', **{k: v for k, v in kwargs.items() if k != 'callbacks'})
+        cached_response = await self.cache.aget_by_key(key)
         if cached_response is not None:
-            return cached_response
+            self._stream_stats['replayed'] += 1
+            async for chunk in self._replay(cached_response, self.replay_delay if replay_delay is None else replay_delay):
+                yield chunk
+            return
         
-        # Get fresh response
-        response = await self.manager.chat_with_tools(messages, tools, provider=provider, **kwargs)
+        start = time.time()
+        deltas: List[str] = []
+        last: Optional[LLMResponseChunk] = None
+        finish_reason = None
+        async for chunk in self.manager.chat_stream(messages, provider=provider, **kwargs):
+            deltas.append(chunk.delta or '')
+            last = chunk
+            finish_reason = chunk.finish_reason or finish_reason
+            yield chunk
+        
+        if last is None:
+            return
+        # Chunks carry the accumulated content; fall back to the deltas if a
+        # provider only fills those in.
+        joined = ''.join(deltas)
+        content = last.content if len(last.content or '') >= len(joined) else joined
+        await self.cache.aput_by_key(key, LLMResponse(
+            content=content,
+            provider=last.provider,
+            model=last.model,
+            finish_reason=finish_reason or 'stop',
+            native_finish_reason=finish_reason or 'stop',
+            tool_calls=list(last.tool_calls),
+            usage=last.usage,
+            metadata=dict(last.metadata),
+            duration=time.time() - start
+        ))
+        self._stream_stats['stored'] += 1
+    
+    async def _replay(self, response: LLMResponse, delay: float) -> AsyncGenerator[LLMResponseChunk, None]:
+        """Replay a cached response as stream chunks.
         
-        # Cache the response
-        self.cache.put(messages, provider or 'default', response, **kwargs)
+        Args:
+            response: Cached response
+            delay: Seconds to wait between chunks
+            
+        Yields:
+            LLMResponseChunk: Chunks whose deltas add up to the cached content
+        """
+        content = response.content or ''
+        size = max(1, self.replay_chunk_size)
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or ['']
+        for index, delta in enumerate(pieces):
+            if index and delay > 0:
+                await asyncio.sleep(delay)
+            final = index == len(pieces) - 1
+            yield LLMResponseChunk(
+                content=content[:index * size + len(delta)],
+                delta=delta,
+                provider=response.provider,
+                model=response.model,
+                finish_reason=response.finish_reason if final else None,
+                tool_calls=list(response.tool_calls) if final else [],
+                usage=response.usage if final else None,
+                metadata={**response.metadata, 'cached': True},
+                chunk_index=index,
+                timestamp=datetime.now().isoformat()
+            )
+    
+    async def _fetch(self, messages: List[Message], provider: Optional[str], params: Dict[str, Any], call: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """Serve an exact cache miss from the semantic cache or the provider.
         
+        Args:
+            messages: List of messages
+            provider: Provider name
+            params: Parameters that scope the semantic lookup
+            call: Issues the provider request
+            
+        Returns:
+            LLMResponse: Response (similar or fresh)
+        """
+        if self.semantic_cache is None:
+            return await call()
+        try:
+            similar = await self.semantic_cache.get(messages, provider or 'default', **params)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            similar = None
+        if similar is not None:
+            return similar
+        response = await call()
+        try:
+            await self.semantic_cache.put(messages, provider or 'default', response, **params)
+        except Exception as e:
+            logger.warning(f"Semantic cache update failed: {e}")
+        return response
+    
+    async def _single_flight(self, key: str, call: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """Serve a request from cache, an identical in-flight request, or the provider.
+        
+        Args:
+            key: Cache key of the request
+            call: Issues the provider request
+            
+        Returns:
+            LLMResponse: Response (cached, shared or fresh)
+        """
+        while True:
+            # Try to get from cache
+            cached_response = await self.cache.aget_by_key(key)
+            if cached_response is not None:
+                return cached_response
+            
+            leader = self._inflight.get(key)
+            if leader is None:
+                break
+            self._coalesced += 1
+            try:
+                return await asyncio.shield(leader)
+            except asyncio.CancelledError:
+                # Only retry when the leading request was cancelled, not this one
+                if not leader.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # Get fresh response
+            response = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no other request was waiting
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        
+        # Resolve waiters first: the disk write below may be slow, and a
+        # cancellation during it must not leave them hanging.
+        future.set_result(response)
+        await self.cache.aput_by_key(key, response)
         return response
     
     def enable_cache(self) -> None:
@@ -315,6 +841,8 @@ class CachedLLMManager:
     def clear_cache(self) -> None:
         """Clear cache."""
         self.cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -322,7 +850,13 @@ class CachedLLMManager:
         Returns:
             Dict[str, Any]: Cache statistics
         """
-        return self.cache.get_stats()
+        return {
+            **self.cache.get_stats(),
+            'coalesced': self._coalesced,
+            'inflight': len(self._inflight),
+            'stream': dict(self._stream_stats),
+            'semantic': self.semantic_cache.get_stats() if self.semantic_cache is not None else None
+        }
     
     def __getattr__(self, name):
         """Delegate other methods to the underlying manager."""
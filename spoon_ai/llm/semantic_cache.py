@@ -0,0 +1,439 @@
+"""
+Semantic (embedding-similarity) cache for LLM responses.
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from logging import getLogger
+
+from .interface import LLMResponse
+from spoon_ai.schema import Message
+
+logger = getLogger(__name__)
+
+EmbedFunction = Callable[[str], Union[Sequence[float], Awaitable[Sequence[float]]]]
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("The semantic cache requires numpy. Please install it with 'pip install numpy'.") from e
+    return numpy
+
+
+class VectorIndex:
+    """Fixed-capacity cosine-similarity index over unit vectors.
+
+    Searches are exact brute-force matrix products until the index holds
+    ``ann_threshold`` vectors. Past that, random-hyperplane LSH tables narrow
+    the search to vectors whose signatures are within one bit of the
+    query's, and only those candidates are scored exactly.
+
+    Storage starts at ``initial_capacity`` rows and doubles as needed. Once
+    ``capacity`` is reached the oldest slot is overwritten.
+    """
+
+    def __init__(self, dim: int, capacity: int = 10000, ann_threshold: int = 2048, tables: int = 4, bits: int = 12, seed: int = 0, initial_capacity: int = 8):
+        """Initialize the index.
+
+        Args:
+            dim: Vector dimension
+            capacity: Maximum number of vectors
+            ann_threshold: Size at which the LSH tables are built
+            tables: Number of LSH tables
+            bits: Hyperplanes per LSH table
+            seed: Seed for the hyperplanes
+            initial_capacity: Rows allocated up front
+        """
+        self.np = _require_numpy()
+        self.dim = dim
+        self.capacity = capacity
+        self.ann_threshold = ann_threshold
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+        self._vectors = self.np.zeros((max(1, min(capacity, initial_capacity)), dim), dtype=self.np.float32)
+        self._count = 0
+        self._next = 0
+        self._planes = None
+        self._weights = self.np.left_shift(1, self.np.arange(bits, dtype=self.np.int64))
+        self._signatures = None
+        self._buckets: List[Dict[int, set]] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def ann(self) -> bool:
+        """Whether searches go through the LSH tables."""
+        return self._planes is not None
+
+    def _signature(self, vectors):
+        # One integer signature per table for each row of ``vectors``
+        bits = (self.np.einsum('tbd,nd->ntb', self._planes, vectors) > 0).astype(self.np.int64)
+        return bits @ self._weights
+
+    def _build_ann(self) -> None:
+        rng = self.np.random.default_rng(self.seed)
+        self._planes = rng.standard_normal((self.tables, self.bits, self.dim)).astype(self.np.float32)
+        self._signatures = self.np.zeros((len(self._vectors), self.tables), dtype=self.np.int64)
+        self._buckets = [{} for _ in range(self.tables)]
+        if self._count:
+            self._signatures[:self._count] = self._signature(self._vectors[:self._count])
+            for slot in range(self._count):
+                self._bucket_add(slot)
+
+    def _bucket_add(self, slot: int) -> None:
+        for t, sig in enumerate(self._signatures[slot].tolist()):
+            self._buckets[t].setdefault(sig, set()).add(slot)
+
+    def _bucket_remove(self, slot: int) -> None:
+        for t, sig in enumerate(self._signatures[slot].tolist()):
+            bucket = self._buckets[t].get(sig)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del self._buckets[t][sig]
+
+    def add(self, vector) -> int:
+        """Insert a unit vector.
+
+        Args:
+            vector: Normalized vector of length ``dim``
+
+        Returns:
+            int: Slot the vector was stored in
+        """
+        slot = self._next
+        if slot >= len(self._vectors):
+            rows = min(self.capacity, len(self._vectors) * 2)
+            self._vectors = self._grow(self._vectors, rows)
+            if self.ann:
+                self._signatures = self._grow(self._signatures, rows)
+        if self.ann and slot < self._count:
+            self._bucket_remove(slot)
+        self._vectors[slot] = vector
+        self._count = max(self._count, slot + 1)
+        self._next = (slot + 1) % self.capacity
+        if self.ann:
+            self._signatures[slot] = self._signature(vector[None, :])[0]
+            self._bucket_add(slot)
+        elif self._count >= self.ann_threshold:
+            self._build_ann()
+        return slot
+
+    def _grow(self, array, rows: int):
+        grown = self.np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def vector(self, slot: int):
+        """Return the vector stored in a slot."""
+        return self._vectors[slot]
+
+    def _candidates(self, query):
+        flips = [0] + [1 << b for b in range(self.bits)]
+        slots = set()
+        for t, sig in enumerate(self._signature(query[None, :])[0].tolist()):
+            buckets = self._buckets[t]
+            for flip in flips:
+                bucket = buckets.get(sig ^ flip)
+                if bucket:
+                    slots.update(bucket)
+        return self.np.fromiter(slots, dtype=self.np.int64, count=len(slots))
+
+    def search(self, query, k: int = 1) -> List[Tuple[int, float]]:
+        """Find the most similar stored vectors.
+
+        Args:
+            query: Normalized query vector
+            k: Number of results
+
+        Returns:
+            List[Tuple[int, float]]: (slot, cosine similarity), best first
+        """
+        if not self._count:
+            return []
+        if self.ann:
+            slots = self._candidates(query)
+            if not len(slots):
+                return []
+            scores = self._vectors[slots] @ query
+        else:
+            slots = None
+            scores = self._vectors[:self._count] @ query
+        k = min(k, len(scores))
+        top = self.np.argpartition(-scores, k - 1)[:k]
+        top = top[self.np.argsort(-scores[top])]
+        if slots is not None:
+            return [(int(slots[i]), float(scores[i])) for i in top]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+class SemanticCache:
+    """Cache that serves responses for prompts similar to earlier ones.
+
+    The final user message of a request is embedded and compared with the
+    final user messages of earlier requests in the same scope. A scope is
+    the provider, model, system prompt, earlier turns, and remaining request
+    parameters such as temperature or tools. The cached response of the
+    nearest prompt is returned if its cosine similarity is at least
+    ``threshold``.
+
+    Requests that do not end with a user message are not cached.
+
+    Since the earlier turns are part of the scope, each turn of a
+    conversation opens a new scope. At most ``max_scopes`` are kept, least
+    recently used first out. Entries older than ``default_ttl`` are pruned
+    from the scope they are written to and, every ``prune_every`` writes,
+    from all scopes.
+    """
+
+    def __init__(self, embed: EmbedFunction, threshold: float = 0.92, max_entries_per_scope: int = 10000, ann_threshold: int = 2048, default_ttl: float = 3600, embedding_cache_size: int = 1024, max_scopes: int = 1024, prune_every: int = 256):
+        """Initialize the semantic cache.
+
+        Args:
+            embed: Returns the embedding of a text (may be a coroutine function)
+            threshold: Minimum cosine similarity for a hit
+            max_entries_per_scope: Maximum prompts kept per scope
+            ann_threshold: Scope size at which approximate search is used
+            default_ttl: Time to live in seconds
+            embedding_cache_size: Number of recent embeddings kept to avoid re-embedding
+            max_scopes: Maximum number of scopes kept
+            prune_every: Writes between sweeps of all scopes for expired entries
+        """
+        self.np = _require_numpy()
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries_per_scope = max_entries_per_scope
+        self.ann_threshold = ann_threshold
+        self.default_ttl = default_ttl
+        self.embedding_cache_size = embedding_cache_size
+        self.max_scopes = max_scopes
+        self.prune_every = prune_every
+        self._indexes: "OrderedDict[str, VectorIndex]" = OrderedDict()
+        # Per scope, slot -> (response, created, prompt) in insertion order,
+        # so expired entries are always at the front
+        self._entries: Dict[str, Dict[int, Tuple[LLMResponse, float, str]]] = {}
+        self._embeddings: "OrderedDict[str, Any]" = OrderedDict()
+        self._puts = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'skipped': 0,
+            'embeddings': 0,
+            'expired': 0,
+            'scope_evictions': 0,
+            'size': 0
+        }
+
+    def _scope(self, messages: List[Message], provider: str, **kwargs) -> Optional[Tuple[str, str]]:
+        """Split a request into its scope key and the text to embed.
+
+        Args:
+            messages: List of messages
+            provider: Provider name
+            **kwargs: Additional parameters
+
+        Returns:
+            Optional[Tuple[str, str]]: Scope key and final user message, or None if the request is not cacheable
+        """
+        if not messages or messages[-1].role != 'user' or not isinstance(messages[-1].content, str):
+            return None
+        context = [
+            (msg.role, msg.content, [tc.model_dump() for tc in msg.tool_calls or []])
+            for msg in messages[:-1]
+        ]
+        scope = json.dumps({
+            'provider': provider,
+            'context': context,
+            'params': {k: v for k, v in sorted(kwargs.items()) if k not in ['request_id', 'timestamp']}
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(scope.encode(), digest_size=16).hexdigest(), messages[-1].content
+
+    async def _embedding(self, text: str):
+        """Return the normalized embedding of a text, memoized."""
+        vector = self._embeddings.get(text)
+        if vector is not None:
+            self._embeddings.move_to_end(text)
+            return vector
+        result = self.embed(text)
+        if inspect.isawaitable(result):
+            result = await result
+        self._stats['embeddings'] += 1
+        vector = self.np.asarray(result, dtype=self.np.float32)
+        norm = float(self.np.linalg.norm(vector))
+        if vector.ndim != 1 or norm == 0:
+            raise ValueError("Embedding must be a non-zero 1-D vector")
+        vector = vector / norm
+        self._embeddings[text] = vector
+        if len(self._embeddings) > self.embedding_cache_size:
+            self._embeddings.popitem(last=False)
+        return vector
+
+    async def get(self, messages: List[Message], provider: str, ttl: Optional[float] = None, **kwargs) -> Optional[LLMResponse]:
+        """Get the response cached for the most similar earlier prompt.
+
+        Args:
+            messages: List of messages
+            provider: Provider name
+            ttl: Time to live override
+            **kwargs: Additional parameters
+
+        Returns:
+            Optional[LLMResponse]: Cached response if a similar enough prompt was found
+        """
+        found = self._scope(messages, provider, **kwargs)
+        if found is None:
+            self._stats['skipped'] += 1
+            return None
+        scope, text = found
+        if scope not in self._indexes:
+            self._stats['misses'] += 1
+            return None
+        vector = await self._embedding(text)
+        # A put during the await may have dropped or compacted the scope, so
+        # the index and its slot map are read together only now.
+        index = self._indexes.get(scope)
+        if index is None or len(vector) != index.dim:
+            self._stats['misses'] += 1
+            return None
+        self._indexes.move_to_end(scope)
+        entries = self._entries[scope]
+
+        ttl = ttl or self.default_ttl
+        now = time.time()
+        for slot, score in index.search(vector, k=4):
+            if score < self.threshold:
+                break
+            entry = entries.get(slot)
+            if entry is None:
+                # Pruned, but not yet overwritten or compacted away
+                continue
+            response, created, prompt = entry
+            if now - created <= ttl:
+                self._stats['hits'] += 1
+                logger.debug(f"Semantic cache hit ({score:.3f}) for prompt similar to: {prompt[:40]!r}")
+                return response
+
+        self._stats['misses'] += 1
+        return None
+
+    async def put(self, messages: List[Message], provider: str, response: LLMResponse, **kwargs) -> None:
+        """Store a response under the request's final user message.
+
+        Args:
+            messages: List of messages
+            provider: Provider name
+            response: Response to cache
+            **kwargs: Additional parameters
+        """
+        found = self._scope(messages, provider, **kwargs)
+        if found is None:
+            return
+        scope, text = found
+        vector = await self._embedding(text)
+        now = time.time()
+        if scope in self._indexes:
+            self._indexes.move_to_end(scope)
+            self._prune_scope(scope, now)
+        index = self._indexes.get(scope)
+        if index is None:
+            # Most scopes are one conversation turn and never hold a second
+            # prompt, so they start with room for one vector
+            index = self._indexes[scope] = VectorIndex(len(vector), self.max_entries_per_scope, self.ann_threshold, initial_capacity=1)
+            self._entries[scope] = {}
+            while len(self._indexes) > self.max_scopes:
+                self._drop_scope(next(iter(self._indexes)))
+                self._stats['scope_evictions'] += 1
+        elif len(vector) != index.dim:
+            raise ValueError(f"Embedding dimension {len(vector)} does not match {index.dim}")
+        entries = self._entries[scope]
+        slot = index.add(vector)
+        # Re-inserted rather than assigned, to keep the dict in time order
+        if entries.pop(slot, None) is not None:
+            self._stats['size'] -= 1
+        entries[slot] = (response, now, text)
+        self._stats['size'] += 1
+
+        self._puts += 1
+        if self._puts >= self.prune_every:
+            self._puts = 0
+            self.cleanup_expired()
+
+    def _drop_scope(self, scope: str) -> None:
+        """Remove a scope and its entries."""
+        self._indexes.pop(scope, None)
+        self._stats['size'] -= len(self._entries.pop(scope, {}))
+
+    def _prune_scope(self, scope: str, now: float) -> int:
+        """Remove a scope's expired entries, and the scope once it is empty.
+
+        Pruned vectors stay in the index until their slot is overwritten;
+        once they outnumber the live ones the index is rebuilt without them.
+
+        Args:
+            scope: Scope key
+            now: Current time
+
+        Returns:
+            int: Number of entries removed
+        """
+        entries = self._entries[scope]
+        removed = 0
+        while entries:
+            slot = next(iter(entries))
+            if now - entries[slot][1] <= self.default_ttl:
+                break
+            del entries[slot]
+            removed += 1
+        self._stats['size'] -= removed
+        self._stats['expired'] += removed
+        if not entries:
+            self._drop_scope(scope)
+        elif removed:
+            index = self._indexes[scope]
+            if len(index) - len(entries) > len(entries):
+                compact = VectorIndex(index.dim, self.max_entries_per_scope, self.ann_threshold, initial_capacity=len(entries))
+                self._entries[scope] = {compact.add(index.vector(slot)): entry for slot, entry in entries.items()}
+                self._indexes[scope] = compact
+        return removed
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries from every scope.
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time()
+        removed = sum(self._prune_scope(scope, now) for scope in list(self._indexes))
+        if removed:
+            logger.info(f"Cleaned up {removed} expired semantic cache entries")
+        return removed
+
+    def clear(self) -> None:
+        """Clear all scopes and memoized embeddings."""
+        self._indexes.clear()
+        self._entries.clear()
+        self._embeddings.clear()
+        self._stats['size'] = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get semantic cache statistics.
+
+        Returns:
+            Dict[str, Any]: Semantic cache statistics
+        """
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'scopes': len(self._indexes),
+            'ann_scopes': sum(1 for index in self._indexes.values() if index.ann),
+            'threshold': self.threshold,
+            'hit_rate': self._stats['hits'] / lookups if lookups > 0 else 0
+        }
@@ -0,0 +1,31 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+LOCI_MAIN = Path(__file__).resolve().parent.parent / "genius-loci" / "main.py"
+
+
+@pytest.fixture(scope="session")
+def loci(tmp_path_factory):
+    """The Genius Loci app module, with its SQLite stores in a temp dir."""
+    tmp = tmp_path_factory.mktemp("loci")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("LOCI_SPIRIT_DB", str(tmp / "spirits.db"))
+        mp.setenv("LOCI_VERIFICATION_DB", str(tmp / "verifications.db"))
+        spec = importlib.util.spec_from_file_location("loci_main", LOCI_MAIN)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    yield module
+    module.spirits.close()
+
+
+@pytest.fixture
+def uploads(loci):
+    """The app's upload directory; files a test leaves there are removed."""
+    root = Path(loci.__file__).parent / "static" / "uploads"
+    root.mkdir(parents=True, exist_ok=True)
+    before = set(root.iterdir())
+    yield root
+    for path in set(root.iterdir()) - before:
+        path.unlink(missing_ok=True)
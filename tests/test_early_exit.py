@@ -0,0 +1,114 @@
+"""
+Tests for early-exit rules and their place in the argue graph.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from spoon.early_exit import EarlyExitRules
+
+RULES = [
+    {"name": "blurry", "field": "vision", "keywords": ["Blurry"], "score": 35},
+    {"name": "cinematic", "field": "vision", "keywords": ["cinematic lighting"], "score": 98},
+    {"name": "good_file", "field": "image", "keywords": ["good"], "score": 98},
+]
+
+
+class TestLoad:
+    """Rule specs from the environment."""
+
+    def test_empty_spec_uses_defaults(self):
+        rules = EarlyExitRules.load("  ", RULES)
+        assert rules.enabled
+        assert [r.name for r in rules.rules] == ["blurry", "cinematic", "good_file"]
+        assert rules.rules[0].keywords == ("blurry",)
+
+    def test_json_list_and_file(self, tmp_path):
+        custom = [{"name": "night", "field": "vision", "keywords": ["night"], "score": 50}]
+        assert [r.name for r in EarlyExitRules.load(json.dumps(custom), RULES).rules] == ["night"]
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(custom), encoding="utf-8")
+        assert [r.name for r in EarlyExitRules.load(str(path), RULES).rules] == ["night"]
+
+    def test_off_never_decides_but_still_scores(self):
+        rules = EarlyExitRules.load("OFF", RULES)
+        state = {"vision": "a blurry shot"}
+        assert not rules.enabled
+        assert rules.match(state) is None
+        assert rules.decide(state) is None
+        assert rules.stats["checked"] == 0
+        assert rules.score(state, 72) == 35
+
+
+class TestPrecedence:
+    """The first matching rule wins."""
+
+    def test_first_match_decides(self):
+        rules = EarlyExitRules.load("", RULES)
+        assert rules.match({"vision": "blurry, cinematic lighting", "image": "good.jpg"}).name == "blurry"
+        assert rules.match({"vision": "cinematic lighting", "image": "good.jpg"}).name == "cinematic"
+        assert rules.match({"vision": "a street", "image": "good.jpg"}).name == "good_file"
+        assert rules.match({"vision": "a street", "image": "x.jpg"}) is None
+
+    def test_decide_counts_outcomes(self):
+        rules = EarlyExitRules.load("", RULES)
+        rules.decide({"vision": "blurry"})
+        rules.decide({"vision": "a street"})
+        assert rules.snapshot()["fired"] == {"checked": 2, "undecided": 1, "blurry": 1, "cinematic": 0, "good_file": 0}
+
+    def test_default_table_puts_description_before_filename(self, loci):
+        rules = EarlyExitRules.load("", loci.EARLY_EXIT_DEFAULTS)
+        assert rules.match({"vision": "bland interior", "image": "good.jpg"}).score == 35
+        assert rules.match({"vision": "cinematic lighting", "image": "bad.jpg"}).score == 98
+
+
+@pytest.fixture
+def gateway(loci, monkeypatch):
+    chat = AsyncMock(return_value="an opinion")
+    monkeypatch.setattr(loci.llm_gateway, "chat", chat)
+    return chat
+
+
+def state(vision: str, image: str = "static/uploads/photo.jpg") -> dict:
+    return {"image": image, "vision": vision, "historian": "", "vibe": "", "vibe_score": 0}
+
+
+class TestArgueGraph:
+    """A fired rule replaces the historian and vibe LLM calls."""
+
+    @pytest.mark.asyncio
+    async def test_fired_rule_skips_the_gateway(self, loci, gateway, monkeypatch):
+        monkeypatch.setattr(loci, "early_exit_rules", EarlyExitRules.load("", loci.EARLY_EXIT_DEFAULTS))
+        decided = await loci.early_exit_node(state("A blurry photo of a wall"))
+        assert decided["early_exit"] == "blurry_description"
+        assert decided["vibe_score"] == 35
+
+        assert await loci.historian_node(decided) == decided
+        assert await loci.vibe_node(decided) == decided
+        gateway.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_undecided_run_asks_the_gateway(self, loci, gateway, monkeypatch):
+        monkeypatch.setattr(loci, "early_exit_rules", EarlyExitRules.load("", loci.EARLY_EXIT_DEFAULTS))
+        decided = await loci.early_exit_node(state("A bowl of ramen"))
+        assert decided["early_exit"] == ""
+
+        historian = await loci.historian_node(decided)
+        vibe = await loci.vibe_node(decided)
+        assert historian["historian"] == vibe["vibe"] == "an opinion"
+        assert vibe["vibe_score"] == 72
+        assert gateway.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_vibe_scores_from_the_same_table_when_early_exit_is_off(self, loci, gateway, monkeypatch):
+        monkeypatch.setattr(loci, "early_exit_rules", EarlyExitRules.load("off", loci.EARLY_EXIT_DEFAULTS))
+        decided = await loci.early_exit_node(state("A blurry photo", image="good_shot.jpg"))
+        assert decided["early_exit"] == ""
+        assert (await loci.vibe_node(decided))["vibe_score"] == 35
+
+        custom = [{"name": "night", "field": "vision", "keywords": ["night"], "score": 90}]
+        monkeypatch.setattr(loci, "early_exit_rules", EarlyExitRules(EarlyExitRules.load(json.dumps(custom), []).rules, enabled=False))
+        assert (await loci.vibe_node(state("A street at night")))["vibe_score"] == 90
+        assert (await loci.vibe_node(state("A blurry photo")))["vibe_score"] == 72
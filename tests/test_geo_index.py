@@ -0,0 +1,89 @@
+"""
+Tests for the grid geospatial index and the nearby-bounties endpoint.
+"""
+
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from spoon.geo_index import GeoIndex, haversine_m
+from spoon.spirit_registry import Bounty, Spirit
+
+
+def brute_force(points: dict, lat: float, lon: float, radius_m: float) -> set:
+    return {key for key, (plat, plon) in points.items() if haversine_m(lat, lon, plat, plon) <= radius_m}
+
+
+def scatter(rng: random.Random, n: int, lat: float, lon: float, spread: float) -> list:
+    out = []
+    for _ in range(n):
+        plat = min(90.0, max(-90.0, lat + rng.uniform(-spread, spread)))
+        plon = (lon + rng.uniform(-spread, spread) * 20 + 180) % 360 - 180
+        out.append((plat, plon))
+    return out
+
+
+class TestGeoIndex:
+    """near() agrees with a brute-force haversine scan."""
+
+    @pytest.mark.parametrize("lat,lon", [(89.99, 0.0), (-89.99, 0.0), (0.0, 179.999), (45.0, -179.999), (88.0, 179.9), (-60.0, 10.0)])
+    def test_matches_brute_force(self, lat, lon):
+        rng = random.Random(f"{lat},{lon}")
+        index, points = GeoIndex(), {}
+        for i, (plat, plon) in enumerate(scatter(rng, 3000, lat, lon, 0.5)):
+            points[f"p{i}"] = (plat, plon)
+            index.insert(f"p{i}", plat, plon)
+        for radius in (500.0, 5_000.0, 50_000.0, 300_000.0):
+            for _ in range(20):
+                qlat, qlon = scatter(rng, 1, lat, lon, 0.3)[0]
+                expected = brute_force(points, qlat, qlon, radius)
+                found = index.near(qlat, qlon, radius)
+                assert {key for key, _ in found} == expected
+                assert [d for _, d in found] == sorted(d for _, d in found)
+
+    def test_circle_around_the_pole_spans_every_longitude(self):
+        index = GeoIndex()
+        # Enough occupied cells elsewhere that the query walks its own cells
+        for i in range(5000):
+            index.insert(f"filler{i}", -60.0 + (i % 100), -180.0 + (i // 100) * 7)
+        index.insert("far side", 89.99, 180.0)
+        (key, d), = index.near(89.995, 10.0, 5000)
+        assert key == "far side"
+        assert d == pytest.approx(haversine_m(89.99, 180.0, 89.995, 10.0))
+
+    def test_limit_and_remove(self):
+        index = GeoIndex()
+        for i in range(5):
+            index.insert(f"p{i}", 10.0 + i * 0.001, 20.0)
+        assert [k for k, _ in index.near(10.0, 20.0, 1000, limit=2)] == ["p0", "p1"]
+        index.remove("p0")
+        index.insert("p1", -10.0, 20.0)
+        assert [k for k, _ in index.near(10.0, 20.0, 1000, limit=2)] == ["p2", "p3"]
+        assert index.get("p1") == (-10.0, 20.0)
+
+
+class TestNearbyBounties:
+    """/api/bounties across the antimeridian."""
+
+    @pytest.mark.asyncio
+    async def test_returns_spirits_in_radius_with_active_bounties(self, loci):
+        await loci.spirits.upsert(Spirit("geo-east", lat=-45.0, lon=179.999, bounties=[
+            Bounty("live", "image", ["ramen"], 2.0),
+            Bounty("retired", "image", ["sushi"], 3.0, active=False),
+        ]))
+        await loci.spirits.upsert(Spirit("geo-west", lat=-45.001, lon=-179.999))
+        await loci.spirits.upsert(Spirit("geo-far", lat=-45.0, lon=-179.9))
+
+        result = await loci.nearby_bounties(-45.0, 179.9995, radius=1000.0)
+
+        spirits = result["spirits"]
+        assert [s["location_id"] for s in spirits] == ["geo-east", "geo-west"]
+        assert [b["title"] for b in spirits[0]["bounties"]] == ["live"]
+        assert spirits[0]["distance_m"] <= spirits[1]["distance_m"] <= 1000.0
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_coordinates(self, loci):
+        with pytest.raises(HTTPException) as exc:
+            await loci.nearby_bounties(91.0, 0.0)
+        assert exc.value.status_code == 400
@@ -0,0 +1,69 @@
+"""
+Tests for image preprocessing before vision calls.
+"""
+
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from spoon.image_prep import ImagePreprocessor, prepare_image
+
+
+def encode(im, fmt: str, **kwargs) -> bytes:
+    out = io.BytesIO()
+    im.save(out, fmt, **kwargs)
+    return out.getvalue()
+
+
+def noise(size: int) -> "Image.Image":
+    import os
+    return Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+
+
+class TestPrepareImage:
+    """Re-encoding decisions."""
+
+    def test_small_image_without_exif_is_kept(self):
+        data = encode(Image.new("RGB", (8, 8), "red"), "PNG")
+        assert prepare_image(data, max_side=64) == (None, "image/png")
+
+    def test_larger_output_falls_back_to_original(self):
+        data = encode(noise(300), "JPEG", quality=60)
+        out, mime = prepare_image(data, max_side=256, quality=95)
+        assert out is None and mime == "image/jpeg"
+
+    def test_large_image_is_downscaled(self):
+        data = encode(Image.new("RGB", (2000, 1000), "blue"), "PNG")
+        out, mime = prepare_image(data, max_side=500)
+        assert mime == "image/jpeg"
+        with Image.open(io.BytesIO(out)) as im:
+            assert im.size == (500, 250)
+
+    def test_exif_is_stripped(self):
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"
+        data = encode(Image.new("RGB", (16, 16), "green"), "JPEG", exif=exif.tobytes())
+        out, _ = prepare_image(data, max_side=64)
+        with Image.open(io.BytesIO(out)) as im:
+            assert "exif" not in im.info
+
+    def test_transparency_becomes_white(self):
+        data = encode(Image.new("RGBA", (400, 400), (0, 0, 0, 0)), "PNG")
+        out, _ = prepare_image(data, max_side=100)
+        with Image.open(io.BytesIO(out)) as im:
+            assert im.convert("L").getextrema()[0] > 240
+
+
+class TestImagePreprocessor:
+    """Async wrapper and stats."""
+
+    @pytest.mark.asyncio
+    async def test_kept_image_reports_no_savings(self):
+        prep = ImagePreprocessor(max_side=64, workers=0)
+        data = encode(Image.new("RGB", (8, 8), "red"), "PNG")
+        out, mime, saved = await prep.prepare(data)
+        assert (out, mime, saved) == (data, "image/png", 0)
+        assert prep.snapshot()["kept"] == 1
+        assert prep.snapshot()["bytes_saved"] == 0
@@ -0,0 +1,94 @@
+"""
+Tests for the bounded background job queue.
+"""
+
+import asyncio
+
+import pytest
+
+from spoon.job_queue import JobQueue, QueueFull
+
+
+class TestJobQueue:
+    """Submission, completion and limits."""
+
+    @pytest.mark.asyncio
+    async def test_runs_job_and_records_result(self):
+        jobs = JobQueue(workers=2)
+
+        async def work():
+            return {"vibe_score": 7}
+
+        job_id = jobs.submit(work)
+        job = await jobs.wait(job_id, timeout=1)
+
+        assert job["status"] == "done"
+        assert job["result"] == {"vibe_score": 7}
+        assert job["started_at"] <= job["finished_at"]
+        await jobs.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded(self):
+        jobs = JobQueue(workers=1)
+
+        async def boom():
+            raise RuntimeError("vision down")
+
+        job = await jobs.wait(jobs.submit(boom), timeout=1)
+
+        assert job["status"] == "failed"
+        assert job["error"] == "vision down"
+        assert jobs.snapshot()["failed"] == 1
+        await jobs.aclose()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        jobs = JobQueue(workers=1, max_pending=2)
+        gate = asyncio.Event()
+
+        async def blocked():
+            await gate.wait()
+
+        jobs.submit(blocked)
+        await asyncio.sleep(0)  # the worker takes the first job
+        jobs.submit(blocked)
+        jobs.submit(blocked)
+        with pytest.raises(QueueFull):
+            jobs.submit(blocked)
+
+        assert jobs.snapshot()["rejected"] == 1
+        assert jobs.snapshot()["running"] == 1
+        gate.set()
+        await jobs.aclose()
+
+    @pytest.mark.asyncio
+    async def test_worker_count_bounds_concurrency(self):
+        jobs = JobQueue(workers=3)
+        running = peak = 0
+
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        ids = [jobs.submit(work) for _ in range(10)]
+        for job_id in ids:
+            await jobs.wait(job_id, timeout=1)
+
+        assert peak == 3
+        await jobs.aclose()
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_are_trimmed(self):
+        jobs = JobQueue(workers=1, max_finished=3)
+
+        async def work():
+            return 1
+
+        ids = [jobs.submit(work) for _ in range(5)]
+        await jobs.wait(ids[-1], timeout=1)
+
+        assert [jobs.get(i) is not None for i in ids] == [False, False, True, True, True]
+        await jobs.aclose()
@@ -0,0 +1,408 @@
+"""
+Tests for the LLM response cache and the caching manager wrapper.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from spoon_ai.llm.cache import LLMResponseCache, CachedLLMManager, SQLiteCacheStore
+from spoon_ai.llm.interface import LLMResponse
+from spoon_ai.schema import Message, ToolCall, Function, LLMResponseChunk
+
+
+def make_response(content: str = "ok") -> LLMResponse:
+    return LLMResponse(
+        content=content,
+        provider="mock",
+        model="mock-model",
+        finish_reason="stop",
+        native_finish_reason="stop"
+    )
+
+
+def conversation(n: int, tag: str = "") -> list:
+    return [Message(role="user" if i % 2 == 0 else "assistant", content=f"{tag} message {i}") for i in range(n)]
+
+
+class TestLRUEviction:
+    """LRU ordering and eviction."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LLMResponseCache(max_size=3)
+        convs = [conversation(1, str(i)) for i in range(4)]
+        for i in range(3):
+            cache.put(convs[i], "mock", make_response(str(i)))
+
+        # Touch the oldest entry so the second one becomes the LRU
+        assert cache.get(convs[0], "mock").content == "0"
+        cache.put(convs[3], "mock", make_response("3"))
+
+        assert cache.get(convs[1], "mock") is None
+        assert cache.get(convs[0], "mock").content == "0"
+        assert cache.get(convs[2], "mock").content == "2"
+        assert cache.get(convs[3], "mock").content == "3"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_overwrite_does_not_evict(self):
+        cache = LLMResponseCache(max_size=2)
+        a, b = conversation(1, "a"), conversation(1, "b")
+        cache.put(a, "mock", make_response("a1"))
+        cache.put(b, "mock", make_response("b"))
+        cache.put(a, "mock", make_response("a2"))
+
+        assert cache.get_stats()["evictions"] == 0
+        assert cache.get_stats()["size"] == 2
+        assert cache.get(a, "mock").content == "a2"
+
+    def test_size_never_exceeds_max(self):
+        cache = LLMResponseCache(max_size=10)
+        for i in range(100):
+            cache.put(conversation(1, str(i)), "mock", make_response())
+        stats = cache.get_stats()
+        assert stats["size"] == 10
+        assert stats["evictions"] == 90
+
+
+class TestCacheKeys:
+    """Key generation."""
+
+    def test_key_is_deterministic(self):
+        cache = LLMResponseCache()
+        msgs = conversation(5)
+        assert cache._generate_key(msgs, "openai", temperature=0.1) == cache._generate_key(conversation(5), "openai", temperature=0.1)
+
+    def test_key_depends_on_request(self):
+        cache = LLMResponseCache()
+        base = cache._generate_key(conversation(3), "openai", temperature=0.1)
+        assert base != cache._generate_key(conversation(3), "anthropic", temperature=0.1)
+        assert base != cache._generate_key(conversation(3), "openai", temperature=0.2)
+        assert base != cache._generate_key(conversation(4), "openai", temperature=0.1)
+        assert base != cache._generate_key(conversation(3)[::-1], "openai", temperature=0.1)
+        assert base != cache._generate_key(conversation(3, "x"), "openai", temperature=0.1)
+
+    def test_role_is_part_of_key(self):
+        cache = LLMResponseCache()
+        assert cache._generate_key([Message(role="user", content="hi")], "mock") != cache._generate_key([Message(role="assistant", content="hi")], "mock")
+
+    def test_request_id_is_ignored(self):
+        cache = LLMResponseCache()
+        assert cache._generate_key(conversation(2), "mock", request_id="a") == cache._generate_key(conversation(2), "mock", request_id="b")
+
+    def test_message_digests_are_memoized_and_bounded(self):
+        cache = LLMResponseCache(digest_cache_size=8)
+        msgs = conversation(6)
+        cache._generate_key(msgs, "mock")
+        assert len(cache._digests) == 6
+        cache._generate_key(msgs + [Message(role="user", content="next")], "mock")
+        assert len(cache._digests) == 7
+        cache._generate_key(conversation(20, "long"), "mock")
+        assert len(cache._digests) == 8
+
+    def test_message_digests_are_bounded_by_content_size(self):
+        cache = LLMResponseCache(digest_cache_bytes=1000)
+        small = [Message(role="user", content="x" * 300)]
+        key = cache._generate_key(small, "mock")
+        assert cache._digest_bytes == 300
+        for i in range(3):
+            cache._generate_key([Message(role="user", content=str(i) * 300)], "mock")
+        assert cache._digest_bytes <= 1000
+        assert len(cache._digests) == 3
+        # Too large to memoize, but still keyed the same way every time
+        huge = [Message(role="user", content="y" * 5000)]
+        assert cache._generate_key(huge, "mock") == cache._generate_key(huge, "mock")
+        assert cache._digest_bytes <= 1000
+        assert cache._generate_key(small, "mock") == key
+
+
+class TestDiskTier:
+    """Persistent SQLite tier."""
+
+    def test_entries_are_shared_between_caches(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        response = make_response("persisted")
+        response.tool_calls = [ToolCall(id="call_1", function=Function(name="lookup", arguments='{"q": "x"}'))]
+        response.usage = {"prompt_tokens": 3, "completion_tokens": 1}
+        LLMResponseCache(disk=SQLiteCacheStore(path)).put(conversation(2), "mock", response)
+
+        # A second cache (another worker) with a cold memory tier
+        other = LLMResponseCache(disk=SQLiteCacheStore(path))
+        hit = other.get(conversation(2), "mock")
+
+        assert hit.content == "persisted"
+        assert hit.tool_calls[0].function.name == "lookup"
+        assert hit.usage == {"prompt_tokens": 3, "completion_tokens": 1}
+        assert other.get_stats()["disk_hits"] == 1
+        # Promoted into memory, so the next lookup does not touch disk
+        other.get(conversation(2), "mock")
+        assert other.get_stats()["disk_hits"] == 1
+
+    def test_expired_entries_are_not_served(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"), default_ttl=60)
+        LLMResponseCache(disk=store).put(conversation(1), "mock", make_response())
+        store._db().execute("UPDATE llm_cache SET created = ?", (time.time() - 120,))
+
+        assert LLMResponseCache(disk=store).get(conversation(1), "mock") is None
+        assert len(store) == 0
+
+    def test_evicts_least_recently_used_over_limit(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"), max_entries=5, evict_every=1, touch_interval=0)
+        cache = LLMResponseCache(max_size=1, disk=store)
+        for i in range(5):
+            cache.put(conversation(1, str(i)), "mock", make_response(str(i)))
+        # Read the oldest entry back from disk so it is no longer the LRU
+        time.sleep(0.01)
+        assert cache.get(conversation(1, "0"), "mock").content == "0"
+        cache.put(conversation(1, "5"), "mock", make_response("5"))
+
+        assert len(store) == 5
+        assert store.get(cache._generate_key(conversation(1, "0"), "mock")) is not None
+        assert store.get(cache._generate_key(conversation(1, "1"), "mock")) is None
+
+    def test_byte_limit(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"), max_bytes=2000, evict_every=1)
+        cache = LLMResponseCache(disk=store)
+        for i in range(20):
+            cache.put(conversation(1, str(i)), "mock", make_response("x" * 200))
+        size = store._db().execute("SELECT SUM(size) FROM llm_cache").fetchone()[0]
+        assert size <= 2000
+
+    def test_clear_reaches_disk(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"))
+        cache = LLMResponseCache(disk=store)
+        cache.put(conversation(1), "mock", make_response())
+        cache.clear()
+        assert len(store) == 0
+
+
+class TestCachedLLMManager:
+    """Caching manager wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_runs_off_the_event_loop(self, tmp_path):
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"))
+        threads = []
+        for name in ("get", "put"):
+            original = getattr(store, name)
+
+            def traced(*args, _original=original):
+                threads.append(threading.current_thread())
+                return _original(*args)
+
+            setattr(store, name, traced)
+        manager = Mock()
+        manager.chat = AsyncMock(return_value=make_response("fresh"))
+        cached = CachedLLMManager(manager, cache=LLMResponseCache(disk=store))
+
+        await cached.chat(conversation(2), provider="mock")
+        # A second worker with a cold memory tier reads from disk
+        other = CachedLLMManager(manager, cache=LLMResponseCache(disk=store))
+        hit = await other.chat(conversation(2), provider="mock")
+
+        assert hit.content == "fresh"
+        assert manager.chat.await_count == 1
+        assert len(threads) == 3
+        assert threading.main_thread() not in threads
+
+    @pytest.mark.asyncio
+    async def test_second_call_is_served_from_cache(self):
+        manager = Mock()
+        manager.chat = AsyncMock(return_value=make_response("fresh"))
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        first = await cached.chat(conversation(2), provider="mock")
+        second = await cached.chat(conversation(2), provider="mock")
+
+        assert first.content == second.content == "fresh"
+        assert manager.chat.await_count == 1
+        assert cached.get_cache_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self):
+        release = asyncio.Event()
+
+        async def slow_chat(messages, provider=None, **kwargs):
+            await release.wait()
+            return make_response("shared")
+
+        manager = Mock()
+        manager.chat = AsyncMock(side_effect=slow_chat)
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        tasks = [asyncio.create_task(cached.chat(conversation(2), provider="mock")) for _ in range(10)]
+        await asyncio.sleep(0)
+        assert cached.get_cache_stats()["inflight"] == 1
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert {r.content for r in results} == {"shared"}
+        assert manager.chat.await_count == 1
+        stats = cached.get_cache_stats()
+        assert stats["coalesced"] == 9
+        assert stats["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_requests_are_not_coalesced(self):
+        manager = Mock()
+        manager.chat = AsyncMock(side_effect=lambda messages, **kwargs: make_response(messages[0].content))
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        results = await asyncio.gather(*(cached.chat(conversation(1, str(i)), provider="mock") for i in range(3)))
+
+        assert [r.content for r in results] == [f"{i} message 0" for i in range(3)]
+        assert manager.chat.await_count == 3
+        assert cached.get_cache_stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_and_not_cached(self):
+        release = asyncio.Event()
+
+        async def failing_chat(messages, provider=None, **kwargs):
+            await release.wait()
+            raise RuntimeError("provider down")
+
+        manager = Mock()
+        manager.chat = AsyncMock(side_effect=failing_chat)
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        tasks = [asyncio.create_task(cached.chat(conversation(2), provider="mock")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert manager.chat.await_count == 1
+        assert cached.cache.get(conversation(2), "mock") is None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over_to_waiter(self):
+        started = asyncio.Event()
+
+        async def slow_chat(messages, provider=None, **kwargs):
+            started.set()
+            await asyncio.sleep(0.05)
+            return make_response("retried")
+
+        manager = Mock()
+        manager.chat = AsyncMock(side_effect=slow_chat)
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        leader = asyncio.create_task(cached.chat(conversation(2), provider="mock"))
+        await started.wait()
+        follower = asyncio.create_task(cached.chat(conversation(2), provider="mock"))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert (await follower).content == "retried"
+        assert manager.chat.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_chat_with_tools_is_coalesced(self):
+        release = asyncio.Event()
+        tools = [{"type": "function", "function": {"name": "lookup"}}]
+
+        async def slow_chat(messages, tools, provider=None, **kwargs):
+            await release.wait()
+            return make_response("tools")
+
+        manager = Mock()
+        manager.chat_with_tools = AsyncMock(side_effect=slow_chat)
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        tasks = [asyncio.create_task(cached.chat_with_tools(conversation(2), tools, provider="mock")) for _ in range(4)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert manager.chat_with_tools.await_count == 1
+        assert cached.get_cache_stats()["coalesced"] == 3
+        # Tools are part of the key
+        assert cached.cache.get(conversation(2), "mock") is None
+        assert cached.cache.get(conversation(2), "mock", tools=tools).content == "tools"
+
+
+def stream_of(*deltas: str, provider: str = "mock"):
+    """chat_stream stand-in yielding chunks with accumulated content."""
+    calls = []
+
+    async def chat_stream(messages, provider=None, **kwargs):
+        calls.append(messages)
+        content = ""
+        for i, delta in enumerate(deltas):
+            content += delta
+            yield LLMResponseChunk(
+                content=content,
+                delta=delta,
+                provider="mock",
+                model="mock-model",
+                finish_reason="stop" if i == len(deltas) - 1 else None,
+                usage={"completion_tokens": len(deltas)} if i == len(deltas) - 1 else None,
+                chunk_index=i
+            )
+    return chat_stream, calls
+
+
+class TestStreaming:
+    """Stream caching and replay."""
+
+    @pytest.mark.asyncio
+    async def test_completed_stream_is_cached_and_replayed(self):
+        chat_stream, calls = stream_of("The shop ", "opened in ", "1952.")
+        manager = Mock()
+        manager.chat_stream = chat_stream
+        cached = CachedLLMManager(manager, cache=LLMResponseCache(), replay_chunk_size=4)
+
+        live = [c async for c in cached.chat_stream(conversation(1), provider="mock")]
+        replay = [c async for c in cached.chat_stream(conversation(1), provider="mock")]
+
+        assert len(calls) == 1
+        assert "".join(c.delta for c in live) == "".join(c.delta for c in replay) == "The shop opened in 1952."
+        assert replay[-1].content == "The shop opened in 1952."
+        assert replay[-1].finish_reason == "stop"
+        assert replay[-1].usage == {"completion_tokens": 3}
+        assert all(c.finish_reason is None for c in replay[:-1])
+        assert [c.chunk_index for c in replay] == list(range(len(replay)))
+        assert replay[0].metadata["cached"] is True
+        assert cached.get_cache_stats()["stream"] == {"replayed": 1, "stored": 1}
+
+    @pytest.mark.asyncio
+    async def test_stream_shares_cache_with_chat(self):
+        manager = Mock()
+        manager.chat = AsyncMock(return_value=make_response("from chat"))
+        manager.chat_stream = Mock()
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        await cached.chat(conversation(2), provider="mock")
+        chunks = [c async for c in cached.chat_stream(conversation(2), provider="mock")]
+
+        assert chunks[-1].content == "from chat"
+        manager.chat_stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_is_not_cached(self):
+        chat_stream, calls = stream_of("a", "b", "c")
+        manager = Mock()
+        manager.chat_stream = chat_stream
+        cached = CachedLLMManager(manager, cache=LLMResponseCache())
+
+        stream = cached.chat_stream(conversation(1), provider="mock")
+        await stream.__anext__()
+        await stream.aclose()
+        [c async for c in cached.chat_stream(conversation(1), provider="mock")]
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_replay_pacing(self):
+        cache = LLMResponseCache()
+        cache.put(conversation(1), "mock", make_response("x" * 40))
+        cached = CachedLLMManager(Mock(), cache=cache, replay_chunk_size=10)
+
+        start = time.perf_counter()
+        chunks = [c async for c in cached.chat_stream(conversation(1), provider="mock", replay_delay=0.02)]
+
+        assert len(chunks) == 4
+        assert time.perf_counter() - start >= 0.06
@@ -0,0 +1,54 @@
+"""
+Tests for the loop-bound LLM gateway.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from spoon.llm_gateway import LLMGateway
+
+
+def stub_manager(content: str = "ok") -> Mock:
+    manager = Mock()
+    manager.chat = AsyncMock(return_value=Mock(content=content))
+    manager.cleanup = AsyncMock()
+    return manager
+
+
+class TestRebinding:
+    """A new event loop gets a fresh manager from the factory."""
+
+    def test_factory_is_used_on_every_loop(self):
+        made = []
+
+        def factory():
+            made.append(stub_manager(f"m{len(made)}"))
+            return made[-1]
+
+        gateway = LLMGateway(manager_factory=factory)
+        first = asyncio.run(gateway.chat("p", "m", "system", "hi"))
+
+        async def second_loop():
+            result = await gateway.chat("p", "m", "system", "hi")
+            # Let the retired manager's cleanup task run
+            await asyncio.sleep(0)
+            return result
+
+        second = asyncio.run(second_loop())
+
+        assert (first, second) == ("m0", "m1")
+        assert len(made) == 2
+        made[0].cleanup.assert_awaited_once()
+        made[1].cleanup.assert_not_awaited()
+        assert gateway.stats["rebinds"] == 1
+
+    @pytest.mark.asyncio
+    async def test_same_loop_reuses_manager(self):
+        factory = Mock(side_effect=stub_manager)
+        gateway = LLMGateway(manager_factory=factory)
+        await gateway.chat("p", "m", "system", "a")
+        await gateway.chat("p", "m", "system", "b")
+        await gateway.aclose()
+        assert factory.call_count == 1
@@ -0,0 +1,99 @@
+"""
+Tests for the Genius Loci argue graph runner.
+"""
+
+import asyncio
+
+import pytest
+
+
+def diamond(loci, nodes):
+    graph = loci.StateGraph()
+    for name, fn in nodes.items():
+        graph.add_node(name, fn)
+    graph.add_edge("a", "b")
+    graph.add_edge("a", "c")
+    graph.add_edge("b", "d")
+    graph.add_edge("c", "d")
+    graph.set_entry("a")
+    graph.set_exit("d")
+    return graph
+
+
+def setter(key, value, delay=0.0):
+    async def node(state):
+        await asyncio.sleep(delay)
+        return {**state, key: value}
+    return node
+
+
+class TestLevels:
+    """Topological grouping."""
+
+    def test_diamond_levels(self, loci):
+        graph = diamond(loci, {n: setter(n, 1) for n in "abcd"})
+        assert graph.levels() == [["a"], ["b", "c"], ["d"]]
+
+    def test_argue_graph_runs_historian_and_vibe_together(self, loci):
+        levels = loci.build_argue_graph().levels()
+        assert any({"historian", "vibe"} <= set(level) for level in levels)
+
+
+class TestRunLevel:
+    """Concurrent execution and state merging."""
+
+    @pytest.mark.asyncio
+    async def test_level_nodes_run_concurrently(self, loci):
+        graph = diamond(loci, {"a": setter("a", 1), "b": setter("b", 2, 0.05), "c": setter("c", 3, 0.05), "d": setter("d", 4)})
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        final = await graph.run({"seed": 0})
+        assert loop.time() - start < 0.09
+        assert {k: final[k] for k in "abcd"} == {"a": 1, "b": 2, "c": 3, "d": 4}
+
+    @pytest.mark.asyncio
+    async def test_nodes_see_the_same_input_and_merge_in_level_order(self, loci):
+        seen = {}
+
+        def recorder(name, value, delay):
+            async def node(state):
+                seen[name] = dict(state)
+                await asyncio.sleep(delay)
+                return {**state, "shared": value, name: True}
+            return node
+
+        graph = diamond(loci, {"a": setter("shared", "a"), "b": recorder("b", "from b", 0.02), "c": recorder("c", "from c", 0.0), "d": setter("d", 1)})
+        final = await graph.run({})
+
+        # c finishes first, but b comes first in the level, so c's write lands last
+        assert seen["b"] == seen["c"] == {"shared": "a"}
+        assert final["shared"] == "from c"
+        assert final["b"] and final["c"]
+
+    @pytest.mark.asyncio
+    async def test_on_node_reports_each_delta(self, loci):
+        graph = diamond(loci, {n: setter(n, n.upper()) for n in "abcd"})
+        events = []
+        await graph.run({}, lambda name, update: events.append((name, update)))
+        assert sorted(events) == [(n, {n: n.upper()}) for n in "abcd"]
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_the_rest_of_the_level(self, loci):
+        cancelled = asyncio.Event()
+
+        async def slow(state):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return state
+
+        async def boom(state):
+            raise RuntimeError("vibe failed")
+
+        graph = diamond(loci, {"a": setter("a", 1), "b": slow, "c": boom, "d": setter("d", 1)})
+        with pytest.raises(RuntimeError, match="vibe failed"):
+            await graph.run({})
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
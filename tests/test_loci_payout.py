@@ -0,0 +1,81 @@
+"""
+Tests for the Genius Loci payout node and verification logging.
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from spoon.spirit_registry import Spirit
+from spoon.verification_log import COLUMNS
+
+
+def approved(location: str, reward: float = 1.0) -> dict:
+    return {"wallet": "0xfan", "location": location, "image": "ramen.jpg", "payout_approved": True, "treasurer": "APPROVE", "reward_usdc": reward, "vibe_score": 90}
+
+
+def logged(loci, final: dict) -> dict:
+    loci._log_verification("hash", final)
+    return dict(zip(COLUMNS, loci.verification_log._pending.pop()))
+
+
+@pytest.fixture
+def onchain(loci, monkeypatch):
+    monkeypatch.setenv("PAYOUT_SIGN_WITH", "signer")
+    monkeypatch.setenv("WEB3_RPC_URL", "http://rpc")
+    submit = AsyncMock()
+    monkeypatch.setattr(loci.onchain_payouts, "submit", submit)
+    return submit
+
+
+class TestOnchainPayout:
+    """Broadcast payouts are recorded as paid."""
+
+    @pytest.mark.asyncio
+    async def test_tx_hash_is_recorded_and_logged_as_paid(self, loci, onchain):
+        await loci.spirits.upsert(Spirit("chain-shop", budget_usdc=5.0))
+        onchain.return_value = "Broadcast ok\nTxHash: 0xabc\nstatus: pending"
+
+        final = await loci.payout_node(approved("chain-shop"))
+
+        assert final["tx_hash"] == "0xabc"
+        record = logged(loci, final)
+        assert record["paid_usdc"] == 1.0 and record["tx_hash"] == "0xabc"
+
+    @pytest.mark.asyncio
+    async def test_result_without_tx_hash_releases_budget(self, loci, onchain):
+        await loci.spirits.upsert(Spirit("chain-fail", budget_usdc=1.0))
+        onchain.return_value = "insufficient funds"
+
+        final = await loci.payout_node(approved("chain-fail"))
+
+        assert loci.spirits.get("chain-fail").paid_usdc == 0.0
+        assert logged(loci, final)["paid_usdc"] == 0.0
+
+
+class TestMockPayout:
+    """Simulated payouts."""
+
+    @pytest.mark.asyncio
+    async def test_paid_amount_is_logged(self, loci, monkeypatch):
+        monkeypatch.setenv("PAYOUT_SIGN_WITH", "")
+        monkeypatch.setattr(loci.mock_payouts, "submit", AsyncMock(return_value={"success": True, "tx_hash": "0xMOCK"}))
+        await loci.spirits.upsert(Spirit("mock-shop", default_reward=2.5, budget_usdc=10.0))
+
+        final = await loci.payout_node(approved("mock-shop"))
+
+        assert logged(loci, final)["paid_usdc"] == 2.5
+        assert loci.spirits.get("mock-shop").paid_usdc == 2.5
+
+    @pytest.mark.asyncio
+    async def test_budget_exhausted(self, loci, monkeypatch):
+        monkeypatch.setenv("PAYOUT_SIGN_WITH", "")
+        submit = AsyncMock(return_value={"success": True, "tx_hash": "0xMOCK"})
+        monkeypatch.setattr(loci.mock_payouts, "submit", submit)
+        await loci.spirits.upsert(Spirit("broke-shop", default_reward=2.0, budget_usdc=1.0))
+
+        final = await loci.payout_node(approved("broke-shop"))
+
+        assert final["payout"] == "Spirit budget exhausted"
+        assert not final["payout_approved"]
+        submit.assert_not_awaited()
+        assert logged(loci, final)["paid_usdc"] == 0.0
@@ -0,0 +1,86 @@
+"""
+Tests for the /api/argue/stream Server-Sent Events endpoint.
+"""
+
+import io
+import json
+import random
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from spoon.mock_wallet import LatencyDistribution
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def noise_png(seed: int) -> bytes:
+    # Random pixels, so no two test uploads are near-duplicates
+    rng = random.Random(seed)
+    im = Image.new("L", (32, 32))
+    im.putdata([rng.randrange(256) for _ in range(32 * 32)])
+    out = io.BytesIO()
+    im.save(out, "PNG")
+    return out.getvalue()
+
+
+def parse_sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def fast_pipeline(loci, monkeypatch):
+    monkeypatch.setattr(loci.llm_gateway, "chat", AsyncMock(return_value="an opinion"))
+    monkeypatch.setattr(loci.mock_wallet, "latency", LatencyDistribution("fixed", 0.0, 0.0))
+    monkeypatch.setattr(loci.mock_wallet, "verbose", False)
+    for name in ("PAYOUT_SIGN_WITH", "WEB3_RPC_URL"):
+        monkeypatch.delenv(name, raising=False)
+
+
+async def stream(loci, seed: int, wallet: str) -> list:
+    transport = httpx.ASGITransport(app=loci.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loci") as client:
+        resp = await client.post(
+            "/api/argue/stream",
+            data={"wallet": wallet},
+            files={"file": ("photo.png", noise_png(seed), "image/png")},
+        )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    return parse_sse(resp.text)
+
+
+class TestArgueStream:
+    """Node events in graph order, then exactly one final event."""
+
+    @pytest.mark.asyncio
+    async def test_node_events_precede_the_result(self, loci, uploads, fast_pipeline):
+        events = await stream(loci, 1, "0xstream-ok")
+
+        kinds = [kind for kind, _ in events]
+        nodes = [payload["node"] for kind, payload in events if kind == "node"]
+        assert kinds == ["node"] * len(nodes) + ["result"]
+        assert nodes[:2] == ["vision", "early_exit"]
+        assert set(nodes[2:4]) == {"historian", "vibe"}
+        assert nodes[4:] == ["treasurer", "payout"]
+        # The image bytes never reach the client
+        assert all("image_bytes" not in payload for _, payload in events)
+        assert events[-1][1]["tx_hash"].startswith("0x")
+
+    @pytest.mark.asyncio
+    async def test_failure_ends_the_stream_with_an_error_event(self, loci, uploads, fast_pipeline, monkeypatch):
+        async def broken(state):
+            raise RuntimeError("historian exploded")
+
+        monkeypatch.setattr(loci, "historian_node", broken)
+        events = await stream(loci, 2, "0xstream-err")
+
+        kinds = [kind for kind, _ in events]
+        assert kinds[:2] == ["node", "node"]
+        assert kinds[-1] == "error" and "result" not in kinds
+        assert events[-1][1] == {"status": 500, "detail": "historian exploded"}
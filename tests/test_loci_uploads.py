@@ -0,0 +1,108 @@
+"""
+Tests for Genius Loci upload handling.
+"""
+
+import io
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def png(size=(8, 8), color=(200, 40, 40)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "PNG")
+    return out.getvalue()
+
+
+class BytesOnlyClient:
+    """Rejects a bytearray the way the Gemini SDK does."""
+
+    name = "bytes-only"
+    cache_tag = "bytes-only"
+
+    def __init__(self):
+        self.seen = []
+
+    async def describe(self, data, mime):
+        if not isinstance(data, bytes):
+            raise TypeError(f"expected bytes, {type(data).__name__} found")
+        self.seen.append((len(data), mime))
+        return "A red square."
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def bytes_only_vision(loci, monkeypatch):
+    client = BytesOnlyClient()
+    monkeypatch.setitem(loci.vision_clients._clients, client.name, client)
+    monkeypatch.setattr(loci.vision_clients, "available", lambda: [client.name])
+    return client
+
+
+class TestUploadToVision:
+    """An upload reaches the vision client as bytes."""
+
+    @pytest.mark.asyncio
+    async def test_small_png_is_sent_unchanged_as_bytes(self, loci, bytes_only_vision):
+        original = png(color=(17, 99, 201))
+        dest, data = await loci._save_upload(UploadFile(io.BytesIO(original), filename="small.png"))
+        try:
+            prepared, mime, saved = await loci.image_prep.prepare(data)
+            update = await loci.vision_node({"image": str(dest), "image_bytes": prepared, "image_mime": mime})
+        finally:
+            dest.unlink(missing_ok=True)
+
+        assert isinstance(data, bytes)
+        assert saved == 0 and prepared == original
+        assert update["vision"] == "A red square."
+        assert bytes_only_vision.seen == [(len(original), "image/png")]
+
+
+class TestSaveUpload:
+    """Type and size checks, and no partial files left behind."""
+
+    @pytest.mark.asyncio
+    async def test_non_image_is_rejected_before_writing(self, loci, uploads):
+        with pytest.raises(HTTPException) as exc:
+            await loci._save_upload(UploadFile(io.BytesIO(b"GIF89a not allowed"), filename="anim.gif"))
+        assert exc.value.status_code == 415
+        assert not any(p.name.endswith("_anim.gif") for p in uploads.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_declared_size_over_limit_is_rejected(self, loci, uploads, monkeypatch):
+        monkeypatch.setattr(loci, "MAX_UPLOAD_BYTES", 100)
+        with pytest.raises(HTTPException) as exc:
+            await loci._save_upload(UploadFile(io.BytesIO(png()), filename="declared.png", size=101))
+        assert exc.value.status_code == 413
+        assert not any(p.name.endswith("_declared.png") for p in uploads.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_streamed_size_over_limit_removes_the_partial_file(self, loci, uploads, monkeypatch):
+        data = png(size=(64, 64)) + bytes(4096)
+        monkeypatch.setattr(loci, "MAX_UPLOAD_BYTES", len(data) - 1)
+        monkeypatch.setattr(loci, "UPLOAD_CHUNK", 512)
+        # No declared size, so the limit is only hit while streaming
+        with pytest.raises(HTTPException) as exc:
+            await loci._save_upload(UploadFile(io.BytesIO(data), filename="streamed.png"))
+        assert exc.value.status_code == 413
+        assert not any(p.name.endswith("_streamed.png") for p in uploads.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_same_name_uploads_are_stored_apart(self, loci, uploads):
+        saved = [await loci._save_upload(UploadFile(io.BytesIO(png(color=(i, 0, 0))), filename="same.png")) for i in range(3)]
+        paths = {dest for dest, _ in saved}
+        assert len(paths) == 3
+        assert all(dest.read_bytes() == data for dest, data in saved)
+
+    @pytest.mark.asyncio
+    async def test_endpoint_reports_unsupported_type(self, loci, uploads):
+        transport = httpx.ASGITransport(app=loci.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loci") as client:
+            resp = await client.post("/api/argue", data={"wallet": "0xupload-415"}, files={"file": ("notes.txt", b"hello", "text/plain")})
+        assert resp.status_code == 415
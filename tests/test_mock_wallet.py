@@ -0,0 +1,94 @@
+"""
+Tests for the asyncio-native mock EVM wallet.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from spoon.mock_wallet import LatencyDistribution, MockEVMWallet
+
+
+def instant_wallet(**kwargs) -> MockEVMWallet:
+    return MockEVMWallet(latency=LatencyDistribution.parse("fixed:0"), verbose=False, **kwargs)
+
+
+class TestLatencyDistribution:
+    """Spec parsing and sampling."""
+
+    def test_parse_uniform(self):
+        dist = LatencyDistribution.parse("uniform:0.1:0.3")
+        rng = random.Random(0)
+        samples = [dist.sample(rng) for _ in range(500)]
+        assert (dist.kind, dist.low, dist.high) == ("uniform", 0.1, 0.3)
+        assert 0.1 <= min(samples) and max(samples) <= 0.3
+
+    def test_parse_fixed(self):
+        dist = LatencyDistribution.parse("fixed:0.25")
+        assert dist.sample(random.Random(0)) == 0.25
+
+    def test_parse_lognormal_is_capped(self):
+        dist = LatencyDistribution.parse("lognormal:0.05:0.2:1.5")
+        assert dist.sigma == 1.5
+        samples = [dist.sample(random.Random(i)) for i in range(500)]
+        assert max(samples) == 0.2
+        assert sorted(samples)[250] == pytest.approx(0.05, rel=0.3)
+        assert LatencyDistribution.parse("lognormal:0.05:0.2").sigma == 0.4
+
+    def test_unknown_kind_falls_back_to_uniform(self):
+        assert LatencyDistribution.parse("weird:1:2").kind == "uniform"
+
+
+class TestMockEVMWallet:
+    """Balances, failures and transaction hashes."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_sends_reconcile(self):
+        wallet = instant_wallet(seed=1)
+        addresses = [f"0x{i % 7}" for i in range(200)]
+        results = await asyncio.gather(*(wallet.send_usdc(a, 0.5) for a in addresses))
+
+        assert all(r["success"] for r in results)
+        assert len({r["tx_hash"] for r in results}) == 200
+        assert wallet.total_sent == pytest.approx(100.0)
+        assert sum(wallet.balances.values()) == pytest.approx(wallet.total_sent)
+        assert wallet.stats == {"tx": 200, "transfers": 200, "failures": 0}
+
+    @pytest.mark.asyncio
+    async def test_batch_is_one_transaction(self):
+        wallet = instant_wallet()
+        result = await wallet.send_usdc_batch([("0xa", 1.0), ("0xb", 2.0), ("0xa", 0.5)])
+
+        assert result["success"]
+        assert [t["balance"] for t in result["transfers"]] == [1.0, 2.0, 1.5]
+        assert wallet.stats == {"tx": 1, "transfers": 3, "failures": 0}
+        assert sum(wallet.balances.values()) == pytest.approx(wallet.total_sent) == pytest.approx(3.5)
+
+    @pytest.mark.asyncio
+    async def test_failure_rate(self):
+        wallet = instant_wallet(failure_rate=0.3, seed=7)
+        results = await asyncio.gather(*(wallet.send_usdc("0xa") for _ in range(1000)))
+        failed = [r for r in results if not r["success"]]
+
+        assert 200 <= len(failed) <= 400
+        assert wallet.stats["failures"] == len(failed)
+        # Failed transfers are not credited
+        assert wallet.balances["0xa"] == pytest.approx(1000 - len(failed))
+        assert wallet.total_sent == pytest.approx(wallet.balances["0xa"])
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_credits_nobody(self):
+        wallet = instant_wallet(failure_rate=1.0)
+        result = await wallet.send_usdc_batch([("0xa", 1.0), ("0xb", 1.0)])
+        assert not result["success"]
+        assert [t["to_address"] for t in result["transfers"]] == ["0xa", "0xb"]
+        assert wallet.balances == {} and wallet.total_sent == 0.0
+
+    @pytest.mark.asyncio
+    async def test_latency_is_awaited_not_blocking(self):
+        wallet = MockEVMWallet(latency=LatencyDistribution.parse("fixed:0.1"), verbose=False)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(wallet.send_usdc("0xa") for _ in range(20)))
+        assert loop.time() - start < 0.5
@@ -0,0 +1,89 @@
+"""
+Tests for batched USDC payouts.
+"""
+
+import asyncio
+
+import pytest
+
+from spoon.payout_batcher import PayoutBatcher
+
+
+class RecordingSettler:
+    """settle() stand-in that records each batch it receives."""
+
+    def __init__(self, fail=(), error=None):
+        self.batches = []
+        self.fail = set(fail)
+        self.error = error
+
+    async def __call__(self, transfers):
+        self.batches.append(list(transfers))
+        if self.error is not None:
+            raise self.error
+        return [ValueError(f"rejected {to}") if to in self.fail else f"tx-{to}" for to, _ in transfers]
+
+
+class TestBatching:
+    """When batches are flushed."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self):
+        settle = RecordingSettler()
+        batcher = PayoutBatcher(settle, max_batch=4, window=60)
+
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(f"0x{i}", 1.0) for i in range(8))), 1)
+
+        assert results == [f"tx-0x{i}" for i in range(8)]
+        assert [len(b) for b in settle.batches] == [4, 4]
+        assert batcher.snapshot()["largest_batch"] == 4
+
+    @pytest.mark.asyncio
+    async def test_flushes_partial_batch_after_window(self):
+        settle = RecordingSettler()
+        batcher = PayoutBatcher(settle, max_batch=32, window=0.02)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(batcher.submit("0xa", 1.0), batcher.submit("0xb", 2.5))
+
+        assert results == ["tx-0xa", "tx-0xb"]
+        assert settle.batches == [[("0xa", 1.0), ("0xb", 2.5)]]
+        assert loop.time() - start >= 0.02
+
+    @pytest.mark.asyncio
+    async def test_drain_settles_pending(self):
+        settle = RecordingSettler()
+        batcher = PayoutBatcher(settle, max_batch=32, window=60)
+        pending = asyncio.create_task(batcher.submit("0xa", 1.0))
+        await asyncio.sleep(0)
+
+        await batcher.drain()
+
+        assert await pending == "tx-0xa"
+        assert batcher.snapshot()["pending"] == 0
+
+
+class TestFailures:
+    """Errors reach the right callers."""
+
+    @pytest.mark.asyncio
+    async def test_per_transfer_failure_reaches_only_its_caller(self):
+        settle = RecordingSettler(fail={"0xb"})
+        batcher = PayoutBatcher(settle, max_batch=3, window=60)
+
+        results = await asyncio.gather(*(batcher.submit(to, 1.0) for to in ("0xa", "0xb", "0xc")), return_exceptions=True)
+
+        assert results[0] == "tx-0xa"
+        assert isinstance(results[1], ValueError) and "0xb" in str(results[1])
+        assert results[2] == "tx-0xc"
+        assert batcher.stats["failed_batches"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        batcher = PayoutBatcher(RecordingSettler(error=RuntimeError("rpc down")), max_batch=2, window=60)
+
+        results = await asyncio.gather(batcher.submit("0xa", 1.0), batcher.submit("0xb", 1.0), return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert batcher.stats["failed_batches"] == 1
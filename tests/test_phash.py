@@ -0,0 +1,84 @@
+"""
+Tests for the near-duplicate image index.
+"""
+
+import asyncio
+
+import pytest
+
+from spoon.phash import MultiIndexHash, NearDuplicateIndex
+
+
+def spread(i: int) -> int:
+    # Distinct values of i give hashes at least 8 bits apart
+    return i * 0x0101010101010101
+
+
+class TestMultiIndexHash:
+    """Bounded Hamming-radius index."""
+
+    def test_finds_within_radius(self):
+        index = MultiIndexHash(radius=4)
+        index.add(0b1011, "a")
+        index.add(0xFFFF_0000_FFFF_0000, "b")
+        assert [v for _, v in index.search(0b1000)] == ["a"]
+
+    def test_capacity_overwrites_oldest(self):
+        index = MultiIndexHash(radius=2, capacity=3)
+        for i in range(5):
+            index.add(spread(i), str(i))
+        assert index.size == 3
+        assert index.search(spread(0)) == []
+        assert index.search(spread(1)) == []
+        assert [v for _, v in index.search(spread(4))] == ["4"]
+
+    def test_remove(self):
+        index = MultiIndexHash(radius=2)
+        slot = index.add(7, "x")
+        index.remove(slot)
+        assert index.size == 0
+        assert index.search(7) == []
+
+
+class TestNearDuplicateIndex:
+    """Claiming and settling uploads."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_near_duplicates_wait_for_first_verdict(self):
+        dups = NearDuplicateIndex(threshold=4)
+        prior, ticket = await dups.claim(0b1111)
+        assert prior is None
+
+        waiters = [asyncio.create_task(dups.claim(0b1110)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert not any(w.done() for w in waiters)
+
+        dups.settle(ticket, {"image_hash": "abc", "vibe_score": 9})
+        results = await asyncio.gather(*waiters)
+
+        assert all(prior["image_hash"] == "abc" and ticket is None for prior, ticket in results)
+        assert dups.stats["waited"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_upload_releases_slot(self):
+        dups = NearDuplicateIndex(threshold=4)
+        _, ticket = await dups.claim(0b1111)
+        waiter = asyncio.create_task(dups.claim(0b1111))
+        await asyncio.sleep(0)
+
+        dups.settle(ticket, None)
+        prior, second = await waiter
+
+        # The waiter becomes the new leader instead of reusing a failed verdict
+        assert prior is None and second is not None
+        assert dups.stats["abandoned"] == 1
+
+    @pytest.mark.asyncio
+    async def test_records_are_capped(self):
+        dups = NearDuplicateIndex(threshold=2, capacity=10)
+        for i in range(25):
+            _, ticket = await dups.claim(spread(i))
+            dups.settle(ticket, {"image_hash": str(i)})
+        assert dups.snapshot()["size"] == 10
+        assert dups.find(spread(0)) is None
+        assert dups.find(spread(24))["image_hash"] == "24"
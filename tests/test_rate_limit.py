@@ -0,0 +1,64 @@
+"""
+Tests for per-wallet and per-location rate limiting.
+"""
+
+import pytest
+
+from spoon.rate_limit import InMemoryBucketStore, RateLimiter
+
+
+class TestInMemoryBucketStore:
+    """Token bucket arithmetic."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_wait(self):
+        store = InMemoryBucketStore()
+        assert [await store.take("k", rate=1.0, burst=2) for _ in range(2)] == [0.0, 0.0]
+        wait = await store.take("k", rate=1.0, burst=2)
+        assert 0.9 < wait <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_keys_are_bounded(self):
+        store = InMemoryBucketStore(max_keys=3)
+        for i in range(10):
+            await store.take(str(i), rate=1.0, burst=1)
+        assert list(store._buckets) == ["7", "8", "9"]
+
+
+class TestRateLimiter:
+    """Checks across scopes."""
+
+    @pytest.mark.asyncio
+    async def test_limits_after_burst(self):
+        limiter = RateLimiter({"wallet": (0.001, 2)})
+        assert await limiter.check(wallet="w") is None
+        assert await limiter.check(wallet="w") is None
+        scope, wait = await limiter.check(wallet="w")
+        assert scope == "wallet" and wait > 0
+        assert await limiter.check(wallet="other") is None
+
+    @pytest.mark.asyncio
+    async def test_denied_request_refunds_earlier_scopes(self):
+        limiter = RateLimiter({"wallet": (0.001, 2), "location": (0.001, 1)})
+        assert await limiter.check(wallet="w", location="shop") is None
+
+        # The location is exhausted; the wallet token spent on this attempt
+        # must be given back.
+        assert (await limiter.check(wallet="w", location="shop"))[0] == "location"
+        assert await limiter.check(wallet="w", location="elsewhere") is None
+        assert (await limiter.check(wallet="w", location="third"))[0] == "wallet"
+        assert limiter.stats["wallet"] == {"allowed": 2, "limited": 1}
+        assert limiter.stats["location"] == {"allowed": 2, "limited": 1}
+
+    @pytest.mark.asyncio
+    async def test_zero_rate_disables_scope(self):
+        limiter = RateLimiter({"wallet": (0, 1), "location": (0.001, 1)})
+        assert "wallet" not in limiter.snapshot()
+        for _ in range(3):
+            assert await limiter.check(wallet="w") is None
+
+    @pytest.mark.asyncio
+    async def test_missing_key_skips_scope(self):
+        limiter = RateLimiter({"wallet": (0.001, 1), "location": (0.001, 1)})
+        assert await limiter.check(wallet="w", location="") is None
+        assert await limiter.check(wallet="", location="shop") is None
@@ -0,0 +1,229 @@
+"""
+Tests for the semantic (embedding-similarity) cache.
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+np = pytest.importorskip("numpy")
+
+from spoon_ai.llm.cache import LLMResponseCache, CachedLLMManager
+from spoon_ai.llm.interface import LLMResponse
+from spoon_ai.llm.semantic_cache import SemanticCache, VectorIndex
+from spoon_ai.schema import Message
+
+
+def make_response(content: str = "ok") -> LLMResponse:
+    return LLMResponse(
+        content=content,
+        provider="mock",
+        model="mock-model",
+        finish_reason="stop",
+        native_finish_reason="stop"
+    )
+
+
+def conversation(n: int, tag: str = "") -> list:
+    return [Message(role="user" if i % 2 == 0 else "assistant", content=f"{tag} message {i}") for i in range(n)]
+
+
+def embedder(vectors: dict):
+    """Embedding function returning fixed vectors for known prompts."""
+    async def embed(text):
+        return vectors[text]
+    return embed
+
+
+def prompt(text: str, system: str = "You are a historian.") -> list:
+    return [Message(role="system", content=system), Message(role="user", content=text)]
+
+
+class TestVectorIndex:
+    """Brute-force and LSH similarity search."""
+
+    def unit(self, rng, n, dim=32):
+        v = rng.standard_normal((n, dim)).astype(np.float32)
+        return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+    def test_brute_force_finds_nearest(self):
+        rng = np.random.default_rng(1)
+        vectors = self.unit(rng, 100)
+        index = VectorIndex(32, ann_threshold=1000)
+        for v in vectors:
+            index.add(v)
+        slot, score = index.search(vectors[42])[0]
+        assert not index.ann
+        assert slot == 42 and score == pytest.approx(1.0, abs=1e-5)
+
+    def test_lsh_finds_near_duplicates(self):
+        rng = np.random.default_rng(2)
+        vectors = self.unit(rng, 3000)
+        index = VectorIndex(32, ann_threshold=500)
+        for v in vectors:
+            index.add(v)
+        assert index.ann
+        found = 0
+        for i in range(0, 3000, 30):
+            query = vectors[i] + 0.05 * self.unit(rng, 1)[0]
+            query /= np.linalg.norm(query)
+            results = index.search(query)
+            found += bool(results) and results[0][0] == i
+        assert found >= 95
+
+    def test_storage_starts_small_and_grows(self):
+        rng = np.random.default_rng(4)
+        vectors = self.unit(rng, 20)
+        index = VectorIndex(32, capacity=10000, ann_threshold=10)
+        assert index._vectors.shape[0] == 8
+        for v in vectors:
+            index.add(v)
+        assert index._vectors.shape[0] == 32
+        assert index.ann and len(index._signatures) == 32
+        assert index.search(vectors[17])[0][0] == 17
+
+    def test_capacity_overwrites_oldest(self):
+        rng = np.random.default_rng(3)
+        vectors = self.unit(rng, 12)
+        index = VectorIndex(32, capacity=10, ann_threshold=5)
+        for v in vectors:
+            index.add(v)
+        assert len(index) == 10
+        assert all(score < 0.99 for _, score in index.search(vectors[0], k=10))
+        assert index.search(vectors[11])[0] == (1, pytest.approx(1.0, abs=1e-5))
+
+
+class TestSemanticCache:
+    """Embedding-similarity lookups."""
+
+    VECTORS = {
+        "Tell me the history of this ramen shop.": [1.0, 0.0, 0.0],
+        "What's the story behind this ramen shop?": [0.97, 0.2, 0.0],
+        "Recommend a dessert.": [0.0, 0.0, 1.0],
+    }
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_hits_above_threshold(self):
+        cache = SemanticCache(embedder(self.VECTORS), threshold=0.9)
+        await cache.put(prompt("Tell me the history of this ramen shop."), "mock", make_response("history"), model="m")
+
+        hit = await cache.get(prompt("What's the story behind this ramen shop?"), "mock", model="m")
+        assert hit.content == "history"
+        assert await cache.get(prompt("Recommend a dessert."), "mock", model="m") is None
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_scoped_by_provider_model_and_system_prompt(self):
+        cache = SemanticCache(embedder(self.VECTORS), threshold=0.9)
+        await cache.put(prompt("Tell me the history of this ramen shop."), "mock", make_response(), model="m")
+        paraphrase = "What's the story behind this ramen shop?"
+
+        assert await cache.get(prompt(paraphrase), "other", model="m") is None
+        assert await cache.get(prompt(paraphrase), "mock", model="m2") is None
+        assert await cache.get(prompt(paraphrase, system="You are a critic."), "mock", model="m") is None
+        assert await cache.get(prompt(paraphrase), "mock", model="m") is not None
+
+    @pytest.mark.asyncio
+    async def test_requests_not_ending_with_user_message_are_skipped(self):
+        cache = SemanticCache(embedder(self.VECTORS))
+        messages = conversation(2)
+        await cache.put(messages, "mock", make_response())
+        assert await cache.get(messages, "mock") is None
+        assert cache.get_stats()["skipped"] == 1
+        assert cache.get_stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_manager_serves_paraphrase_without_provider_call(self):
+        manager = Mock()
+        manager.chat = AsyncMock(return_value=make_response("history"))
+        cached = CachedLLMManager(manager, cache=LLMResponseCache(), semantic_cache=SemanticCache(embedder(self.VECTORS), threshold=0.9))
+
+        await cached.chat(prompt("Tell me the history of this ramen shop."), provider="mock")
+        second = await cached.chat(prompt("What's the story behind this ramen shop?"), provider="mock")
+
+        assert second.content == "history"
+        assert manager.chat.await_count == 1
+        assert cached.get_cache_stats()["semantic"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_scopes_are_evicted(self):
+        cache = SemanticCache(embedder(self.VECTORS), threshold=0.9, max_scopes=2)
+        question = "Tell me the history of this ramen shop."
+        for system in ("a", "b"):
+            await cache.put(prompt(question, system), "mock", make_response(system))
+        # Touch scope "a" so "b" is the least recently used
+        assert await cache.get(prompt(question, "a"), "mock") is not None
+        await cache.put(prompt(question, "c"), "mock", make_response("c"))
+
+        assert await cache.get(prompt(question, "b"), "mock") is None
+        assert (await cache.get(prompt(question, "a"), "mock")).content == "a"
+        stats = cache.get_stats()
+        assert stats["scopes"] == 2
+        assert stats["scope_evictions"] == 1
+        assert stats["size"] == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_and_empty_scopes_are_pruned(self):
+        vectors = {f"q{i}": [1.0, float(i), 0.0] for i in range(6)}
+        cache = SemanticCache(embedder(vectors), default_ttl=60)
+        for i in range(5):
+            await cache.put(prompt(f"q{i}"), "mock", make_response(str(i)))
+        await cache.put(prompt("q0", "other"), "mock", make_response())
+        # Age everything but the last entry of the first scope
+        for scope, entries in cache._entries.items():
+            for slot, (response, created, text) in list(entries.items()):
+                if text != "q4":
+                    entries[slot] = (response, created - 120, text)
+
+        assert cache.cleanup_expired() == 5
+        stats = cache.get_stats()
+        assert stats["size"] == 1
+        assert stats["scopes"] == 1
+        # Dead vectors outnumbered live ones, so the index was rebuilt
+        (index,) = cache._indexes.values()
+        assert len(index) == 1
+        assert (await cache.get(prompt("q4"), "mock")).content == "4"
+
+    @pytest.mark.asyncio
+    async def test_put_prunes_its_scope(self):
+        vectors = {"old": [1.0, 0.0, 0.0], "new": [0.0, 1.0, 0.0]}
+        cache = SemanticCache(embedder(vectors), default_ttl=60)
+        await cache.put(prompt("old"), "mock", make_response("old"))
+        (entries,) = cache._entries.values()
+        slot, (response, created, text) = next(iter(entries.items()))
+        entries[slot] = (response, time.time() - 120, text)
+
+        await cache.put(prompt("new"), "mock", make_response("new"))
+        assert cache.get_stats()["size"] == 1
+        assert cache.get_stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lookup_survives_compaction_during_embedding(self):
+        vectors = {
+            "alpha": [1.0, 0.0, 0.0, 0.0], "alpha?": [0.99, 0.1, 0.0, 0.0],
+            "beta": [0.0, 1.0, 0.0, 0.0], "gamma": [0.0, 0.0, 1.0, 0.0], "delta": [0.0, 0.0, 0.0, 1.0],
+        }
+        release = asyncio.Event()
+
+        async def embed(text):
+            if text == "alpha?":
+                await release.wait()
+            return vectors[text]
+
+        cache = SemanticCache(embed, threshold=0.9, default_ttl=60)
+        for text in ("alpha", "beta", "gamma"):
+            await cache.put(prompt(text), "mock", make_response(f"answer to {text}"))
+        (entries,) = cache._entries.values()
+        for slot, (response, created, text) in list(entries.items()):
+            if text != "gamma":
+                entries[slot] = (response, created - 120, text)
+
+        lookup = asyncio.create_task(cache.get(prompt("alpha?"), "mock"))
+        await asyncio.sleep(0)
+        # Prunes alpha and beta and renumbers gamma into slot 0
+        await cache.put(prompt("delta"), "mock", make_response("answer to delta"))
+        release.set()
+
+        assert await lookup is None
@@ -0,0 +1,41 @@
+"""
+Tests for the skill prompt registry.
+"""
+
+import os
+
+from spoon.skill_registry import SkillRegistry, shared_registry
+
+
+def write_skill(root, name, text):
+    path = root / name / "prompt.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestSkillRegistry:
+    """Cached prompt lookups."""
+
+    def test_reloads_changed_prompt(self, tmp_path):
+        path = write_skill(tmp_path, "historian", "v1")
+        skills = SkillRegistry(tmp_path, check_interval=0)
+        assert skills.get("historian") == "v1"
+        write_skill(tmp_path, "historian", "v2")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+        assert skills.get("historian") == "v2"
+        assert skills.message("historian").content == "v2"
+        assert skills.stats["reloads"] == 1
+
+    def test_missing_prompt_is_empty(self, tmp_path):
+        skills = SkillRegistry(tmp_path)
+        assert skills.get("nope") == ""
+        assert skills.stats["missing"] == 1
+
+    def test_shared_registry_is_one_per_directory(self, tmp_path):
+        write_skill(tmp_path, "vibe", "hi")
+        first = shared_registry(tmp_path, check_interval=5)
+        second = shared_registry(tmp_path / ".")
+        assert first is second
+        assert second.check_interval == 5
+        assert shared_registry(tmp_path / "vibe") is not first
@@ -0,0 +1,113 @@
+"""
+Tests for the per-location spirit registry and its payout budgets.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from spoon.spirit_registry import Bounty, Spirit, SpiritRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    reg = SpiritRegistry(str(tmp_path / "spirits.db"), default=Spirit("default"))
+    yield reg
+    reg.close()
+
+
+class TestBudgets:
+    """reserve/release against a spirit's budget."""
+
+    @pytest.mark.asyncio
+    async def test_budget_exhaustion(self, registry):
+        await registry.upsert(Spirit("shop", budget_usdc=3.0))
+        assert await registry.reserve("shop", 2.0)
+        assert not await registry.reserve("shop", 2.0)
+        assert await registry.reserve("shop", 1.0)
+        assert registry.get("shop").balance_usdc == 0.0
+        assert registry.snapshot()["over_budget"] == 1
+
+    @pytest.mark.asyncio
+    async def test_release_restores_budget(self, registry):
+        await registry.upsert(Spirit("shop", budget_usdc=1.0))
+        assert await registry.reserve("shop", 1.0)
+        await registry.release("shop", 1.0)
+        assert registry.get("shop").balance_usdc == 1.0
+        assert await registry.reserve("shop", 1.0)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reservations_do_not_overspend(self, registry):
+        await registry.upsert(Spirit("shop", budget_usdc=5.0))
+        granted = await asyncio.gather(*(registry.reserve("shop", 1.0) for _ in range(20)))
+        assert sum(granted) == 5
+        assert registry.get("shop").paid_usdc == 5.0
+
+    @pytest.mark.asyncio
+    async def test_spend_survives_reload_and_redefinition(self, tmp_path):
+        path = str(tmp_path / "spirits.db")
+        first = SpiritRegistry(path, default=Spirit("default"))
+        await first.upsert(Spirit("shop", budget_usdc=2.0))
+        await first.reserve("shop", 1.5)
+        first.close()
+
+        second = SpiritRegistry(path, default=Spirit("default"))
+        assert second.get("shop").paid_usdc == 1.5
+        # Redefining the spirit keeps what it already paid out
+        await second.upsert(Spirit("shop", budget_usdc=2.0))
+        assert not await second.reserve("shop", 1.0)
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_redefinition_keeps_a_reservation_still_being_written(self, registry, monkeypatch):
+        await registry.upsert(Spirit("shop", budget_usdc=5.0))
+        gate = threading.Event()
+        write = registry._write
+
+        def gated_write(sql, args):
+            gate.wait(5)
+            write(sql, args)
+
+        monkeypatch.setattr(registry, "_write", gated_write)
+        # Debited in memory; its UPDATE is held back until after the upsert
+        reservation = asyncio.create_task(registry.reserve("shop", 2.0))
+        await asyncio.sleep(0)
+        await registry.upsert(Spirit("shop", name="renamed", budget_usdc=5.0))
+        gate.set()
+        assert await reservation
+
+        assert registry.get("shop").name == "renamed"
+        assert registry.get("shop").balance_usdc == 3.0
+        await registry.release("shop", 2.0)
+        assert registry.get("shop").balance_usdc == 5.0
+
+    @pytest.mark.asyncio
+    async def test_unknown_location_uses_uncapped_default(self, registry):
+        assert registry.get("nowhere") is registry.default
+        assert await registry.reserve("nowhere", 100.0)
+
+
+class TestRewards:
+    """Bounty matching."""
+
+    def test_wallet_bounty_overrides_image_bounty(self):
+        spirit = Spirit("shop", default_reward=1.0, bounties=[
+            Bounty("ramen", "image", ["ramen"], 3.0),
+            Bounty("regular", "wallet", ["0xfan"], 5.0),
+        ])
+        assert spirit.reward("bowl_of_ramen.jpg", "0xother")[0] == 3.0
+        assert spirit.reward("bowl_of_ramen.jpg", "0xFAN")[0] == 5.0
+        assert spirit.reward("street.jpg", "0xother") == (1.0, None)
+
+    @pytest.mark.asyncio
+    async def test_bounties_persist(self, tmp_path):
+        path = str(tmp_path / "spirits.db")
+        reg = SpiritRegistry(path, default=Spirit("default"))
+        await reg.upsert(Spirit("shop", lat=35.0, lon=139.0, bounties=[Bounty("ramen", "image", ["ramen"], 3.0)]))
+        reg.close()
+
+        reg = SpiritRegistry(path, default=Spirit("default"))
+        assert [b.to_dict()["keywords"] for b in reg.get("shop").bounties] == [["ramen"]]
+        assert [s.location_id for s, _ in reg.nearby(35.0, 139.0, 100)] == ["shop"]
+        reg.close()
@@ -0,0 +1,104 @@
+"""
+Tests for the append-only verification log and its query API.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from spoon.verification_log import COLUMNS, VerificationLog
+
+
+def record(**overrides) -> dict:
+    base = {c: "" for c in COLUMNS}
+    base.update(ts=1000.0, image_hash="h", wallet="0xa", location="shop", vibe_score=72, approved=1, reward_usdc=1.0, paid_usdc=1.0)
+    base.update(overrides)
+    return base
+
+
+async def flush(log: VerificationLog) -> None:
+    log._flush()
+    await asyncio.gather(*log._inflight)
+
+
+@pytest.fixture
+async def log(tmp_path):
+    log = VerificationLog(str(tmp_path / "verifications.db"), batch_size=3, window=60)
+    yield log
+    await log.aclose()
+
+
+class TestAppend:
+    """Batched writes."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written_without_waiting_for_the_window(self, log):
+        for i in range(4):
+            log.append(record(image_hash=f"h{i}"))
+        await asyncio.gather(*log._inflight)
+        assert log.stats["written"] == 3 and log.stats["batches"] == 1
+        assert log.snapshot()["pending"] == 1
+        await flush(log)
+        assert len(await log.recent()) == 4
+
+    @pytest.mark.asyncio
+    async def test_window_flushes_a_partial_batch(self, tmp_path):
+        log = VerificationLog(str(tmp_path / "v.db"), batch_size=100, window=0.01)
+        log.append(record())
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*log._inflight)
+        assert log.stats["written"] == 1
+        await log.aclose()
+
+    @pytest.mark.asyncio
+    async def test_rows_cannot_be_changed_or_deleted(self, log):
+        log.append(record())
+        await flush(log)
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            log._db.execute("UPDATE verifications SET paid_usdc = 0")
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            log._db.execute("DELETE FROM verifications")
+        assert (await log.recent())[0]["paid_usdc"] == 1.0
+
+
+class TestQueries:
+    """Aggregates and filters."""
+
+    @pytest.mark.asyncio
+    async def test_location_totals_follow_inserts(self, log):
+        log.append(record(location="shop", vibe_score=98, approved=1, paid_usdc=2.0, ts=10.0))
+        log.append(record(location="shop", vibe_score=35, approved=0, paid_usdc=0.0, ts=30.0))
+        log.append(record(location="park", vibe_score=72, approved=1, paid_usdc=1.0, ts=20.0))
+        log.append(record(location="shop", vibe_score=72, approved=1, paid_usdc=1.0, ts=25.0))
+        await flush(log)
+
+        (shop,) = await log.location_stats("shop")
+        assert shop == {"location": "shop", "submissions": 3, "avg_vibe_score": pytest.approx(205 / 3), "approved": 2, "paid_usdc": 3.0, "last_ts": 30.0}
+        assert [row["location"] for row in await log.location_stats()] == ["shop", "park"]
+        assert [row["location"] for row in await log.location_stats(limit=1)] == ["shop"]
+
+    @pytest.mark.asyncio
+    async def test_payouts_by_wallet_counts_paid_records_in_window(self, log):
+        log.append(record(wallet="0xa", paid_usdc=2.0, ts=100.0))
+        log.append(record(wallet="0xa", paid_usdc=0.0, approved=0, ts=200.0))
+        log.append(record(wallet="0xa", paid_usdc=1.5, ts=300.0))
+        log.append(record(wallet="0xa", paid_usdc=5.0, ts=50.0))
+        log.append(record(wallet="0xb", paid_usdc=9.0, ts=300.0))
+        await flush(log)
+
+        assert await log.payouts_by_wallet("0xa", since=100.0) == {"wallet": "0xa", "since": 100.0, "payouts": 2, "total_usdc": 3.5, "last_ts": 300.0}
+        empty = await log.payouts_by_wallet("0xnobody", since=0.0)
+        assert empty["payouts"] == 0 and empty["total_usdc"] == 0
+
+    @pytest.mark.asyncio
+    async def test_recent_filters_and_orders_newest_first(self, log):
+        log.append(record(wallet="0xa", location="shop", image_hash="x", ts=1.0))
+        log.append(record(wallet="0xa", location="park", image_hash="y", ts=2.0))
+        log.append(record(wallet="0xb", location="shop", image_hash="x", ts=3.0))
+        await flush(log)
+
+        assert [r["ts"] for r in await log.recent()] == [3.0, 2.0, 1.0]
+        assert [r["ts"] for r in await log.recent(wallet="0xa")] == [2.0, 1.0]
+        assert [r["ts"] for r in await log.recent(location="shop", image_hash="x", since=2.0)] == [3.0]
+        assert len(await log.recent(limit=1)) == 1
@@ -0,0 +1,50 @@
+"""
+Tests for the vision description cache.
+"""
+
+import os
+import time
+
+import pytest
+
+from spoon.vision_cache import VisionCache, content_key
+
+
+def disk_files(cache: VisionCache) -> list:
+    return [p for p in cache.disk_dir.glob("*/*") if p.suffix == ".json"]
+
+
+class TestDiskSweep:
+    """Entries that are never read again are removed from disk."""
+
+    @pytest.mark.asyncio
+    async def test_sweep_removes_expired_entries(self, tmp_path):
+        cache = VisionCache(disk_dir=tmp_path, ttl=60)
+        await cache.put(content_key(b"old", "t"), "old")
+        await cache.put(content_key(b"new", "t"), "new")
+        old = cache._path(content_key(b"old", "t"))
+        os.utime(old, (time.time() - 120, time.time() - 120))
+
+        assert await cache.sweep() == 1
+        assert not old.exists()
+        assert len(disk_files(cache)) == 1
+
+    @pytest.mark.asyncio
+    async def test_sweep_caps_disk_entries_oldest_first(self, tmp_path):
+        cache = VisionCache(disk_dir=tmp_path, max_disk_entries=3, sweep_every=10_000)
+        keys = [content_key(str(i).encode(), "t") for i in range(5)]
+        for i, key in enumerate(keys):
+            await cache.put(key, str(i))
+            os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+        assert await cache.sweep() == 2
+        assert {p.stem for p in disk_files(cache)} == set(keys[2:])
+
+    @pytest.mark.asyncio
+    async def test_puts_trigger_a_sweep(self, tmp_path):
+        cache = VisionCache(disk_dir=tmp_path, max_disk_entries=2, sweep_every=4)
+        for i in range(4):
+            await cache.put(content_key(str(i).encode(), "t"), str(i))
+        await cache._sweeping
+        assert cache.stats["sweeps"] == 1
+        assert len(disk_files(cache)) == 2
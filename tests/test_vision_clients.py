@@ -0,0 +1,99 @@
+"""
+Tests for the ensemble vision quorum.
+"""
+
+import asyncio
+
+import pytest
+
+from spoon.vision_clients import VisionClientRegistry, description_similarity
+
+
+class StubClient:
+    def __init__(self, name: str, answer: str, delay: float = 0.0):
+        self.name = name
+        self.cache_tag = name
+        self.answer = answer
+        self.delay = delay
+
+    async def describe(self, data, mime):
+        await asyncio.sleep(self.delay)
+        return self.answer
+
+
+def registry(*clients: StubClient) -> VisionClientRegistry:
+    reg = VisionClientRegistry()
+    for client in clients:
+        reg._clients[client.name] = client
+    return reg
+
+
+class TestDescriptionSimilarity:
+    """Agreement is judged on the words that carry content."""
+
+    def test_same_subject_in_different_words_is_similar(self):
+        a = "A steaming bowl of ramen with chopsticks on a wooden counter."
+        b = "Ramen bowl and chopsticks resting on the wooden counter, warm light."
+        assert description_similarity(a, b) >= 0.5
+
+    def test_different_subjects_are_not_similar(self):
+        a = "A steaming bowl of ramen with chopsticks on a wooden counter."
+        b = "An empty parking lot at night under sodium lamps."
+        assert description_similarity(a, b) < 0.2
+
+
+class TestEnsemble:
+    """Quorum needs descriptions that actually agree."""
+
+    @pytest.mark.asyncio
+    async def test_quorum_on_similar_descriptions(self):
+        reg = registry(
+            StubClient("a", "Ramen bowl with chopsticks on a wooden counter"),
+            StubClient("b", "A bowl of ramen, chopsticks, wooden counter"),
+            StubClient("c", "Neon sign over a parking lot", delay=1.0),
+        )
+        result = await reg.ensemble(b"x", "image/png", ["a", "b", "c"], quorum=2, deadline=5)
+        assert result["outcome"] == "quorum"
+        assert result["agreed"] == 2
+        assert result["votes"]["c"] == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_unrelated_descriptions_do_not_form_a_quorum(self):
+        reg = registry(
+            StubClient("a", "Ramen bowl with chopsticks on a wooden counter"),
+            StubClient("b", "Neon sign over an empty parking lot"),
+        )
+        result = await reg.ensemble(b"x", "image/png", ["a", "b"], quorum=2, deadline=5)
+        assert result["outcome"] == "plurality"
+        assert result["agreed"] == 1
+        assert result["description"].startswith("Ramen")
+
+    @pytest.mark.asyncio
+    async def test_custom_agreement(self):
+        reg = registry(StubClient("a", "one thing"), StubClient("b", "another thing entirely"))
+        result = await reg.ensemble(b"x", "image/png", ["a", "b"], quorum=2, deadline=5, agree=lambda x, y: True)
+        assert result["outcome"] == "quorum"
+        assert result["votes"] == {"a": "group 0", "b": "group 0"}
+
+
+class TestLociAgreement:
+    """An early-exit verdict only counts as a vote when a rule fires."""
+
+    def test_undecided_descriptions_compare_on_wording(self, loci):
+        assert not loci._vision_agree("A bowl of ramen on a counter", "An empty parking lot at night")
+        assert loci._vision_agree("A bowl of ramen on a counter", "Ramen bowl sitting on the counter")
+
+
+class TestLociProviderChoice:
+    """The provider that answers is the one the cache tag names."""
+
+    @pytest.mark.asyncio
+    async def test_single_provider_ensemble_uses_that_provider(self, loci, monkeypatch):
+        first, chosen = StubClient("first", "described by first"), StubClient("chosen", "described by chosen")
+        for client in (first, chosen):
+            monkeypatch.setitem(loci.vision_clients._clients, client.name, client)
+        monkeypatch.setattr(loci.vision_clients, "available", lambda: ["first", "chosen"])
+        monkeypatch.setattr(loci, "VISION_ENSEMBLE", ["chosen"])
+
+        desc = await loci._describe_image("photo.png", b"\x89PNG\r\n\x1a\n single-provider test", "image/png")
+        assert desc == "described by chosen"